@@ -0,0 +1,101 @@
+"""Sample invoices shared by the benchmarks."""
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from ksef.models.invoice import (
+    PAYMENT_METHOD_BANK_TRANSFER,
+    Address,
+    Invoice,
+    InvoiceData,
+    InvoiceType,
+    Issuer,
+    IssuerIdentificationData,
+    NipIdentification,
+    PaymentInfo,
+    Subject,
+    TaxSummary,
+)
+from ksef.models.invoice_annotations import (
+    FreeFromVat,
+    IntraCommunitySupplyOfNewTransportMethods,
+    InvoiceAnnotations,
+    MarginProcedure,
+    ReverseCharge,
+    SelfInvoicing,
+    SimplifiedProcedureBySecondTaxPayer,
+    SplitPayment,
+    TaxSettlementOnPayment,
+)
+from ksef.models.invoice_rows import InvoiceRow, InvoiceRows
+
+
+def make_invoice(rows: int, number: int = 1) -> Invoice:
+    """Build a typical domestic invoice with `rows` fully described rows."""
+    net = Decimal("12.50") * rows
+    return Invoice(
+        issuer=Issuer(
+            identification_data=IssuerIdentificationData(
+                nip="1111111111", full_name="Przykładowa Firma Sp. z o.o."
+            ),
+            email="faktury@example.com",
+            phone="+48 111111111",
+            address=Address(
+                country_code="PL",
+                city="Warszawa",
+                street="Kwiatowa",
+                house_number="1",
+                apartment_number="2",
+                postal_code="00-001",
+            ),
+        ),
+        recipient=Subject(
+            identification_data=NipIdentification(nip="2222222222"),
+            name="Odbiorca S.A.",
+            address=Address(
+                country_code="PL",
+                city="Kraków",
+                street="Długa",
+                house_number="10",
+                apartment_number=None,
+                postal_code="30-001",
+            ),
+        ),
+        invoice_data=InvoiceData(
+            currency_code="PLN",
+            issue_date=date(2025, 1, 31),
+            issue_number=f"FV/{number}/2025",
+            sell_date=date(2025, 1, 31),
+            total_amount=net * Decimal("1.23"),
+            tax_summary=TaxSummary(net_standard=net, vat_standard=net * Decimal("0.23")),
+            invoice_annotations=InvoiceAnnotations(
+                tax_settlement_on_payment=TaxSettlementOnPayment.REGULAR,
+                self_invoice=SelfInvoicing.NO,
+                reverse_charge=ReverseCharge.NO,
+                split_payment=SplitPayment.NO,
+                free_from_vat=FreeFromVat.NO,
+                intra_community_supply_of_new_transport_methods=IntraCommunitySupplyOfNewTransportMethods.NO,
+                simplified_procedure_by_second_tax_payer=SimplifiedProcedureBySecondTaxPayer.NO,
+                margin_procedure=MarginProcedure.NO,
+            ),
+            invoice_type=InvoiceType.REGULAR_VAT,
+            invoice_rows=InvoiceRows(
+                rows=[
+                    InvoiceRow(
+                        name=f"Towar nr {index} & akcesoria",
+                        unit_of_measure="szt",
+                        quantity=Decimal("1"),
+                        unit_net_price=Decimal("12.50"),
+                        net_value=Decimal("12.50"),
+                        tax=23,
+                    )
+                    for index in range(rows)
+                ]
+            ),
+            payment_info=PaymentInfo(
+                due_date=date(2025, 2, 14),
+                method=PAYMENT_METHOD_BANK_TRANSFER,
+                bank_account_number="12345678901234567890123456",
+            ),
+        ),
+        creation_datetime=datetime(2025, 1, 31, 12, 0, tzinfo=timezone.utc),
+    )
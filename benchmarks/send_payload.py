@@ -0,0 +1,87 @@
+"""Benchmark of building the request body for sending an invoice in an online session.
+
+Compares the single-pass body builder used by `Client.send_invoice_in_session` with the
+previous approach (pad, encrypt, build a dict of str values and serialize it with `json`),
+reporting time per invoice and peak memory allocated while building the body. Each
+intermediate copy of the payload (padded XML, ciphertext, base64 str, JSON str) adds to the
+peak, which is also shown as a multiple of the XML size.
+
+Run with::
+
+    python -m benchmarks.send_payload
+"""
+import base64
+import hashlib
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+from typing import Callable, Tuple
+
+from cryptography.hazmat.primitives import padding
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+from ksef.client import build_send_invoice_body
+from ksef.encryption import AES_KEY_SIZE, IV_SIZE
+
+SIZES = [10 * 1024, 1024 * 1024]  # bytes of invoice XML
+REPEAT = 5
+
+
+def build_body_legacy(invoice_xml: bytes, aes_key: bytes, iv: bytes) -> bytes:
+    """Build the body the way it was built before, for comparison."""
+    padder = padding.PKCS7(128).padder()
+    padded = padder.update(invoice_xml) + padder.finalize()
+    encryptor = Cipher(algorithms.AES(aes_key), modes.CBC(iv)).encryptor()
+    encrypted_invoice = encryptor.update(padded) + encryptor.finalize()
+    payload = {
+        "invoiceHash": base64.b64encode(hashlib.sha256(invoice_xml).digest()).decode(),
+        "invoiceSize": len(invoice_xml),
+        "encryptedInvoiceHash": base64.b64encode(
+            hashlib.sha256(encrypted_invoice).digest()
+        ).decode(),
+        "encryptedInvoiceSize": len(encrypted_invoice),
+        "encryptedInvoiceContent": base64.b64encode(encrypted_invoice).decode(),
+        "offlineMode": False,
+    }
+    # requests serializes `json=` payloads to str, then encodes them
+    return json.dumps(payload).encode()
+
+
+def measure(
+    build: Callable[[bytes, bytes, bytes], bytes], invoice_xml: bytes, number: int
+) -> Tuple[float, int]:
+    """Return seconds per call and peak bytes allocated during a call."""
+    aes_key, iv = os.urandom(AES_KEY_SIZE), os.urandom(IV_SIZE)
+    seconds = min(
+        timeit.repeat(lambda: build(invoice_xml, aes_key, iv), number=number, repeat=REPEAT)
+    )
+    tracemalloc.start()
+    body = build(invoice_xml, aes_key, iv)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del body
+    return seconds / number, peak
+
+
+def main() -> None:
+    """Run the benchmark and print a table of results."""
+    builders = [("legacy", build_body_legacy), ("single-pass", build_send_invoice_body)]
+    sys.stdout.write(
+        f"{'size':>10} {'builder':>12} {'time/invoice':>14} {'peak':>12} {'peak/size':>10}\n"
+    )
+    for size in SIZES:
+        invoice_xml = b"<Faktura>" + b"x" * (size - 19) + b"</Faktura>"
+        aes_key, iv = os.urandom(AES_KEY_SIZE), os.urandom(IV_SIZE)
+        legacy, fused = (build(invoice_xml, aes_key, iv) for _, build in builders)
+        assert json.loads(legacy) == json.loads(fused)
+        for name, build in builders:
+            seconds, peak = measure(build, invoice_xml, number=max(1, 2_000_000 // size))
+            sys.stdout.write(
+                f"{size:>10} {name:>12} {seconds * 1e6:>11.1f} us {peak:>10} B {peak / size:>9.2f}x\n"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Benchmark of the fragment cache of the direct XML serializer.
+
+Converts many small invoices from the same issuer, as in a typical run, with and without a
+`FragmentCache`, and reports invoices converted per second.
+
+Run with::
+
+    python -m benchmarks.xml_fragment_cache
+"""
+import sys
+import timeit
+from typing import Optional
+
+from benchmarks.invoices import make_invoice
+from ksef.xml_converters import FragmentCache, convert_invoice_to_xml
+
+ROW_COUNTS = [1, 5, 50]
+INVOICES = 1_000
+REPEAT = 3
+
+
+def main() -> None:
+    """Run the benchmark and print a table of results."""
+    sys.stdout.write(f"{'rows':>6} {'cache':>6} {'invoices/s':>12} {'speed-up':>9}\n")
+    for rows in ROW_COUNTS:
+        invoices = [make_invoice(rows, number) for number in range(INVOICES)]
+        baseline = None
+        for cache in (None, FragmentCache()):
+
+            def convert_all(cache: Optional[FragmentCache] = cache) -> None:
+                for invoice in invoices:  # noqa: B023
+                    convert_invoice_to_xml(invoice, fragment_cache=cache)
+
+            seconds = min(timeit.repeat(convert_all, number=1, repeat=REPEAT))
+            invoices_per_second = INVOICES / seconds
+            baseline = baseline or invoices_per_second
+            sys.stdout.write(
+                f"{rows:>6} {'no' if cache is None else 'yes':>6} {invoices_per_second:>12,.0f} "
+                f"{invoices_per_second / baseline:>8.2f}x\n"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Benchmark of parallel XML conversion with `convert_invoices_to_xml`.
+
+Converts a batch of invoices, given as JSON-compatible raw dicts, with an increasing number
+of worker processes (powers of two up to the number of CPUs) and reports invoices per
+second. Conversion includes validating the dicts into `Invoice` models in the workers.
+
+Run with::
+
+    python -m benchmarks.xml_parallel
+"""
+import json
+import os
+import sys
+import time
+from collections import deque
+
+from benchmarks.invoices import make_invoice
+from ksef.xml_converters import convert_invoices_to_xml
+
+INVOICES = 5_000
+ROWS = 20
+
+
+def main() -> None:
+    """Run the benchmark and print a table of results."""
+    invoices = [json.loads(make_invoice(ROWS, number).json()) for number in range(INVOICES)]
+    cpus = os.cpu_count() or 1
+    worker_counts = [2**power for power in range(cpus.bit_length()) if 2**power <= cpus]
+    sys.stdout.write(f"{INVOICES} invoices of {ROWS} rows, {cpus} CPUs\n")
+    sys.stdout.write(f"{'workers':>8} {'invoices/s':>12} {'speed-up':>9}\n")
+    baseline = None
+    for workers in worker_counts:
+        started = time.perf_counter()
+        deque(convert_invoices_to_xml(invoices, workers=workers), maxlen=0)
+        invoices_per_second = INVOICES / (time.perf_counter() - started)
+        baseline = baseline or invoices_per_second
+        sys.stdout.write(
+            f"{workers:>8} {invoices_per_second:>12,.0f} {invoices_per_second / baseline:>8.1f}x\n"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Benchmark of the FA(3) XML parser.
+
+Reports invoices parsed per second with `parse_invoice_xml` for small invoices, and rows
+per second when streaming the rows of a large invoice with `iter_invoice_rows`.
+
+Run with::
+
+    python -m benchmarks.xml_parser
+"""
+import io
+import sys
+import timeit
+from collections import deque
+
+from benchmarks.invoices import make_invoice
+from ksef.xml_converters import convert_invoice_to_xml
+from ksef.xml_parsers import iter_invoice_rows, parse_invoice_xml
+
+SMALL_INVOICE_ROWS = [1, 10]
+LARGE_INVOICE_ROWS = 50_000
+REPEAT = 3
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    for rows in SMALL_INVOICE_ROWS:
+        xml = convert_invoice_to_xml(make_invoice(rows))
+        number = 2_000
+        seconds = min(
+            timeit.repeat(lambda xml=xml: parse_invoice_xml(xml), number=number, repeat=REPEAT)
+        )
+        sys.stdout.write(f"{rows:>6} rows: {number / seconds:>10,.0f} invoices/s\n")
+
+    xml = convert_invoice_to_xml(make_invoice(LARGE_INVOICE_ROWS))
+    seconds = min(
+        timeit.repeat(
+            lambda: deque(iter_invoice_rows(io.BytesIO(xml)), maxlen=0), number=1, repeat=REPEAT
+        )
+    )
+    sys.stdout.write(
+        f"{LARGE_INVOICE_ROWS:>6} rows: {LARGE_INVOICE_ROWS / seconds:>10,.0f} rows/s streamed\n"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Benchmark of the XML serializers of `convert_invoice_to_xml`.
+
+Reports invoice rows serialized per second by each `XmlSerializer`, for invoices of 10,
+1,000 and 50,000 rows, after checking that both produce the same bytes.
+
+Run with::
+
+    python -m benchmarks.xml_serializers
+"""
+import sys
+import timeit
+
+from benchmarks.invoices import make_invoice
+from ksef.xml_converters import XmlSerializer, convert_invoice_to_xml
+
+ROW_COUNTS = [10, 1_000, 50_000]
+ROWS_PER_MEASUREMENT = 200_000
+REPEAT = 3
+
+
+def main() -> None:
+    """Run the benchmark and print a table of results."""
+    sys.stdout.write(f"{'rows':>8} {'serializer':>14} {'rows/s':>12} {'speed-up':>9}\n")
+    for rows in ROW_COUNTS:
+        invoice = make_invoice(rows)
+        outputs = {
+            serializer: convert_invoice_to_xml(invoice, serializer=serializer)
+            for serializer in XmlSerializer
+        }
+        if len(set(outputs.values())) != 1:
+            raise AssertionError("Serializers produced different XML")
+        number = max(1, ROWS_PER_MEASUREMENT // rows)
+        baseline = None
+        for serializer in XmlSerializer:
+            seconds = min(
+                timeit.repeat(
+                    lambda: convert_invoice_to_xml(invoice, serializer=serializer),  # noqa: B023
+                    number=number,
+                    repeat=REPEAT,
+                )
+            )
+            rows_per_second = rows * number / seconds
+            baseline = baseline or rows_per_second
+            sys.stdout.write(
+                f"{rows:>8} {serializer.value:>14} {rows_per_second:>12,.0f} "
+                f"{rows_per_second / baseline:>8.1f}x\n"
+            )
+
+
+if __name__ == "__main__":
+    main()
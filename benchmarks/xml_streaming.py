@@ -0,0 +1,55 @@
+"""Benchmark of memory used to serialize large invoices.
+
+Compares peak memory allocated while converting an invoice with `convert_invoice_to_xml`,
+which returns the whole document, and with `write_invoice_xml`, which writes it to a file
+chunk by chunk. The invoice model itself is built before measuring.
+
+Run with::
+
+    python -m benchmarks.xml_streaming
+"""
+import os
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+from benchmarks.invoices import make_invoice
+from ksef.models.invoice import Invoice
+from ksef.xml_converters import XmlSerializer, convert_invoice_to_xml, write_invoice_xml
+
+ROW_COUNTS = [1_000, 10_000, 50_000]
+
+
+def peak_memory(convert: Callable[[Invoice], object], invoice: Invoice) -> int:
+    """Return the peak number of bytes allocated by a call."""
+    tracemalloc.start()
+    convert(invoice)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main() -> None:
+    """Run the benchmark and print a table of results."""
+    with Path(os.devnull).open("wb") as devnull:
+        methods = [
+            (
+                "etree",
+                lambda invoice: convert_invoice_to_xml(
+                    invoice, serializer=XmlSerializer.ELEMENT_TREE
+                ),
+            ),
+            ("direct", convert_invoice_to_xml),
+            ("streaming", lambda invoice: write_invoice_xml(invoice, devnull)),
+        ]
+        sys.stdout.write(f"{'rows':>8} {'method':>10} {'peak':>14} {'per row':>9}\n")
+        for rows in ROW_COUNTS:
+            invoice = make_invoice(rows)
+            for name, convert in methods:
+                peak = peak_memory(convert, invoice)
+                sys.stdout.write(f"{rows:>8} {name:>10} {peak:>12,} B {peak / rows:>7.0f} B\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,568 @@
+"""Asyncio client for interacting with the KSEF API.
+
+Requires the optional ``httpx`` dependency (``pip install ksef[async]``).
+"""
+import asyncio
+import logging
+import os
+from collections import deque
+from functools import partial
+from itertools import count
+from types import TracebackType
+from typing import Any, AsyncIterator, Deque, Dict, List, Mapping, Optional, Type, Union
+from urllib.parse import urlencode, urljoin
+
+import httpx
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey
+
+from ksef.auth.base import Authorization
+from ksef.certificates import (
+    USAGE_SYMMETRIC_KEY_ENCRYPTION,
+    PublicKeyCertificateCache,
+    default_certificate_cache,
+)
+from ksef.client import (
+    AES_KEY_SIZE,
+    DEFAULT_INVOICE_QUERY_PAGE_SIZE,
+    DEFAULT_SESSION_INVOICES_PAGE_SIZE,
+    IDEMPOTENT_METHODS,
+    IV_SIZE,
+    SessionContext,
+    build_open_session_payload,
+    build_send_invoice_body,
+    build_send_invoice_response,
+)
+from ksef.constants import (
+    CONTINUATION_TOKEN_HEADER,
+    TIMEOUT,
+    URL_INVOICES_GET,
+    URL_PUBLIC_KEY_CERTS,
+    URL_QUERY_INVOICES,
+    URL_SESSIONS_INVOICES,
+    URL_SESSIONS_INVOICES_STATUS,
+    URL_SESSIONS_ONLINE,
+    URL_SESSIONS_ONLINE_CLOSE,
+    URL_SESSIONS_ONLINE_INVOICES,
+    URL_SESSIONS_STATUS,
+    Environment,
+)
+from ksef.encryption import encrypt_key_rsa_oaep
+from ksef.models.invoice import Invoice
+from ksef.models.invoice_query import InvoiceQueryFilters, SortOrder
+from ksef.models.responses.auth import AuthTokens
+from ksef.models.responses.invoices import InvoiceMetadata, InvoiceMetadataPage
+from ksef.models.responses.session import (
+    CloseSessionResponse,
+    SendInvoiceResponse,
+    SessionInvoicesPage,
+    SessionInvoiceStatusResponse,
+    SessionStatusResponse,
+)
+from ksef.rate_limit import RateLimiter
+from ksef.retry import DEFAULT_RETRY_POLICY, RetryPolicy
+from ksef.utils import dumps_json
+from ksef.xml_converters import convert_invoice_to_xml
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONNECTIONS = 100
+
+
+class AsyncClient:
+    """Asyncio client for interacting with the KSEF API.
+
+    Mirrors the interface of `ksef.client.Client`, but every API call is a coroutine. All
+    calls share a single `httpx.AsyncClient` connection pool, so many requests can be in
+    flight on one event loop at the same time.
+
+    The client should be closed with `aclose()` or used as an async context manager.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        authorization: Authorization,
+        environment: Environment = Environment.PRODUCTION,
+        session: Optional[httpx.AsyncClient] = None,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        timeout: float = TIMEOUT,
+        certificate_cache: PublicKeyCertificateCache = default_certificate_cache,
+        retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
+        self.authorization = authorization
+        self.environment = environment
+        self.base_url = environment.value
+        self.certificate_cache = certificate_cache
+        self.retry_policy = retry_policy
+        self.rate_limiter = rate_limiter
+        self._owns_session = session is None
+        self.session = session or httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            timeout=timeout,
+        )
+
+    async def __aenter__(self) -> "AsyncClient":  # noqa: D105
+        return self
+
+    async def __aexit__(  # noqa: D105
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the underlying connection pool (only if it was created by this client)."""
+        if self._owns_session:
+            await self.session.aclose()
+
+    async def authorize(self, nip: str) -> AuthTokens:
+        """Authorize the client's authorization object, reusing this client's connection pool.
+
+        Parameters
+        ----------
+        nip : str
+            The NIP (tax identification number) to authorize with.
+        """
+        return await self.authorization.authorize_async(nip, session=self.session)
+
+    def build_url(self, url: str, params: Optional[Mapping[str, Union[str, int]]] = None) -> str:
+        """Construct a full URL."""
+        url = urljoin(base=self.base_url, url=url)
+        if params is not None:
+            param_str = urlencode(params)
+            return f"{url}?{param_str}"
+
+        return url
+
+    async def _request(  # noqa: PLR0913
+        self,
+        method: str,
+        url: str,
+        idempotent: Optional[bool] = None,
+        endpoint: Optional[str] = None,
+        nip: Optional[str] = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """Send a request through the session, rate limited and retrying transient failures."""
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+
+        async def send() -> httpx.Response:
+            if self.rate_limiter is not None and endpoint is not None:
+                await self.rate_limiter.acquire_async(
+                    endpoint, nip or self.authorization.nip, environment=self.environment
+                )
+            return await self.session.request(method, url, **kwargs)
+
+        return await self.retry_policy.call_async(send, idempotent=idempotent)
+
+    async def _auth_headers(self) -> Dict[str, str]:
+        """Build authorization headers using the Bearer access token."""
+        return {"Authorization": f"Bearer {await self.authorization.get_access_token_async()}"}
+
+    async def _fetch_public_key_certs(self) -> List[Dict[str, Any]]:
+        """Download the public key certificate listing."""
+        response = await self._request(
+            "GET",
+            endpoint=URL_PUBLIC_KEY_CERTS,
+            url=self.build_url(URL_PUBLIC_KEY_CERTS),
+            headers={"Accept": "application/json"},
+        )
+        response.raise_for_status()
+        certs: List[Dict[str, Any]] = response.json()
+        return certs
+
+    async def _fetch_symmetric_key_cert(self) -> RSAPublicKey:
+        """Get the SymmetricKeyEncryption public key, downloading it only on a cache miss."""
+        public_key = await self.certificate_cache.get_or_fetch_async(
+            self.environment, USAGE_SYMMETRIC_KEY_ENCRYPTION, self._fetch_public_key_certs
+        )
+        if public_key is None:
+            raise ValueError("No SymmetricKeyEncryption certificate found")
+        return public_key
+
+    async def search_invoices(
+        self,
+        filters: InvoiceQueryFilters,
+        page_size: int = DEFAULT_INVOICE_QUERY_PAGE_SIZE,
+        page_offset: int = 0,
+        sort_order: SortOrder = SortOrder.ASCENDING,
+    ) -> InvoiceMetadataPage:
+        """Fetch one page of metadata of the invoices matching the query criteria.
+
+        See `ksef.client.Client.search_invoices`.
+        """
+        params = {
+            "PageSize": page_size,
+            "PageOffset": page_offset,
+            "SortOrder": sort_order.value,
+        }
+        response = await self._request(
+            "POST",
+            endpoint=URL_QUERY_INVOICES,
+            url=self.build_url(url=URL_QUERY_INVOICES, params=params),
+            idempotent=True,
+            headers={
+                "Accept": "application/json",
+                "Content-Type": "application/json",
+                **(await self._auth_headers()),
+            },
+            content=dumps_json(filters.to_dict()),
+        )
+        logger.debug("Search invoices response (%s): %s", response.status_code, response.text)
+        response.raise_for_status()
+        return InvoiceMetadataPage.from_dict(response.json())
+
+    async def iter_invoices(
+        self,
+        filters: InvoiceQueryFilters,
+        page_size: int = DEFAULT_INVOICE_QUERY_PAGE_SIZE,
+        max_concurrency: int = 1,
+        sort_order: SortOrder = SortOrder.ASCENDING,
+    ) -> AsyncIterator[InvoiceMetadata]:
+        """Iterate over the metadata of all invoices matching the query criteria.
+
+        Up to `max_concurrency` pages are requested ahead while the current one is
+        consumed. See `ksef.client.Client.iter_invoices`.
+        """
+        fetch = partial(self.search_invoices, filters, page_size, sort_order=sort_order)
+        offsets = count()
+        pending: Deque["asyncio.Task[InvoiceMetadataPage]"] = deque(
+            asyncio.ensure_future(fetch(next(offsets))) for _ in range(max(max_concurrency, 1))
+        )
+        try:
+            while pending:
+                page = await pending.popleft()
+                if page.has_more:
+                    pending.append(asyncio.ensure_future(fetch(next(offsets))))
+                else:
+                    for task in pending:
+                        task.cancel()
+                    pending.clear()
+                for invoice in page.invoices:
+                    yield invoice
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def open_session(self, nip: str) -> SessionContext:
+        """Open an online session for invoice submission.
+
+        Parameters
+        ----------
+        nip : str
+            The NIP (tax identification number) to open the session for.
+
+        Returns
+        -------
+        SessionContext
+            Contains session reference number and encryption keys for sending invoices.
+        """
+        public_key = await self._fetch_symmetric_key_cert()
+
+        aes_key = os.urandom(AES_KEY_SIZE)
+        iv = os.urandom(IV_SIZE)
+        encrypted_key = encrypt_key_rsa_oaep(aes_key, public_key)
+
+        response = await self._request(
+            "POST",
+            endpoint=URL_SESSIONS_ONLINE,
+            nip=nip,
+            url=self.build_url(url=URL_SESSIONS_ONLINE),
+            headers={
+                "Accept": "application/json",
+                "Content-Type": "application/json",
+                **(await self._auth_headers()),
+            },
+            json=build_open_session_payload(nip=nip, encrypted_key=encrypted_key, iv=iv),
+        )
+        logger.debug("Open session response (%s): %s", response.status_code, response.text)
+        response.raise_for_status()
+        data = response.json()
+
+        return SessionContext(
+            reference_number=data["referenceNumber"],
+            aes_key=aes_key,
+            iv=iv,
+            nip=nip,
+        )
+
+    async def send_invoice_in_session(
+        self,
+        session_context: SessionContext,
+        invoice: Invoice,
+    ) -> SendInvoiceResponse:
+        """Send an encrypted invoice within an active session.
+
+        Parameters
+        ----------
+        session_context : SessionContext
+            The session context from open_session().
+        invoice : Invoice
+            The invoice to send.
+
+        Returns
+        -------
+        SendInvoiceResponse
+            Contains reference numbers and processing status.
+        """
+        invoice_xml = convert_invoice_to_xml(invoice)
+        body = build_send_invoice_body(invoice_xml, session_context.aes_key, session_context.iv)
+
+        url = URL_SESSIONS_ONLINE_INVOICES.format(reference_number=session_context.reference_number)
+        response = await self._request(
+            "POST",
+            endpoint=URL_SESSIONS_ONLINE_INVOICES,
+            nip=session_context.nip,
+            url=self.build_url(url=url),
+            headers={
+                "Accept": "application/json",
+                "Content-Type": "application/json",
+                **(await self._auth_headers()),
+            },
+            content=body,
+        )
+        logger.debug(
+            "Send invoice in session response (%s): %s", response.status_code, response.text
+        )
+        response.raise_for_status()
+        return build_send_invoice_response(
+            response_data=response.json(),
+            status_code=response.status_code,
+            headers=dict(response.headers),
+            session_context=session_context,
+            invoice_xml=invoice_xml,
+        )
+
+    async def close_session(self, session_context: SessionContext) -> CloseSessionResponse:
+        """Close an active online session.
+
+        Parameters
+        ----------
+        session_context : SessionContext
+            The session context from open_session().
+
+        Returns
+        -------
+        CloseSessionResponse
+            Contains the session reference number.
+        """
+        url = URL_SESSIONS_ONLINE_CLOSE.format(reference_number=session_context.reference_number)
+        response = await self._request(
+            "POST",
+            endpoint=URL_SESSIONS_ONLINE_CLOSE,
+            nip=session_context.nip,
+            url=self.build_url(url=url),
+            headers={
+                "Accept": "application/json",
+                "Content-Type": "application/json",
+                **(await self._auth_headers()),
+            },
+            json={},
+        )
+        logger.debug("Close session response (%s): %s", response.status_code, response.text)
+        # Close session returns 204 No Content on success
+        if response.status_code == 204:  # noqa: PLR2004
+            return CloseSessionResponse(reference_number=session_context.reference_number)
+        response.raise_for_status()
+        return CloseSessionResponse.from_dict(response.json())
+
+    async def send_invoice(self, nip: str, invoice: Invoice) -> SendInvoiceResponse:
+        """Send a single invoice (handles session lifecycle automatically).
+
+        Parameters
+        ----------
+        nip : str
+            The NIP (tax identification number) to send the invoice for.
+        invoice : Invoice
+            The invoice to send.
+
+        Returns
+        -------
+        SendInvoiceResponse
+            Contains reference numbers and processing status.
+        """
+        session_context = await self.open_session(nip)
+
+        try:
+            return await self.send_invoice_in_session(
+                session_context=session_context,
+                invoice=invoice,
+            )
+        finally:
+            await self.close_session(session_context)
+
+    async def get_session_status(self, session_reference_number: str) -> SessionStatusResponse:
+        """Get the status of a session.
+
+        Parameters
+        ----------
+        session_reference_number : str
+            The session reference number from open_session() or SendInvoiceResponse.
+
+        Returns
+        -------
+        SessionStatusResponse
+            Contains overall session status and invoice counts.
+        """
+        url = URL_SESSIONS_STATUS.format(reference_number=session_reference_number)
+        response = await self._request(
+            "GET",
+            endpoint=URL_SESSIONS_STATUS,
+            url=self.build_url(url=url),
+            headers={
+                "Accept": "application/json",
+                **(await self._auth_headers()),
+            },
+        )
+        logger.debug("Get session status response (%s): %s", response.status_code, response.text)
+        response.raise_for_status()
+        return SessionStatusResponse.from_dict(response.json())
+
+    async def _get_session_invoices_page(
+        self, session_reference_number: str, page_size: int, continuation_token: Optional[str]
+    ) -> SessionInvoicesPage:
+        """Fetch one page of invoice statuses, continuing from `continuation_token`."""
+        url = URL_SESSIONS_INVOICES.format(reference_number=session_reference_number)
+        headers = {"Accept": "application/json", **(await self._auth_headers())}
+        if continuation_token is not None:
+            headers[CONTINUATION_TOKEN_HEADER] = continuation_token
+        response = await self._request(
+            "GET",
+            endpoint=URL_SESSIONS_INVOICES,
+            url=self.build_url(url=url, params={"PageSize": page_size}),
+            headers=headers,
+        )
+        logger.debug("Get session invoices response (%s): %s", response.status_code, response.text)
+        response.raise_for_status()
+        return SessionInvoicesPage.from_dict(response.json())
+
+    async def get_session_invoices(
+        self, session_reference_number: str, page_size: int = 10
+    ) -> List[SessionInvoiceStatusResponse]:
+        """Get the status of the invoices in a session (first page only).
+
+        Use iter_session_invoices() to get the statuses of all invoices.
+
+        Parameters
+        ----------
+        session_reference_number : str
+            The session reference number.
+        page_size : int
+            Number of results per page (default 10).
+
+        Returns
+        -------
+        list[SessionInvoiceStatusResponse]
+            List of invoice statuses for the session.
+        """
+        page = await self._get_session_invoices_page(session_reference_number, page_size, None)
+        return page.invoices
+
+    async def iter_session_invoices(
+        self,
+        session_reference_number: str,
+        page_size: int = DEFAULT_SESSION_INVOICES_PAGE_SIZE,
+    ) -> AsyncIterator[SessionInvoiceStatusResponse]:
+        """Iterate over the statuses of all invoices in a session, page by page.
+
+        The next page is requested in the background while the current one is consumed,
+        so at most two pages are held in memory at a time.
+
+        Parameters
+        ----------
+        session_reference_number : str
+            The session reference number.
+        page_size : int
+            Number of results per page.
+
+        Yields
+        ------
+        SessionInvoiceStatusResponse
+            The status of each invoice in the session.
+        """
+        fetch = partial(self._get_session_invoices_page, session_reference_number, page_size)
+        next_page: Optional["asyncio.Task[SessionInvoicesPage]"] = asyncio.ensure_future(
+            fetch(None)
+        )
+        try:
+            while next_page is not None:
+                page = await next_page
+                next_page = None
+                if page.continuation_token is not None:
+                    next_page = asyncio.ensure_future(fetch(page.continuation_token))
+                for invoice in page.invoices:
+                    yield invoice
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+
+    async def get_invoice_status(
+        self, session_reference_number: str, invoice_reference_number: str
+    ) -> SessionInvoiceStatusResponse:
+        """Get the status of a specific invoice in a session.
+
+        Parameters
+        ----------
+        session_reference_number : str
+            The session reference number.
+        invoice_reference_number : str
+            The invoice reference number from SendInvoiceResponse.
+
+        Returns
+        -------
+        SessionInvoiceStatusResponse
+            The invoice status including processing result.
+        """
+        url = URL_SESSIONS_INVOICES_STATUS.format(
+            reference_number=session_reference_number,
+            invoice_reference_number=invoice_reference_number,
+        )
+        response = await self._request(
+            "GET",
+            endpoint=URL_SESSIONS_INVOICES_STATUS,
+            url=self.build_url(url=url),
+            headers={
+                "Accept": "application/json",
+                **(await self._auth_headers()),
+            },
+        )
+        logger.debug("Get invoice status response (%s): %s", response.status_code, response.text)
+        response.raise_for_status()
+        return SessionInvoiceStatusResponse.from_dict(response.json())
+
+    async def download_invoice(self, ksef_reference_number: str) -> bytes:
+        """Download invoice XML by KSEF reference number.
+
+        Parameters
+        ----------
+        ksef_reference_number : str
+            The KSEF reference number of the invoice to download.
+
+        Returns
+        -------
+        bytes
+            The invoice XML content.
+        """
+        url = URL_INVOICES_GET.format(ksef_reference_number=ksef_reference_number)
+        response = await self._request(
+            "GET",
+            endpoint=URL_INVOICES_GET,
+            url=self.build_url(url=url),
+            headers={
+                "Accept": "application/xml",
+                **(await self._auth_headers()),
+            },
+        )
+        logger.debug(
+            "Download invoice response (%s): %s bytes",
+            response.status_code,
+            len(response.content),
+        )
+        response.raise_for_status()
+        return response.content
@@ -0,0 +1,181 @@
+"""Building blocks shared by the asyncio variants of the authorization flows.
+
+Requires the optional ``httpx`` dependency (``pip install ksef[async]``).
+"""
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Any, AsyncIterator, Dict, List, Optional
+from urllib.parse import urljoin
+
+from ksef.auth.polling import DEFAULT_POLLING_STRATEGY, is_auth_completed
+from ksef.constants import (
+    DEFAULT_HEADERS,
+    URL_AUTH_CHALLENGE,
+    URL_AUTH_STATUS,
+    URL_AUTH_TOKEN_REDEEM,
+    URL_PUBLIC_KEY_CERTS,
+)
+from ksef.exceptions import AuthenticationError
+from ksef.models.responses.auth import AuthChallenge, AuthStatus, AuthTokens
+from ksef.polling import PollingStrategy
+from ksef.retry import DEFAULT_RETRY_POLICY, RetryPolicy
+from ksef.utils import response_to_exception
+
+try:
+    from httpx import AsyncClient as AsyncSession
+    from httpx import Response as AsyncResponse
+except ImportError:  # pragma: no cover - httpx is an optional dependency
+    AsyncSession = Any  # type: ignore[misc,assignment]
+    AsyncResponse = Any  # type: ignore[misc,assignment]
+
+__all__ = [
+    "AsyncResponse",
+    "AsyncSession",
+    "fetch_public_key_certificates",
+    "get_challenge",
+    "poll_auth_status",
+    "redeem_token",
+    "request",
+    "session_scope",
+]
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def session_scope(
+    session: Optional[AsyncSession], timeout: float
+) -> AsyncIterator[AsyncSession]:
+    """Yield the given async HTTP session, or a temporary one closed on exit."""
+    if session is not None:
+        yield session
+        return
+
+    try:
+        import httpx
+    except ImportError as exc:  # pragma: no cover - depends on the environment
+        raise ImportError(
+            "Async authorization requires httpx, install it with `pip install ksef[async]`."
+        ) from exc
+
+    async with httpx.AsyncClient(timeout=timeout) as temporary_session:
+        yield temporary_session
+
+
+async def request(  # noqa: PLR0913
+    session: AsyncSession,
+    method: str,
+    url: str,
+    timeout: float,
+    retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+    idempotent: bool = False,
+    **kwargs: Any,
+) -> AsyncResponse:
+    """Send a request, retrying transient failures, and raise the matching KsefError."""
+    response = await retry_policy.call_async(
+        partial(session.request, method, url, timeout=timeout, **kwargs), idempotent=idempotent
+    )
+    logger.debug("%s %s response (%s): %s", method, url, response.status_code, response.text)
+    error = response_to_exception(response)
+    if error is not None:
+        raise error
+    return response
+
+
+async def fetch_public_key_certificates(
+    session: AsyncSession,
+    base_url: str,
+    timeout: float,
+    retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+) -> List[Dict[str, Any]]:
+    """Fetch the public key certificate listing."""
+    response = await request(
+        session,
+        "GET",
+        urljoin(base_url, URL_PUBLIC_KEY_CERTS),
+        timeout=timeout,
+        retry_policy=retry_policy,
+        idempotent=True,
+        headers=DEFAULT_HEADERS,
+    )
+    certs: List[Dict[str, Any]] = response.json()
+    return certs
+
+
+async def get_challenge(
+    session: AsyncSession,
+    base_url: str,
+    timeout: float,
+    retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+) -> AuthChallenge:
+    """Get the authorization challenge."""
+    response = await request(
+        session,
+        "POST",
+        urljoin(base_url, URL_AUTH_CHALLENGE),
+        timeout=timeout,
+        retry_policy=retry_policy,
+        idempotent=True,
+        headers=DEFAULT_HEADERS,
+        json={},
+    )
+    return AuthChallenge.from_dict(response.json())
+
+
+async def poll_auth_status(  # noqa: PLR0913
+    session: AsyncSession,
+    base_url: str,
+    timeout: float,
+    reference_number: str,
+    authentication_token: str,
+    polling: PollingStrategy = DEFAULT_POLLING_STRATEGY,
+    retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+) -> AuthStatus:
+    """Poll GET /auth/{referenceNumber} until authentication completes, without blocking."""
+    url = urljoin(base_url, URL_AUTH_STATUS.format(reference_number=reference_number))
+    started = polling.clock()
+    attempt = 0
+    while True:
+        response = await request(
+            session,
+            "GET",
+            url,
+            timeout=timeout,
+            retry_policy=retry_policy,
+            idempotent=True,
+            headers={**DEFAULT_HEADERS, "Authorization": f"Bearer {authentication_token}"},
+        )
+        status = AuthStatus.from_dict(response.json())
+        if is_auth_completed(status):
+            return status
+
+        delay = polling.next_delay(started, attempt, response)
+        if delay is None:
+            raise AuthenticationError(
+                f"Authentication polling timed out after {attempt + 1} attempts."
+            )
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+async def redeem_token(
+    session: AsyncSession,
+    base_url: str,
+    timeout: float,
+    authentication_token: str,
+    retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+) -> AuthTokens:
+    """Redeem authentication token for access/refresh tokens via POST /auth/token/redeem."""
+    response = await request(
+        session,
+        "POST",
+        urljoin(base_url, URL_AUTH_TOKEN_REDEEM),
+        timeout=timeout,
+        retry_policy=retry_policy,
+        idempotent=False,
+        headers={**DEFAULT_HEADERS, "Authorization": f"Bearer {authentication_token}"},
+        json={},
+    )
+    return AuthTokens.from_dict(response.json())
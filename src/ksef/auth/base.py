@@ -1,13 +1,55 @@
 """Base authorization class, used to define the API for all implementations."""
+import asyncio
+import logging
+import threading
 from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import Awaitable, Callable, Dict, Optional
+from urllib.parse import urljoin
 
-from ksef.models.responses.auth import AuthTokens
+import requests
+
+from ksef.auth.async_flow import AsyncSession
+from ksef.auth.store import TokenStore
+from ksef.constants import DEFAULT_HEADERS, TIMEOUT, URL_AUTH_TOKEN_REFRESH, Environment
+from ksef.exceptions import AuthenticationError, KsefError
+from ksef.models.responses.auth import AuthTokens, RefreshedAccessToken, TokenInfo
+from ksef.retry import DEFAULT_RETRY_POLICY, RetryPolicy
+from ksef.utils import response_to_exception
+
+logger = logging.getLogger(__name__)
+
+# Refresh the access token this long before it expires
+REFRESH_MARGIN = timedelta(seconds=60)
 
 
 class Authorization(ABC):
     """Base authorization class for KSEF API v2."""
 
     _tokens: AuthTokens
+    environment: Environment
+    timeout: float = TIMEOUT
+    retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY
+    # NIP of the context the current tokens were issued for
+    nip: Optional[str] = None
+    token_store: Optional[TokenStore] = None
+
+    # The state below is created on first use, so subclasses need not call `__init__`;
+    # `dict.setdefault` is atomic, so concurrent first uses get the same object
+
+    @property
+    def _refresh_lock(self) -> threading.Lock:
+        lock: threading.Lock = self.__dict__.setdefault("_refresh_lock_", threading.Lock())
+        return lock
+
+    @property
+    def _authorizing(self) -> Dict[str, "asyncio.Future[AuthTokens]"]:
+        """Asyncio authorization flows in progress, by NIP."""
+        authorizing: Dict[str, "asyncio.Future[AuthTokens]"] = self.__dict__.setdefault(
+            "_authorizing_", {}
+        )
+        return authorizing
 
     @abstractmethod
     def authorize(self, nip: str) -> AuthTokens:
@@ -20,6 +62,199 @@ class Authorization(ABC):
         """
         ...
 
+    async def authorize_async(self, nip: str, session: Optional[AsyncSession] = None) -> AuthTokens:
+        """Perform the full authorization flow without blocking the event loop.
+
+        Implementations that do not provide a native asyncio flow fall back to running
+        `authorize` in a worker thread.
+
+        Parameters
+        ----------
+        nip : str
+            The NIP (tax identification number) to authorize with.
+        session : httpx.AsyncClient, optional
+            Async HTTP session to reuse; a temporary one is created when omitted.
+        """
+        return await asyncio.to_thread(self.authorize, nip)
+
+    def _credential_fingerprint(self) -> str:
+        """Return a stable, non-secret identifier of the credential used to authorize.
+
+        Only used to key the tokens in a `token_store`; implementations supporting one must
+        override it.
+        """
+        raise TypeError(f"{type(self).__name__} does not support a token store.")
+
+    def _token_store_key(self, nip: str) -> str:
+        return f"{self.environment.name}:{nip}:{self._credential_fingerprint()}"
+
+    def _load_stored_tokens(self, key: str) -> Optional[AuthTokens]:
+        """Return stored tokens that can still be used (directly or to refresh), or None."""
+        if self.token_store is None:
+            return None
+        tokens = self.token_store.load(key)
+        if tokens is None:
+            return None
+        threshold = datetime.now(tz=timezone.utc) + REFRESH_MARGIN
+        for token in (tokens.refresh_token, tokens.access_token):
+            expires_at = token.expires_at
+            if expires_at is not None and expires_at > threshold:
+                return tokens
+        return None
+
+    def _authorize_with_store(self, nip: str, flow: Callable[[str], AuthTokens]) -> AuthTokens:
+        """Reuse stored tokens for the NIP, running the authorization `flow` only without any.
+
+        The store's lock is held meanwhile, so processes sharing the store authorize once.
+        """
+        if self.token_store is None:
+            return flow(nip)
+
+        key = self._token_store_key(nip)
+        with self.token_store.lock(key):
+            tokens = self._load_stored_tokens(key)
+            if tokens is None:
+                tokens = flow(nip)
+                self.token_store.save(key, tokens)
+            else:
+                logger.debug("Reusing stored tokens for %s", nip)
+        self._tokens = tokens
+        self.nip = nip
+        return tokens
+
+    async def _authorize_with_store_async(
+        self, nip: str, flow: Callable[[], Awaitable[AuthTokens]]
+    ) -> AuthTokens:
+        """Asyncio variant of `_authorize_with_store`.
+
+        Concurrent calls for the same NIP on one event loop share a single authorization:
+        the first one runs the flow, the others await its result.
+        """
+        in_flight = self._authorizing.get(nip)
+        if in_flight is None or in_flight.get_loop() is not asyncio.get_running_loop():
+            in_flight = asyncio.ensure_future(self._authorize_with_store_once_async(nip, flow))
+            self._authorizing[nip] = in_flight
+            in_flight.add_done_callback(partial(self._authorization_done, nip))
+        # A cancelled caller must not cancel the flow the other callers are waiting for
+        return await asyncio.shield(in_flight)
+
+    def _authorization_done(self, nip: str, future: "asyncio.Future[AuthTokens]") -> None:
+        if self._authorizing.get(nip) is future:
+            del self._authorizing[nip]
+
+    async def _authorize_with_store_once_async(
+        self, nip: str, flow: Callable[[], Awaitable[AuthTokens]]
+    ) -> AuthTokens:
+        if self.token_store is None:
+            return await flow()
+
+        key = self._token_store_key(nip)
+        # The store's lock may block on another process, so it is taken in a worker thread
+        lock = self.token_store.lock(key)
+        await asyncio.to_thread(lock.__enter__)
+        try:
+            tokens = await asyncio.to_thread(self._load_stored_tokens, key)
+            if tokens is None:
+                tokens = await flow()
+                await asyncio.to_thread(self.token_store.save, key, tokens)
+            else:
+                logger.debug("Reusing stored tokens for %s", nip)
+        finally:
+            await asyncio.to_thread(lock.__exit__, None, None, None)
+        self._tokens = tokens
+        self.nip = nip
+        return tokens
+
+    def _redeem_refresh_token(self, refresh_token: str) -> TokenInfo:
+        """Exchange the refresh token for a new access token via POST /auth/token/refresh."""
+        response = self.retry_policy.call(
+            partial(
+                requests.request,
+                "POST",
+                urljoin(self.environment.value, URL_AUTH_TOKEN_REFRESH),
+                timeout=self.timeout,
+                headers={**DEFAULT_HEADERS, "Authorization": f"Bearer {refresh_token}"},
+                json={},
+            ),
+            idempotent=True,
+        )
+        logger.debug("Token refresh response (%s): %s", response.status_code, response.text)
+        error = response_to_exception(response)
+        if error is not None:
+            raise error
+        return RefreshedAccessToken.from_dict(response.json()).access_token
+
+    def _needs_refresh(self, now: datetime) -> bool:
+        expires_at = self._tokens.access_token.expires_at
+        return expires_at is not None and expires_at - REFRESH_MARGIN <= now
+
+    def _redeem(self) -> Optional[AuthTokens]:
+        """Redeem the refresh token, returning None when a full re-authorization is needed."""
+        refresh_token = self._tokens.refresh_token
+        expires_at = refresh_token.expires_at
+        if expires_at is not None and expires_at <= datetime.now(tz=timezone.utc):
+            return None
+        try:
+            access_token = self._redeem_refresh_token(refresh_token.token)
+        except KsefError as error:
+            if self.nip is None:
+                raise
+            logger.debug("Token refresh failed, re-authorizing: %s", error)
+            return None
+        return AuthTokens(access_token=access_token, refresh_token=refresh_token)
+
+    def _refresh_with_store(self, token_store: TokenStore, key: str) -> Optional[AuthTokens]:
+        """Refresh the tokens stored under the key; the store's lock must be held."""
+        # Another process sharing the store may have refreshed the token already
+        stored = self._load_stored_tokens(key)
+        if stored is not None and stored != self._tokens:
+            self._tokens = stored
+            if not self._needs_refresh(datetime.now(tz=timezone.utc)):
+                return stored
+
+        tokens = self._redeem()
+        if tokens is None:
+            token_store.delete(key)
+        else:
+            token_store.save(key, tokens)
+        return tokens
+
+    def refresh(self) -> AuthTokens:
+        """Replace the access token with a new one, without a full re-authorization.
+
+        Falls back to `authorize` when the refresh token has expired or was rejected. With a
+        token store, its lock is held meanwhile, so processes sharing it refresh once.
+        """
+        if self.token_store is None or self.nip is None:
+            tokens = self._redeem()
+        else:
+            key = self._token_store_key(self.nip)
+            with self.token_store.lock(key):
+                tokens = self._refresh_with_store(self.token_store, key)
+        if tokens is not None:
+            self._tokens = tokens
+            return tokens
+
+        if self.nip is None:
+            raise AuthenticationError("Refresh token expired and no NIP to re-authorize with.")
+        # Authorizing takes the store's lock itself, so it must run after releasing it
+        return self.authorize(self.nip)
+
     def get_access_token(self) -> str:
-        """Return the current access token for API calls."""
+        """Return a valid access token for API calls, refreshing it shortly before expiry.
+
+        Concurrent callers share a single refresh: the first one refreshes while the others
+        wait and reuse the result.
+        """
+        if self._needs_refresh(datetime.now(tz=timezone.utc)):
+            with self._refresh_lock:
+                # Another thread may have refreshed the token while we were waiting
+                if self._needs_refresh(datetime.now(tz=timezone.utc)):
+                    self.refresh()
+        return self._tokens.access_token.token
+
+    async def get_access_token_async(self) -> str:
+        """Return a valid access token, refreshing it in a worker thread when needed."""
+        if self._needs_refresh(datetime.now(tz=timezone.utc)):
+            return await asyncio.to_thread(self.get_access_token)
         return self._tokens.access_token.token
@@ -0,0 +1,59 @@
+"""Polling of the authorization status."""
+import logging
+from typing import Callable
+
+import requests
+
+from ksef.exceptions import AuthenticationError
+from ksef.models.responses.auth import AuthStatus
+from ksef.polling import PollingStrategy
+from ksef.utils import response_to_exception
+
+logger = logging.getLogger(__name__)
+
+AUTH_STATUS_SUCCESS = 200
+# Status codes from 400 up mean the authentication has failed for good
+AUTH_STATUS_FAILURE = 400
+
+
+DEFAULT_POLLING_STRATEGY = PollingStrategy()
+
+
+def is_auth_completed(status: AuthStatus) -> bool:
+    """Return whether authentication has completed, raising AuthenticationError if it failed."""
+    if status.status.code == AUTH_STATUS_SUCCESS:
+        return True
+    if status.status.code >= AUTH_STATUS_FAILURE:
+        raise AuthenticationError(
+            f"Authentication failed ({status.status.code}): {status.status.description}"
+        )
+    logger.debug(
+        "Authentication in progress: code=%d, desc=%s",
+        status.status.code,
+        status.status.description,
+    )
+    return False
+
+
+def poll_auth_status(
+    send: Callable[[], requests.Response], strategy: PollingStrategy
+) -> AuthStatus:
+    """Call `send` (a status request) until authentication completes or the deadline passes."""
+    started = strategy.clock()
+    attempt = 0
+    while True:
+        response = send()
+        error = response_to_exception(response)
+        if error is not None:
+            raise error
+        status = AuthStatus.from_dict(response.json())
+        if is_auth_completed(status):
+            return status
+
+        delay = strategy.next_delay(started, attempt, response)
+        if delay is None:
+            raise AuthenticationError(
+                f"Authentication polling timed out after {attempt + 1} attempts."
+            )
+        strategy.sleep(delay)
+        attempt += 1
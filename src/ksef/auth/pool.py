@@ -0,0 +1,184 @@
+"""Pool of authorizations for many NIP contexts (tenants)."""
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
+from ksef.auth.base import Authorization
+from ksef.models.responses.auth import AuthTokens
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_IDLE = 60 * 60  # seconds
+DEFAULT_WARM_UP_WORKERS = 8
+
+
+@dataclass
+class _Tenant:
+    authorization: Authorization
+    last_used: float
+
+
+class AuthorizationPool:
+    """Authorizations for many NIPs, created and authorized lazily on first use.
+
+    Every tenant has its own authorization object, so tokens are tracked and refreshed per
+    NIP. Tenants not used for `max_idle` seconds are evicted and transparently authorized
+    again on their next use (cheaply, if the factory configures a token store).
+
+    Parameters
+    ----------
+    factory : Callable[[str], Authorization]
+        Creates the (not yet authorized) authorization for a NIP, e.g.
+        ``lambda nip: TokenAuthorization(tokens[nip], environment)``.
+    max_idle : float, optional
+        Seconds after which an unused tenant is evicted; never when None.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[str], Authorization],
+        max_idle: Optional[float] = DEFAULT_MAX_IDLE,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.factory = factory
+        self.max_idle = max_idle
+        self._clock = clock
+        self._tenants: Dict[str, _Tenant] = {}
+        self._lock = threading.Lock()
+        self._tenant_locks: Dict[str, threading.Lock] = {}
+
+    def __contains__(self, nip: object) -> bool:  # noqa: D105
+        return nip in self._tenants
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self._tenants)
+
+    def get(self, nip: str) -> Authorization:
+        """Return the authorization of the NIP, authorizing it first if needed.
+
+        Concurrent calls for the same NIP run a single authorization flow; calls for
+        different NIPs do not wait for each other.
+        """
+        self.evict_idle()
+        tenant = self._tenants.get(nip)
+        while tenant is None:
+            with self._lock:
+                tenant_lock = self._tenant_locks.setdefault(nip, threading.Lock())
+            with tenant_lock:
+                with self._lock:
+                    # Pruned by an eviction before we acquired it, start over with a new one
+                    if self._tenant_locks.get(nip) is not tenant_lock:
+                        continue
+                tenant = self._tenants.get(nip)
+                if tenant is None:
+                    authorization = self.factory(nip)
+                    authorization.authorize(nip)
+                    tenant = _Tenant(authorization=authorization, last_used=self._clock())
+                    with self._lock:
+                        self._tenants[nip] = tenant
+        tenant.last_used = self._clock()
+        return tenant.authorization
+
+    def get_authorized(self, nip: str) -> Optional[Authorization]:
+        """Return the authorization of the NIP if it is already authorized, else None.
+
+        Unlike `get`, never runs an authorization flow, so it is safe to call from an
+        event loop.
+        """
+        tenant = self._tenants.get(nip)
+        if tenant is None:
+            return None
+        tenant.last_used = self._clock()
+        return tenant.authorization
+
+    def get_access_token(self, nip: str) -> str:
+        """Return a valid access token of the NIP."""
+        return self.get(nip).get_access_token()
+
+    def warm_up(
+        self, nips: Iterable[str], max_workers: int = DEFAULT_WARM_UP_WORKERS
+    ) -> Dict[str, Exception]:
+        """Authorize the NIPs in parallel, with at most `max_workers` flows at a time.
+
+        Returns
+        -------
+        dict[str, Exception]
+            The NIPs that failed to authorize, with the error.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {nip: executor.submit(self.get, nip) for nip in nips}
+        errors: Dict[str, Exception] = {}
+        for nip, future in futures.items():
+            error = future.exception()
+            if isinstance(error, Exception):
+                logger.debug("Warm-up of %s failed: %s", nip, error)
+                errors[nip] = error
+        return errors
+
+    def evict(self, nip: str) -> None:
+        """Forget the tenant's authorization."""
+        with self._lock:
+            self._remove(nip)
+
+    def evict_idle(self) -> List[str]:
+        """Evict tenants unused for longer than `max_idle` and return their NIPs."""
+        if self.max_idle is None:
+            return []
+        threshold = self._clock() - self.max_idle
+        with self._lock:
+            idle = [nip for nip, tenant in self._tenants.items() if tenant.last_used < threshold]
+            for nip in idle:
+                self._remove(nip)
+        if idle:
+            logger.debug("Evicted idle tenants: %s", idle)
+        return idle
+
+    def _remove(self, nip: str) -> None:
+        """Forget the tenant and its lock; `_lock` must be held."""
+        self._tenants.pop(nip, None)
+        tenant_lock = self._tenant_locks.get(nip)
+        # A held lock means the tenant is being authorized again right now. A caller that
+        # fetched the lock but did not acquire it yet notices the removal in `get`.
+        if tenant_lock is not None and tenant_lock.acquire(blocking=False):
+            del self._tenant_locks[nip]
+            tenant_lock.release()
+
+
+class PooledAuthorization(Authorization):
+    """Authorization of a single NIP backed by an `AuthorizationPool`.
+
+    Lets a regular client act on behalf of one tenant of the pool. Tokens are looked up in
+    the pool on every call, so eviction and re-authorization are transparent.
+    """
+
+    def __init__(self, pool: AuthorizationPool, nip: str):
+        super().__init__()
+        self.pool = pool
+        self.nip = nip
+
+    def authorize(self, nip: str) -> AuthTokens:
+        """Authorize the NIP in the pool (a no-op if it is already authorized)."""
+        return self.pool.get(nip)._tokens
+
+    def _credential_fingerprint(self) -> str:
+        """Return the fingerprint of the pooled authorization of the NIP."""
+        return self.pool.get(str(self.nip))._credential_fingerprint()
+
+    def refresh(self) -> AuthTokens:
+        """Refresh the tokens of the NIP's authorization in the pool."""
+        return self.pool.get(str(self.nip)).refresh()
+
+    def get_access_token(self) -> str:
+        """Return a valid access token of the NIP from the pool."""
+        return self.pool.get_access_token(str(self.nip))
+
+    async def get_access_token_async(self) -> str:
+        """Return a valid access token of the NIP, authorizing it in a worker thread if needed."""
+        authorization = self.pool.get_authorized(str(self.nip))
+        if authorization is None:
+            return await asyncio.to_thread(self.get_access_token)
+        return await authorization.get_access_token_async()
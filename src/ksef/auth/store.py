@@ -0,0 +1,134 @@
+"""Persistent storage of authorization tokens, shared between processes."""
+import base64
+import hashlib
+import json
+import sys
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+from pathlib import Path
+from typing import IO, Any, ContextManager, Optional, Union
+
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+from ksef.models.responses.auth import AuthTokens
+from ksef.utils import write_atomic
+
+
+class TokenStore(ABC):
+    """Storage of access/refresh tokens, keyed by environment, NIP and credential."""
+
+    @abstractmethod
+    def load(self, key: str) -> Optional[AuthTokens]:
+        """Return the tokens stored under the key, or None."""
+        ...
+
+    @abstractmethod
+    def save(self, key: str, tokens: AuthTokens) -> None:
+        """Store the tokens under the key, replacing any previous ones."""
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove the tokens stored under the key, if any."""
+        ...
+
+    def lock(self, key: str) -> ContextManager[Any]:
+        """Return a context manager holding an exclusive lock for the key.
+
+        It is held while authorizing to store new tokens. Stores shared between processes
+        should override this, so that only one process runs the authorization flow while
+        the others wait and reuse its tokens.
+        """
+        return nullcontext()
+
+
+if sys.platform == "win32":  # pragma: no cover - depends on the platform
+    import msvcrt
+
+    def _lock_file(file: IO[bytes]) -> None:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+
+    def _unlock_file(file: IO[bytes]) -> None:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _lock_file(file: IO[bytes]) -> None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+
+    def _unlock_file(file: IO[bytes]) -> None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+class _FileLock:
+    """Exclusive OS-level lock on a file, held while the context is entered."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file: Optional[IO[bytes]] = None
+
+    def __enter__(self) -> None:
+        self._file = self.path.open("a+b")
+        _lock_file(self._file)
+
+    def __exit__(self, *exc_info: object) -> None:
+        if self._file is not None:
+            _unlock_file(self._file)
+            self._file.close()
+            self._file = None
+
+
+class FileTokenStore(TokenStore):
+    """Token store keeping one encrypted file per key in a directory.
+
+    Files are encrypted with Fernet (AES-128-CBC with HMAC-SHA256) and replaced atomically.
+    `lock` takes an exclusive OS-level lock on a per-key lock file, so the store can be
+    shared by any number of processes on one machine.
+
+    Parameters
+    ----------
+    directory : Path or str
+        Directory for the token files; created if missing.
+    secret : bytes
+        Secret the encryption key is derived from. Keep it out of the token directory,
+        e.g. in an environment variable or a secrets manager.
+    """
+
+    def __init__(self, directory: Union[Path, str], secret: bytes):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True, mode=0o700)
+        key = HKDF(
+            algorithm=hashes.SHA256(), length=32, salt=None, info=b"ksef-token-store"
+        ).derive(secret)
+        self._fernet = Fernet(base64.urlsafe_b64encode(key))
+
+    def _path(self, key: str, suffix: str) -> Path:
+        name = hashlib.sha256(key.encode()).hexdigest()
+        return self.directory / f"{name}{suffix}"
+
+    def load(self, key: str) -> Optional[AuthTokens]:
+        """Return the tokens stored under the key, or None if missing or unreadable."""
+        try:
+            encrypted = self._path(key, ".token").read_bytes()
+            data = json.loads(self._fernet.decrypt(encrypted))
+        except (FileNotFoundError, InvalidToken, ValueError):
+            return None
+        return AuthTokens.from_dict(data)
+
+    def save(self, key: str, tokens: AuthTokens) -> None:
+        """Encrypt and store the tokens, atomically replacing any previous file."""
+        encrypted = self._fernet.encrypt(json.dumps(tokens.to_dict()).encode())
+        write_atomic(self._path(key, ".token"), encrypted)
+
+    def delete(self, key: str) -> None:
+        """Remove the token file of the key, if any."""
+        self._path(key, ".token").unlink(missing_ok=True)
+
+    def lock(self, key: str) -> ContextManager[Any]:
+        """Return a context manager holding an exclusive, cross-process lock for the key."""
+        return _FileLock(self._path(key, ".lock"))
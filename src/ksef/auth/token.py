@@ -1,17 +1,26 @@
 """KSeF Token-based authorization implementation for API v2."""
 import base64
 import copy
+import hashlib
 import logging
-import time
-from typing import Any, Dict, List, Mapping, cast
+from functools import partial
+from typing import Any, Dict, List, Mapping, Optional
 from urllib.parse import urljoin
 
 import requests
-from cryptography import x509
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.asymmetric import padding, rsa
 
+from ksef.auth import async_flow
+from ksef.auth.async_flow import AsyncSession
 from ksef.auth.base import Authorization
+from ksef.auth.polling import DEFAULT_POLLING_STRATEGY, poll_auth_status
+from ksef.auth.store import TokenStore
+from ksef.certificates import (
+    USAGE_KSEF_TOKEN_ENCRYPTION,
+    PublicKeyCertificateCache,
+    default_certificate_cache,
+)
 from ksef.constants import (
     DEFAULT_HEADERS,
     TIMEOUT,
@@ -23,28 +32,41 @@ from ksef.constants import (
     Environment,
 )
 from ksef.exceptions import AuthenticationError
-from ksef.models.responses.auth import AuthChallenge, AuthStatus, AuthTokens, SignatureResponse
+from ksef.models.responses.auth import (
+    AuthChallenge,
+    AuthStatus,
+    AuthTokens,
+    SignatureResponse,
+)
+from ksef.polling import PollingStrategy
+from ksef.retry import DEFAULT_RETRY_POLICY, RetryPolicy
 from ksef.utils import response_to_exception
 
 logger = logging.getLogger(__name__)
 
-_POLL_INTERVAL = 1.0
-_POLL_MAX_ATTEMPTS = 60
-
 
 class TokenAuthorization(Authorization):
     """KSeF Token-based authorization for API v2."""
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         token: str,
         environment: Environment = Environment.PRODUCTION,
         timeout: int = TIMEOUT,
+        certificate_cache: PublicKeyCertificateCache = default_certificate_cache,
+        retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+        token_store: Optional[TokenStore] = None,
+        polling: PollingStrategy = DEFAULT_POLLING_STRATEGY,
     ):
+        super().__init__()
         self.token = token
         self.environment = environment
         self.base_url = environment.value
         self.timeout = timeout
+        self.retry_policy = retry_policy
+        self.token_store = token_store
+        self.polling = polling
+        self.certificate_cache = certificate_cache
 
     def authorize(self, nip: str) -> AuthTokens:
         """Perform the full v2 token authorization flow.
@@ -54,6 +76,10 @@ class TokenAuthorization(Authorization):
         nip : str
             The NIP (tax identification number) to authorize with.
         """
+        return self._authorize_with_store(nip, self._authorize)
+
+    def _authorize(self, nip: str) -> AuthTokens:
+        """Run the authorization flow, without consulting the token store."""
         public_key = self._fetch_encryption_key()
         challenge = self._get_challenge()
         encrypted_token = self._encrypt_token(
@@ -73,11 +99,85 @@ class TokenAuthorization(Authorization):
             authentication_token=signature_response.authentication_token.token,
         )
         self._tokens = tokens
+        self.nip = nip
         return tokens
 
-    def get_access_token(self) -> str:
-        """Return the current access token for API calls."""
-        return self._tokens.access_token.token
+    async def authorize_async(self, nip: str, session: Optional[AsyncSession] = None) -> AuthTokens:
+        """Perform the full v2 token authorization flow without blocking the event loop.
+
+        Parameters
+        ----------
+        nip : str
+            The NIP (tax identification number) to authorize with.
+        session : httpx.AsyncClient, optional
+            Async HTTP session to reuse; a temporary one is created when omitted.
+        """
+
+        async def flow() -> AuthTokens:
+            async with async_flow.session_scope(session, timeout=self.timeout) as http:
+
+                async def fetch_certs() -> List[Dict[str, Any]]:
+                    return await async_flow.fetch_public_key_certificates(
+                        http,
+                        self.base_url,
+                        timeout=self.timeout,
+                        retry_policy=self.retry_policy,
+                    )
+
+                public_key = await self.certificate_cache.get_or_fetch_async(
+                    self.environment, USAGE_KSEF_TOKEN_ENCRYPTION, fetch_certs
+                )
+                if public_key is None:
+                    raise AuthenticationError(
+                        "No KsefTokenEncryption public key found in server response."
+                    )
+                challenge = await async_flow.get_challenge(
+                    http,
+                    self.base_url,
+                    timeout=self.timeout,
+                    retry_policy=self.retry_policy,
+                )
+                encrypted_token = self._encrypt_token(
+                    challenge=challenge,
+                    public_key=public_key,
+                )
+                response = await async_flow.request(
+                    http,
+                    "POST",
+                    self.build_url(URL_AUTH_KSEF_TOKEN),
+                    timeout=self.timeout,
+                    retry_policy=self.retry_policy,
+                    headers=self.build_headers(),
+                    json=self._build_ksef_token_payload(
+                        challenge=challenge, nip=nip, encrypted_token=encrypted_token
+                    ),
+                )
+                signature_response = SignatureResponse.from_dict(response.json())
+                await async_flow.poll_auth_status(
+                    http,
+                    self.base_url,
+                    timeout=self.timeout,
+                    retry_policy=self.retry_policy,
+                    reference_number=signature_response.reference_number,
+                    authentication_token=signature_response.authentication_token.token,
+                    polling=self.polling,
+                )
+                tokens = await async_flow.redeem_token(
+                    http,
+                    self.base_url,
+                    timeout=self.timeout,
+                    retry_policy=self.retry_policy,
+                    authentication_token=signature_response.authentication_token.token,
+                )
+            self._tokens = tokens
+            self.nip = nip
+            return tokens
+
+        return await self._authorize_with_store_async(nip, flow)
+
+    def _credential_fingerprint(self) -> str:
+        """Return the SHA-256 digest of the KSeF token."""
+        return hashlib.sha256(self.token.encode()).hexdigest()
 
     def build_url(self, url: str) -> str:
         """Construct a full URL."""
@@ -90,36 +190,44 @@ class TokenAuthorization(Authorization):
         headers.update(optional)
         return headers
 
-    def _fetch_encryption_key(self) -> rsa.RSAPublicKey:
-        """Fetch public key certificates and find the KsefTokenEncryption key."""
-        response = requests.get(
-            url=self.build_url(URL_PUBLIC_KEY_CERTS),
+    def _request(self, method: str, url: str, idempotent: bool, **kwargs: Any) -> requests.Response:
+        """Send a request, retrying transient failures according to the retry policy."""
+        return self.retry_policy.call(
+            partial(requests.request, method, url, timeout=self.timeout, **kwargs),
+            idempotent=idempotent,
+        )
+
+    def _fetch_public_key_certs(self) -> List[Dict[str, Any]]:
+        """Download the public key certificate listing."""
+        response = self._request(
+            "GET",
+            self.build_url(URL_PUBLIC_KEY_CERTS),
+            idempotent=True,
             headers=self.build_headers(),
-            timeout=self.timeout,
         )
         error = response_to_exception(response)
         if error is not None:
             raise error
-
         certs: List[Dict[str, Any]] = response.json()
-        for cert in certs:
-            usages = cert.get("usage", [])
-            if "KsefTokenEncryption" in usages:
-                cert_b64 = cert["certificate"]
-                cert_der = base64.b64decode(cert_b64)
-                x509_cert = x509.load_der_x509_certificate(cert_der)
-                public_key = x509_cert.public_key()
-                return cast(rsa.RSAPublicKey, public_key)
+        return certs
 
-        raise AuthenticationError("No KsefTokenEncryption public key found in server response.")
+    def _fetch_encryption_key(self) -> rsa.RSAPublicKey:
+        """Get the KsefTokenEncryption public key, downloading it only on a cache miss."""
+        public_key = self.certificate_cache.get_or_fetch(
+            self.environment, USAGE_KSEF_TOKEN_ENCRYPTION, self._fetch_public_key_certs
+        )
+        if public_key is None:
+            raise AuthenticationError("No KsefTokenEncryption public key found in server response.")
+        return public_key
 
     def _get_challenge(self) -> AuthChallenge:
         """Get the authorization challenge."""
-        response = requests.post(
-            url=self.build_url(URL_AUTH_CHALLENGE),
+        response = self._request(
+            "POST",
+            self.build_url(URL_AUTH_CHALLENGE),
+            idempotent=True,
             headers=self.build_headers(),
             json={},
-            timeout=self.timeout,
         )
         logger.debug(
             "Authorization challenge response (%s): %s", response.status_code, response.text
@@ -147,14 +255,12 @@ class TokenAuthorization(Authorization):
         )
         return base64.b64encode(encrypted).decode("utf-8")
 
-    def _init_ksef_token(
-        self,
-        challenge: AuthChallenge,
-        nip: str,
-        encrypted_token: str,
-    ) -> SignatureResponse:
-        """Submit encrypted token to POST /auth/ksef-token."""
-        payload = {
+    @staticmethod
+    def _build_ksef_token_payload(
+        challenge: AuthChallenge, nip: str, encrypted_token: str
+    ) -> Dict[str, Any]:
+        """Build the request body for POST /auth/ksef-token."""
+        return {
             "challenge": challenge.challenge,
             "contextIdentifier": {
                 "type": "Nip",
@@ -162,11 +268,22 @@ class TokenAuthorization(Authorization):
             },
             "encryptedToken": encrypted_token,
         }
-        response = requests.post(
-            url=self.build_url(URL_AUTH_KSEF_TOKEN),
+
+    def _init_ksef_token(
+        self,
+        challenge: AuthChallenge,
+        nip: str,
+        encrypted_token: str,
+    ) -> SignatureResponse:
+        """Submit encrypted token to POST /auth/ksef-token."""
+        response = self._request(
+            "POST",
+            self.build_url(URL_AUTH_KSEF_TOKEN),
+            idempotent=False,
             headers=self.build_headers(),
-            json=payload,
-            timeout=self.timeout,
+            json=self._build_ksef_token_payload(
+                challenge=challenge, nip=nip, encrypted_token=encrypted_token
+            ),
         )
         logger.debug("Init ksef-token response (%s): %s", response.status_code, response.text)
         error = response_to_exception(response)
@@ -181,45 +298,29 @@ class TokenAuthorization(Authorization):
     ) -> AuthStatus:
         """Poll GET /auth/{referenceNumber} until authentication completes."""
         url = self.build_url(URL_AUTH_STATUS.format(reference_number=reference_number))
-        for attempt in range(_POLL_MAX_ATTEMPTS):
-            response = requests.get(
-                url=url,
-                headers={
-                    **self.build_headers(),
-                    "Authorization": f"Bearer {authentication_token}",
-                },
-                timeout=self.timeout,
-            )
-            error = response_to_exception(response)
-            if error is not None:
-                raise error
-
-            status = AuthStatus.from_dict(response.json())
-            if status.status.code == 200:  # noqa: PLR2004
-                return status
-
-            logger.debug(
-                "Auth status poll attempt %d: code=%d, desc=%s",
-                attempt + 1,
-                status.status.code,
-                status.status.description,
-            )
-            time.sleep(_POLL_INTERVAL)
-
-        raise AuthenticationError(
-            f"Authentication polling timed out after {_POLL_MAX_ATTEMPTS} attempts."
+        send = partial(
+            self._request,
+            "GET",
+            url,
+            idempotent=True,
+            headers={
+                **self.build_headers(),
+                "Authorization": f"Bearer {authentication_token}",
+            },
         )
+        return poll_auth_status(send, self.polling)
 
     def _redeem_token(self, authentication_token: str) -> AuthTokens:
         """Redeem authentication token for access/refresh tokens via POST /auth/token/redeem."""
-        response = requests.post(
-            url=self.build_url(URL_AUTH_TOKEN_REDEEM),
+        response = self._request(
+            "POST",
+            self.build_url(URL_AUTH_TOKEN_REDEEM),
+            idempotent=False,
             headers={
                 **self.build_headers(),
                 "Authorization": f"Bearer {authentication_token}",
             },
             json={},
-            timeout=self.timeout,
         )
         logger.debug("Token redeem response (%s): %s", response.status_code, response.text)
         error = response_to_exception(response)
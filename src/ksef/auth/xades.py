@@ -1,11 +1,12 @@
 """XAdES Signature-based authorization implementation for API v2."""
+import asyncio
 import base64
 import copy
 import hashlib
 import logging
-import time
 import uuid
-from typing import Mapping, Optional, Tuple
+from functools import partial
+from typing import Any, Mapping, Optional, Tuple
 from urllib.parse import urljoin
 
 import requests
@@ -15,7 +16,11 @@ from cryptography.hazmat.primitives.asymmetric import padding as asym_padding
 from cryptography.x509 import Certificate, load_der_x509_certificate, load_pem_x509_certificate
 from lxml import etree
 
+from ksef.auth import async_flow
+from ksef.auth.async_flow import AsyncSession
 from ksef.auth.base import Authorization
+from ksef.auth.polling import DEFAULT_POLLING_STRATEGY, poll_auth_status
+from ksef.auth.store import TokenStore
 from ksef.constants import (
     DEFAULT_HEADERS,
     TIMEOUT,
@@ -26,13 +31,18 @@ from ksef.constants import (
     Environment,
 )
 from ksef.exceptions import AuthenticationError
-from ksef.models.responses.auth import AuthChallenge, AuthStatus, AuthTokens, SignatureResponse
+from ksef.models.responses.auth import (
+    AuthChallenge,
+    AuthStatus,
+    AuthTokens,
+    SignatureResponse,
+)
+from ksef.polling import PollingStrategy
+from ksef.retry import DEFAULT_RETRY_POLICY, RetryPolicy
 from ksef.utils import response_to_exception
 
 logger = logging.getLogger(__name__)
 
-_POLL_INTERVAL = 1.0
-_POLL_MAX_ATTEMPTS = 60
 
 _NS_DS = "http://www.w3.org/2000/09/xmldsig#"
 _NS_XADES = "http://uri.etsi.org/01903/v1.3.2#"
@@ -129,13 +139,20 @@ class XadesAuthorization(Authorization):
         environment: Environment = Environment.PRODUCTION,
         timeout: int = TIMEOUT,
         key_password: Optional[bytes] = None,
+        retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+        token_store: Optional[TokenStore] = None,
+        polling: PollingStrategy = DEFAULT_POLLING_STRATEGY,
     ):
+        super().__init__()
         self._signing_cert = signing_cert
         self._private_key_bytes = private_key
         self._key_password = key_password
         self.environment = environment
         self.base_url = environment.value
         self.timeout = timeout
+        self.retry_policy = retry_policy
+        self.token_store = token_store
+        self.polling = polling
 
     def authorize(self, nip: str) -> AuthTokens:
         """Perform the full v2 XAdES authorization flow.
@@ -145,6 +162,10 @@ class XadesAuthorization(Authorization):
         nip : str
             The NIP (tax identification number) to authorize with.
         """
+        return self._authorize_with_store(nip, self._authorize)
+
+    def _authorize(self, nip: str) -> AuthTokens:
+        """Run the authorization flow, without consulting the token store."""
         challenge = self._get_challenge()
         signed_xml = self._build_and_sign_request(challenge=challenge, nip=nip)
         signature_response = self._submit_xades(signed_xml=signed_xml)
@@ -156,8 +177,69 @@ class XadesAuthorization(Authorization):
             authentication_token=signature_response.authentication_token.token,
         )
         self._tokens = tokens
+        self.nip = nip
         return tokens
 
+    async def authorize_async(self, nip: str, session: Optional[AsyncSession] = None) -> AuthTokens:
+        """Perform the full v2 XAdES authorization flow without blocking the event loop.
+
+        Signing runs in a worker thread, so many NIPs can be authorized concurrently.
+
+        Parameters
+        ----------
+        nip : str
+            The NIP (tax identification number) to authorize with.
+        session : httpx.AsyncClient, optional
+            Async HTTP session to reuse; a temporary one is created when omitted.
+        """
+
+        async def flow() -> AuthTokens:
+            async with async_flow.session_scope(session, timeout=self.timeout) as http:
+                challenge = await async_flow.get_challenge(
+                    http,
+                    self.base_url,
+                    timeout=self.timeout,
+                    retry_policy=self.retry_policy,
+                )
+                signed_xml = await asyncio.to_thread(
+                    self._build_and_sign_request, challenge=challenge, nip=nip
+                )
+                response = await async_flow.request(
+                    http,
+                    "POST",
+                    self.build_url(URL_AUTH_XADES_SIGNATURE),
+                    timeout=self.timeout,
+                    retry_policy=self.retry_policy,
+                    headers={"Content-Type": "application/xml", "Accept": "application/json"},
+                    content=signed_xml,
+                )
+                signature_response = SignatureResponse.from_dict(response.json())
+                await async_flow.poll_auth_status(
+                    http,
+                    self.base_url,
+                    timeout=self.timeout,
+                    retry_policy=self.retry_policy,
+                    reference_number=signature_response.reference_number,
+                    authentication_token=signature_response.authentication_token.token,
+                    polling=self.polling,
+                )
+                tokens = await async_flow.redeem_token(
+                    http,
+                    self.base_url,
+                    timeout=self.timeout,
+                    retry_policy=self.retry_policy,
+                    authentication_token=signature_response.authentication_token.token,
+                )
+            self._tokens = tokens
+            self.nip = nip
+            return tokens
+
+        return await self._authorize_with_store_async(nip, flow)
+
+    def _credential_fingerprint(self) -> str:
+        """Return the SHA-256 digest of the signing certificate."""
+        return hashlib.sha256(self._signing_cert).hexdigest()
+
     def build_url(self, url: str) -> str:
         """Construct a full URL."""
         return urljoin(base=self.base_url, url=url)
@@ -169,13 +251,21 @@ class XadesAuthorization(Authorization):
         headers.update(optional)
         return headers
 
+    def _request(self, method: str, url: str, idempotent: bool, **kwargs: Any) -> requests.Response:
+        """Send a request, retrying transient failures according to the retry policy."""
+        return self.retry_policy.call(
+            partial(requests.request, method, url, timeout=self.timeout, **kwargs),
+            idempotent=idempotent,
+        )
+
     def _get_challenge(self) -> AuthChallenge:
         """Get the authorization challenge."""
-        response = requests.post(
-            url=self.build_url(URL_AUTH_CHALLENGE),
+        response = self._request(
+            "POST",
+            self.build_url(URL_AUTH_CHALLENGE),
+            idempotent=True,
             headers=self.build_headers(),
             json={},
-            timeout=self.timeout,
         )
         logger.debug(
             "Authorization challenge response (%s): %s", response.status_code, response.text
@@ -299,11 +389,12 @@ class XadesAuthorization(Authorization):
 
     def _submit_xades(self, signed_xml: bytes) -> SignatureResponse:
         """Submit signed XML to POST /auth/xades-signature."""
-        response = requests.post(
-            url=self.build_url(URL_AUTH_XADES_SIGNATURE),
+        response = self._request(
+            "POST",
+            self.build_url(URL_AUTH_XADES_SIGNATURE),
+            idempotent=False,
             headers={"Content-Type": "application/xml", "Accept": "application/json"},
             data=signed_xml,
-            timeout=self.timeout,
         )
         logger.debug("XAdES signature response (%s): %s", response.status_code, response.text)
         error = response_to_exception(response)
@@ -318,45 +409,29 @@ class XadesAuthorization(Authorization):
     ) -> AuthStatus:
         """Poll GET /auth/{referenceNumber} until authentication completes."""
         url = self.build_url(URL_AUTH_STATUS.format(reference_number=reference_number))
-        for attempt in range(_POLL_MAX_ATTEMPTS):
-            response = requests.get(
-                url=url,
-                headers={
-                    **self.build_headers(),
-                    "Authorization": f"Bearer {authentication_token}",
-                },
-                timeout=self.timeout,
-            )
-            error = response_to_exception(response)
-            if error is not None:
-                raise error
-
-            status = AuthStatus.from_dict(response.json())
-            if status.status.code == 200:  # noqa: PLR2004
-                return status
-
-            logger.debug(
-                "Auth status poll attempt %d: code=%d, desc=%s",
-                attempt + 1,
-                status.status.code,
-                status.status.description,
-            )
-            time.sleep(_POLL_INTERVAL)
-
-        raise AuthenticationError(
-            f"Authentication polling timed out after {_POLL_MAX_ATTEMPTS} attempts."
+        send = partial(
+            self._request,
+            "GET",
+            url,
+            idempotent=True,
+            headers={
+                **self.build_headers(),
+                "Authorization": f"Bearer {authentication_token}",
+            },
         )
+        return poll_auth_status(send, self.polling)
 
     def _redeem_token(self, authentication_token: str) -> AuthTokens:
         """Redeem authentication token for access/refresh tokens via POST /auth/token/redeem."""
-        response = requests.post(
-            url=self.build_url(URL_AUTH_TOKEN_REDEEM),
+        response = self._request(
+            "POST",
+            self.build_url(URL_AUTH_TOKEN_REDEEM),
+            idempotent=False,
             headers={
                 **self.build_headers(),
                 "Authorization": f"Bearer {authentication_token}",
             },
             json={},
-            timeout=self.timeout,
         )
         logger.debug("Token redeem response (%s): %s", response.status_code, response.text)
         error = response_to_exception(response)
@@ -0,0 +1,151 @@
+"""Packaging of invoices for KSEF batch sessions.
+
+A batch package is a ZIP archive of invoice XML files. The archive is split into parts and
+every part is encrypted separately with AES-256-CBC using the session's key and IV. All
+steps stream through files on disk, so only one invoice model and one chunk of its XML or
+of the archive are held in memory at a time.
+"""
+import base64
+import hashlib
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+from ksef.constants import MAX_BATCH_PART_SIZE
+from ksef.encryption import Chunk, ReadableInto, StreamDigest, encrypt_stream, read_chunks
+from ksef.models.invoice import Invoice
+from ksef.xml_converters import write_invoice_xml
+
+CHUNK_SIZE = 1024 * 1024  # bytes read from disk at a time
+
+
+@dataclass
+class BatchPart:
+    """A single encrypted part of a batch package."""
+
+    ordinal_number: int
+    path: Path
+    size: int  # Size of the encrypted part
+    sha256: bytes  # SHA-256 digest of the encrypted part
+
+
+@dataclass
+class BatchPackage:
+    """An encrypted batch package, stored on disk."""
+
+    zip_path: Path
+    zip_size: int
+    zip_sha256: bytes  # SHA-256 digest of the unencrypted ZIP archive
+    invoice_count: int
+    parts: List[BatchPart]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Build the `batchFile` section of the POST /sessions/batch request body."""
+        return {
+            "fileSize": self.zip_size,
+            "fileHash": base64.b64encode(self.zip_sha256).decode(),
+            "fileParts": [
+                {
+                    "ordinalNumber": part.ordinal_number,
+                    "fileSize": part.size,
+                    "fileHash": base64.b64encode(part.sha256).decode(),
+                }
+                for part in self.parts
+            ],
+        }
+
+
+def _write_zip(invoices: Iterable[Invoice], zip_path: Path, invoicing_software_name: str) -> int:
+    """Write invoices to a ZIP archive one by one and return the number of invoices."""
+    count = 0
+    with zipfile.ZipFile(zip_path, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for count, invoice in enumerate(invoices, start=1):
+            with archive.open(f"{count:06d}.xml", mode="w") as entry:
+                write_invoice_xml(invoice, entry, invoicing_software_name)
+    return count
+
+
+def _tap(chunks: Iterable[Chunk], callback: Callable[[Chunk], None]) -> Iterator[Chunk]:
+    """Pass chunks through, handing each one to `callback` first."""
+    for chunk in chunks:
+        callback(chunk)
+        yield chunk
+
+
+def _encrypt_part(  # noqa: PLR0913
+    source: ReadableInto,
+    length: int,
+    destination: Path,
+    aes_key: bytes,
+    iv: bytes,
+    on_plaintext: Callable[[Chunk], None],
+) -> Tuple[int, bytes]:
+    """Encrypt `length` bytes from `source` into `destination`, chunk by chunk.
+
+    Every plaintext chunk is also passed to `on_plaintext`. Returns the size and SHA-256 digest of the
+    encrypted part.
+    """
+    digest = StreamDigest()
+    plaintext = _tap(read_chunks(source, CHUNK_SIZE, length), on_plaintext)
+    with destination.open("wb") as output:
+        for encrypted in encrypt_stream(plaintext, aes_key, iv, digest, CHUNK_SIZE):
+            output.write(encrypted)
+    return digest.ciphertext_size, digest.ciphertext_sha256
+
+
+def build_batch_package(  # noqa: PLR0913
+    invoices: Iterable[Invoice],
+    directory: Path,
+    aes_key: bytes,
+    iv: bytes,
+    part_size: int = MAX_BATCH_PART_SIZE,
+    invoicing_software_name: str = "python-ksef",
+) -> BatchPackage:
+    """Build an encrypted batch package from invoices.
+
+    Parameters
+    ----------
+    invoices : Iterable[Invoice]
+        The invoices to package; consumed lazily.
+    directory : Path
+        Directory the ZIP archive and the encrypted parts are written to.
+    aes_key : bytes
+        The batch session's AES-256 key.
+    iv : bytes
+        The batch session's initialization vector.
+    part_size : int
+        Maximum size of a single unencrypted part.
+    invoicing_software_name : str
+        Value of the SystemInfo header field of every invoice.
+
+    Returns
+    -------
+    BatchPackage
+        Metadata of the package and paths of its encrypted parts.
+    """
+    zip_path = directory / "package.zip"
+    invoice_count = _write_zip(invoices, zip_path, invoicing_software_name)
+    zip_size = zip_path.stat().st_size
+
+    zip_hasher = hashlib.sha256()
+    parts: List[BatchPart] = []
+    with zip_path.open("rb") as source:
+        offset = 0
+        while offset < zip_size:
+            length = min(part_size, zip_size - offset)
+            ordinal_number = len(parts) + 1
+            part_path = directory / f"package.zip.{ordinal_number:03d}.aes"
+            size, digest = _encrypt_part(source, length, part_path, aes_key, iv, zip_hasher.update)
+            parts.append(
+                BatchPart(ordinal_number=ordinal_number, path=part_path, size=size, sha256=digest)
+            )
+            offset += length
+
+    return BatchPackage(
+        zip_path=zip_path,
+        zip_size=zip_size,
+        zip_sha256=zip_hasher.digest(),
+        invoice_count=invoice_count,
+        parts=parts,
+    )
@@ -0,0 +1,169 @@
+"""Process-wide cache of the KSEF public key certificates."""
+import asyncio
+import base64
+import logging
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, cast
+
+from cryptography import x509
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey
+
+from ksef.constants import Environment
+
+logger = logging.getLogger(__name__)
+
+USAGE_SYMMETRIC_KEY_ENCRYPTION = "SymmetricKeyEncryption"
+USAGE_KSEF_TOKEN_ENCRYPTION = "KsefTokenEncryption"  # noqa: S105
+
+# Certificates are rotated rarely, but re-check the listing periodically anyway
+DEFAULT_CERTIFICATE_TTL = 6 * 60 * 60  # seconds
+
+_AsyncFetchLocks = Dict[Environment, asyncio.Lock]
+
+
+@dataclass
+class _CachedKey:
+    public_key: RSAPublicKey
+    expires_at: float  # Unix timestamp
+
+
+def _load_certificates(
+    certs: List[Dict[str, Any]], now: float
+) -> Dict[str, Tuple[RSAPublicKey, float]]:
+    """Parse a certificate listing into the newest currently valid public key per usage.
+
+    Returns a mapping of usage to (public key, certificate expiry timestamp).
+    """
+    selected: Dict[str, Tuple[x509.Certificate, float]] = {}
+    for cert in certs:
+        cert_der = base64.b64decode(cert["certificate"])
+        x509_cert = x509.load_der_x509_certificate(cert_der)
+        valid_from = x509_cert.not_valid_before_utc.timestamp()
+        valid_to = x509_cert.not_valid_after_utc.timestamp()
+        if not valid_from <= now < valid_to:
+            logger.debug("Skipping certificate outside of its validity period: %s", cert)
+            continue
+        for usage in cert.get("usage", []):
+            current = selected.get(usage)
+            if current is None or current[0].not_valid_before_utc.timestamp() < valid_from:
+                selected[usage] = (x509_cert, valid_to)
+
+    return {
+        usage: (cast(RSAPublicKey, x509_cert.public_key()), valid_to)
+        for usage, (x509_cert, valid_to) in selected.items()
+    }
+
+
+class PublicKeyCertificateCache:
+    """Thread-safe, TTL-based cache of the public keys from `security/public-key-certificates`.
+
+    Keys are cached per environment and usage until the TTL elapses or the certificate
+    expires, whichever comes first. Concurrent misses for the same environment trigger a
+    single download (single-flight); other threads, or coroutines of one event loop using
+    `get_or_fetch_async`, wait for it and reuse the result.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_CERTIFICATE_TTL,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: Dict[Tuple[Environment, str], _CachedKey] = {}
+        self._lock = threading.Lock()
+        self._fetch_locks: Dict[Environment, threading.Lock] = {}
+        # asyncio locks are bound to an event loop, so they are kept per loop
+        self._async_fetch_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _AsyncFetchLocks]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def get(self, environment: Environment, usage: str) -> Optional[RSAPublicKey]:
+        """Return the cached public key for the usage, or None if missing or stale."""
+        entry = self._entries.get((environment, usage))
+        if entry is None or entry.expires_at <= self._clock():
+            return None
+        return entry.public_key
+
+    def update(self, environment: Environment, certs: List[Dict[str, Any]]) -> None:
+        """Store the public keys of every usage found in a certificate listing."""
+        now = self._clock()
+        keys = _load_certificates(certs, now)
+        with self._lock:
+            for usage, (public_key, valid_to) in keys.items():
+                self._entries[(environment, usage)] = _CachedKey(
+                    public_key=public_key,
+                    expires_at=min(now + self.ttl, valid_to),
+                )
+
+    def get_or_fetch(
+        self,
+        environment: Environment,
+        usage: str,
+        fetch: Callable[[], List[Dict[str, Any]]],
+    ) -> Optional[RSAPublicKey]:
+        """Return the cached public key, calling `fetch` for a fresh listing on a miss.
+
+        Parameters
+        ----------
+        environment : Environment
+            The KSEF environment the listing belongs to.
+        usage : str
+            Certificate usage, e.g. `USAGE_SYMMETRIC_KEY_ENCRYPTION`.
+        fetch : Callable[[], list[dict]]
+            Downloads the certificate listing (the JSON body of the endpoint).
+
+        Returns
+        -------
+        RSAPublicKey, optional
+            The public key, or None if the listing has no valid certificate for the usage.
+        """
+        public_key = self.get(environment, usage)
+        if public_key is not None:
+            return public_key
+
+        with self._lock:
+            fetch_lock = self._fetch_locks.setdefault(environment, threading.Lock())
+        with fetch_lock:
+            # Another thread may have refreshed the listing while we were waiting
+            public_key = self.get(environment, usage)
+            if public_key is None:
+                self.update(environment, fetch())
+                public_key = self.get(environment, usage)
+        return public_key
+
+    async def get_or_fetch_async(
+        self,
+        environment: Environment,
+        usage: str,
+        fetch: Callable[[], Awaitable[List[Dict[str, Any]]]],
+    ) -> Optional[RSAPublicKey]:
+        """Asyncio variant of `get_or_fetch`, awaiting `fetch` for a fresh listing on a miss.
+
+        Concurrent misses on one event loop share a single download.
+        """
+        public_key = self.get(environment, usage)
+        if public_key is not None:
+            return public_key
+
+        with self._lock:
+            loop_locks = self._async_fetch_locks.setdefault(asyncio.get_running_loop(), {})
+            fetch_lock = loop_locks.setdefault(environment, asyncio.Lock())
+        async with fetch_lock:
+            # Another coroutine may have refreshed the listing while we were waiting
+            public_key = self.get(environment, usage)
+            if public_key is None:
+                self.update(environment, await fetch())
+                public_key = self.get(environment, usage)
+        return public_key
+
+    def clear(self) -> None:
+        """Drop all cached keys."""
+        with self._lock:
+            self._entries.clear()
+
+
+default_certificate_cache = PublicKeyCertificateCache()
@@ -3,23 +3,39 @@ import base64
 import hashlib
 import logging
 import os
+import tempfile
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any, Dict, List, Mapping, Optional, Union, cast
+from functools import partial
+from itertools import chain, count, islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Union
 from urllib.parse import urlencode, urljoin
 
 import requests
-from cryptography import x509
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.asymmetric import padding
 from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey
-from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-from cryptography.hazmat.primitives.padding import PKCS7
+from requests.adapters import HTTPAdapter
 
 from ksef.auth.base import Authorization
+from ksef.batch import BatchPackage, BatchPart, build_batch_package
+from ksef.certificates import (
+    USAGE_SYMMETRIC_KEY_ENCRYPTION,
+    PublicKeyCertificateCache,
+    default_certificate_cache,
+)
 from ksef.constants import (
+    CONTINUATION_TOKEN_HEADER,
+    MAX_BATCH_PART_SIZE,
+    MAX_INVOICES_PER_ONLINE_SESSION,
+    URL_INVOICES_EXPORTS,
+    URL_INVOICES_EXPORTS_STATUS,
     URL_INVOICES_GET,
     URL_PUBLIC_KEY_CERTS,
     URL_QUERY_INVOICES,
+    URL_SESSIONS_BATCH,
+    URL_SESSIONS_BATCH_CLOSE,
     URL_SESSIONS_INVOICES,
     URL_SESSIONS_INVOICES_STATUS,
     URL_SESSIONS_ONLINE,
@@ -28,14 +44,41 @@ from ksef.constants import (
     URL_SESSIONS_STATUS,
     Environment,
 )
+from ksef.encryption import Chunk, encrypt_buffer
+from ksef.exceptions import BatchUploadError, ExportError
+from ksef.export import (
+    EXPORT_POLLING_STRATEGY,
+    EXPORT_STATUS_FAILURE,
+    EXPORT_STATUS_SUCCESS,
+    ExportContext,
+    ExportResult,
+    decrypt_part,
+    extract_package,
+    part_path,
+)
 from ksef.models.invoice import Invoice
+from ksef.models.invoice_query import InvoiceQueryFilters, SortOrder
+from ksef.models.responses.invoices import (
+    ExportPackage,
+    ExportPart,
+    ExportStatusResponse,
+    InvoiceMetadata,
+    InvoiceMetadataPage,
+)
 from ksef.models.responses.session import (
     CloseSessionResponse,
+    OpenBatchSessionResponse,
+    PartUploadRequest,
     RawResponse,
     SendInvoiceResponse,
+    SessionInvoicesPage,
     SessionInvoiceStatusResponse,
     SessionStatusResponse,
 )
+from ksef.polling import PollingStrategy
+from ksef.rate_limit import RateLimiter
+from ksef.retry import DEFAULT_RETRY_POLICY, RetryPolicy
+from ksef.utils import bounded_map, dumps_json, write_atomic
 from ksef.xml_converters import FA3_NAMESPACE, convert_invoice_to_xml
 
 logger = logging.getLogger(__name__)
@@ -44,6 +87,14 @@ AES_KEY_SIZE = 32  # 256 bits
 AES_BLOCK_SIZE = 128  # bits
 IV_SIZE = 16  # bytes
 
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_MAX_CONNECTIONS = 32
+DEFAULT_SESSION_INVOICES_PAGE_SIZE = 100
+DEFAULT_INVOICE_QUERY_PAGE_SIZE = 100
+DOWNLOAD_CHUNK_SIZE = 64 * 1024  # bytes
+# HTTP methods whose requests are retried after server or transport errors by default
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "DELETE", "OPTIONS"})
+
 
 @dataclass
 class SessionContext:
@@ -52,20 +103,149 @@ class SessionContext:
     reference_number: str
     aes_key: bytes
     iv: bytes
+    nip: Optional[str] = None
+
+
+@dataclass
+class InvoiceSendResult:
+    """Outcome of sending a single invoice as part of a bulk submission."""
+
+    index: int  # Position of the invoice in the submitted sequence
+    response: Optional[SendInvoiceResponse] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the invoice was accepted for processing."""
+        return self.error is None
+
+
+@dataclass
+class InvoiceDownloadResult:
+    """Outcome of downloading a single invoice as part of a bulk download."""
+
+    ksef_number: str
+    path: Optional[Path] = None
+    skipped: bool = False  # The file was already present
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the invoice is on disk."""
+        return self.error is None
+
+
+def build_open_session_payload(nip: str, encrypted_key: bytes, iv: bytes) -> Dict[str, Any]:
+    """Build the request body for POST /sessions/online."""
+    return {
+        "contextIdentifier": {
+            "type": "Nip",
+            "value": nip,
+        },
+        "formCode": {
+            "systemCode": "FA (3)",
+            "schemaVersion": "1-0E",
+            "targetNamespace": FA3_NAMESPACE,
+            "value": "FA",
+        },
+        "encryption": {
+            "type": "AES",
+            "encryptedSymmetricKey": base64.b64encode(encrypted_key).decode(),
+            "initializationVector": base64.b64encode(iv).decode(),
+        },
+    }
+
+
+def build_open_batch_session_payload(
+    nip: str, encrypted_key: bytes, iv: bytes, package: BatchPackage
+) -> Dict[str, Any]:
+    """Build the request body for POST /sessions/batch."""
+    return {
+        **build_open_session_payload(nip=nip, encrypted_key=encrypted_key, iv=iv),
+        "batchFile": package.to_dict(),
+        "offlineMode": False,
+    }
+
+
+def _b64_sha256(data: Chunk) -> bytes:
+    return base64.b64encode(hashlib.sha256(data).digest())
+
+
+def build_send_invoice_body(invoice_xml: bytes, aes_key: bytes, iv: bytes) -> bytes:
+    """Encrypt invoice XML and build the request body for POST /sessions/online/{ref}/invoices.
+
+    This is the per-invoice hot path, so the JSON document is assembled directly as bytes:
+    every value is a number or base64 text that needs no escaping. The ciphertext is
+    encrypted into one buffer and base64-encoded once, without intermediate dicts or
+    str copies.
+    """
+    encrypted_invoice = encrypt_buffer(invoice_xml, aes_key, iv)
+    return b"".join(
+        [
+            b'{"invoiceHash":"',
+            _b64_sha256(invoice_xml),
+            b'","invoiceSize":',
+            b"%d" % len(invoice_xml),
+            b',"encryptedInvoiceHash":"',
+            _b64_sha256(encrypted_invoice),
+            b'","encryptedInvoiceSize":',
+            b"%d" % len(encrypted_invoice),
+            b',"encryptedInvoiceContent":"',
+            base64.b64encode(encrypted_invoice),
+            b'","offlineMode":false}',
+        ]
+    )
+
+
+def build_send_invoice_response(
+    response_data: Dict[str, Any],
+    status_code: int,
+    headers: Dict[str, str],
+    session_context: SessionContext,
+    invoice_xml: bytes,
+) -> SendInvoiceResponse:
+    """Build a SendInvoiceResponse enriched with session and audit data."""
+    send_response = SendInvoiceResponse.from_dict(response_data)
+    send_response.session_reference_number = session_context.reference_number
+    send_response.invoice_xml = invoice_xml
+    send_response.raw_response = RawResponse(
+        status_code=status_code,
+        headers=headers,
+        body=response_data,
+    )
+    return send_response
+
+
+def build_session(max_connections: int = DEFAULT_MAX_CONNECTIONS) -> requests.Session:
+    """Create a `requests` session whose connection pool fits `max_connections` workers."""
+    session = requests.Session()
+    # Size the connection pool so concurrent workers can share it without being dropped
+    adapter = HTTPAdapter(pool_maxsize=max_connections)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
 
 
 class Client:
     """Base client for interacting with the KSEF API."""
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         authorization: Authorization,
         environment: Environment = Environment.PRODUCTION,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        certificate_cache: PublicKeyCertificateCache = default_certificate_cache,
+        retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+        rate_limiter: Optional[RateLimiter] = None,
+        session: Optional[requests.Session] = None,
     ):
         self.authorization = authorization
         self.environment = environment
         self.base_url = environment.value
-        self.session = requests.Session()
+        self.certificate_cache = certificate_cache
+        self.retry_policy = retry_policy
+        self.rate_limiter = rate_limiter
+        self.session = session or build_session(max_connections)
 
     def build_url(self, url: str, params: Optional[Mapping[str, Union[str, int]]] = None) -> str:
         """Construct a full URL."""
@@ -76,29 +256,58 @@ class Client:
 
         return url
 
+    def _request(  # noqa: PLR0913
+        self,
+        method: str,
+        url: str,
+        idempotent: Optional[bool] = None,
+        endpoint: Optional[str] = None,
+        nip: Optional[str] = None,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """Send a request through the session, retrying transient failures.
+
+        Unless told otherwise, only requests with an idempotent HTTP method are retried after
+        server or transport errors; throttled requests are always retried. With a rate
+        limiter, every attempt first takes a token from the bucket of `endpoint` (a URL
+        template) and the NIP context (the authorized NIP by default).
+        """
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+
+        def send() -> requests.Response:
+            if self.rate_limiter is not None and endpoint is not None:
+                self.rate_limiter.acquire(
+                    endpoint, nip or self.authorization.nip, environment=self.environment
+                )
+            return self.session.request(method, url, **kwargs)
+
+        return self.retry_policy.call(send, idempotent=idempotent)
+
     def _auth_headers(self) -> Dict[str, str]:
         """Build authorization headers using the Bearer access token."""
         return {"Authorization": f"Bearer {self.authorization.get_access_token()}"}
 
-    def _fetch_symmetric_key_cert(self) -> RSAPublicKey:
-        """Fetch the SymmetricKeyEncryption public key from KSEF."""
-        response = self.session.get(
+    def _fetch_public_key_certs(self) -> List[Dict[str, Any]]:
+        """Download the public key certificate listing from KSEF."""
+        response = self._request(
+            "GET",
+            endpoint=URL_PUBLIC_KEY_CERTS,
             url=self.build_url(URL_PUBLIC_KEY_CERTS),
             headers={"Accept": "application/json"},
         )
         response.raise_for_status()
         certs: List[Dict[str, Any]] = response.json()
+        return certs
 
-        for cert in certs:
-            usages = cert.get("usage", [])
-            if "SymmetricKeyEncryption" in usages:
-                cert_b64 = cert["certificate"]
-                cert_der = base64.b64decode(cert_b64)
-                x509_cert = x509.load_der_x509_certificate(cert_der)
-                public_key = x509_cert.public_key()
-                return cast(RSAPublicKey, public_key)
-
-        raise ValueError("No SymmetricKeyEncryption certificate found")
+    def _fetch_symmetric_key_cert(self) -> RSAPublicKey:
+        """Get the SymmetricKeyEncryption public key, downloading it only on a cache miss."""
+        public_key = self.certificate_cache.get_or_fetch(
+            self.environment, USAGE_SYMMETRIC_KEY_ENCRYPTION, self._fetch_public_key_certs
+        )
+        if public_key is None:
+            raise ValueError("No SymmetricKeyEncryption certificate found")
+        return public_key
 
     def _encrypt_aes_key(self, aes_key: bytes, public_key: RSAPublicKey) -> bytes:
         """Encrypt AES key using RSA-OAEP."""
@@ -111,40 +320,97 @@ class Client:
             ),
         )
 
-    def _encrypt_invoice_xml(self, invoice_xml: bytes, aes_key: bytes, iv: bytes) -> bytes:
-        """Encrypt invoice XML using AES-256-CBC."""
-        padder = PKCS7(AES_BLOCK_SIZE).padder()
-        padded_data = padder.update(invoice_xml) + padder.finalize()
+    def search_invoices(
+        self,
+        filters: InvoiceQueryFilters,
+        page_size: int = DEFAULT_INVOICE_QUERY_PAGE_SIZE,
+        page_offset: int = 0,
+        sort_order: SortOrder = SortOrder.ASCENDING,
+    ) -> InvoiceMetadataPage:
+        """Fetch one page of metadata of the invoices matching the query criteria.
 
-        cipher = Cipher(algorithms.AES(aes_key), modes.CBC(iv))
-        encryptor = cipher.encryptor()
-        return encryptor.update(padded_data) + encryptor.finalize()
+        Parameters
+        ----------
+        filters : InvoiceQueryFilters
+            The query criteria.
+        page_size : int
+            Number of results per page.
+        page_offset : int
+            Zero-based index of the page to fetch.
+        sort_order : SortOrder
+            Order of the results by the date type of the date range.
 
-    def search_invoices(self, page_size: int = 100, page_offset: int = 0) -> Dict[str, str]:
-        """Search for invoices with the specified page size and offset."""
+        Returns
+        -------
+        InvoiceMetadataPage
+            The invoices on the page and whether more pages follow.
+        """
         params = {
             "PageSize": page_size,
             "PageOffset": page_offset,
+            "SortOrder": sort_order.value,
         }
-        response = self.session.post(
+        response = self._request(
+            "POST",
+            endpoint=URL_QUERY_INVOICES,
             url=self.build_url(url=URL_QUERY_INVOICES, params=params),
+            idempotent=True,
             headers={
                 "Accept": "application/json",
+                "Content-Type": "application/json",
                 **self._auth_headers(),
             },
-            json={
-                "queryCriteria": {
-                    "subjectType": "subject1",
-                    "type": "range",
-                    "invoicingDateFrom": "2023-11-14T13:21:09.000Z",
-                    "invoicingDateTo": "2023-12-12T13:21:09.000Z",
-                }
-            },
+            data=dumps_json(filters.to_dict()),
         )
         logger.debug("Search invoices response (%s): %s", response.status_code, response.text)
         response.raise_for_status()
-        data = cast(Dict[str, str], response.json())
-        return data
+        return InvoiceMetadataPage.from_dict(response.json())
+
+    def iter_invoices(
+        self,
+        filters: InvoiceQueryFilters,
+        page_size: int = DEFAULT_INVOICE_QUERY_PAGE_SIZE,
+        max_workers: int = 1,
+        sort_order: SortOrder = SortOrder.ASCENDING,
+    ) -> Iterator[InvoiceMetadata]:
+        """Iterate over the metadata of all invoices matching the query criteria.
+
+        Pages are fetched lazily until KSEF reports there are no more. With `max_workers`
+        above one, that many pages are requested ahead concurrently; a few requests past
+        the last page may be wasted in exchange.
+
+        Parameters
+        ----------
+        filters : InvoiceQueryFilters
+            The query criteria.
+        page_size : int
+            Number of results per page.
+        max_workers : int
+            Maximum number of pages fetched concurrently.
+        sort_order : SortOrder
+            Order of the results by the date type of the date range.
+
+        Yields
+        ------
+        InvoiceMetadata
+            The metadata of each matching invoice, in page order.
+        """
+
+        def fetch(page_offset: int) -> InvoiceMetadataPage:
+            return self.search_invoices(filters, page_size, page_offset, sort_order)
+
+        if max_workers <= 1:
+            for page in map(fetch, count()):
+                yield from page.invoices
+                if not page.has_more:
+                    return
+            return
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for page in bounded_map(executor, fetch, count(), max_in_flight=max_workers):
+                yield from page.invoices
+                if not page.has_more:
+                    return
 
     def open_session(self, nip: str) -> SessionContext:
         """Open an online session for invoice submission.
@@ -169,30 +435,17 @@ class Client:
         # Encrypt the AES key with RSA-OAEP
         encrypted_key = self._encrypt_aes_key(aes_key, public_key)
 
-        response = self.session.post(
+        response = self._request(
+            "POST",
+            endpoint=URL_SESSIONS_ONLINE,
+            nip=nip,
             url=self.build_url(url=URL_SESSIONS_ONLINE),
             headers={
                 "Accept": "application/json",
                 "Content-Type": "application/json",
                 **self._auth_headers(),
             },
-            json={
-                "contextIdentifier": {
-                    "type": "Nip",
-                    "value": nip,
-                },
-                "formCode": {
-                    "systemCode": "FA (3)",
-                    "schemaVersion": "1-0E",
-                    "targetNamespace": FA3_NAMESPACE,
-                    "value": "FA",
-                },
-                "encryption": {
-                    "type": "AES",
-                    "encryptedSymmetricKey": base64.b64encode(encrypted_key).decode(),
-                    "initializationVector": base64.b64encode(iv).decode(),
-                },
-            },
+            json=build_open_session_payload(nip=nip, encrypted_key=encrypted_key, iv=iv),
         )
         logger.debug("Open session response (%s): %s", response.status_code, response.text)
         response.raise_for_status()
@@ -202,6 +455,7 @@ class Client:
             reference_number=data["referenceNumber"],
             aes_key=aes_key,
             iv=iv,
+            nip=nip,
         )
 
     def send_invoice_in_session(
@@ -227,45 +481,32 @@ class Client:
         invoice_xml = convert_invoice_to_xml(invoice)
 
         # Encrypt the invoice XML using the session's AES key
-        encrypted_invoice = self._encrypt_invoice_xml(
-            invoice_xml, session_context.aes_key, session_context.iv
-        )
-
-        # Calculate hashes
-        invoice_hash = base64.b64encode(hashlib.sha256(invoice_xml).digest()).decode()
-        encrypted_hash = base64.b64encode(hashlib.sha256(encrypted_invoice).digest()).decode()
+        body = build_send_invoice_body(invoice_xml, session_context.aes_key, session_context.iv)
 
         url = URL_SESSIONS_ONLINE_INVOICES.format(reference_number=session_context.reference_number)
-        response = self.session.post(
+        response = self._request(
+            "POST",
+            endpoint=URL_SESSIONS_ONLINE_INVOICES,
+            nip=session_context.nip,
             url=self.build_url(url=url),
             headers={
                 "Accept": "application/json",
                 "Content-Type": "application/json",
                 **self._auth_headers(),
             },
-            json={
-                "invoiceHash": invoice_hash,
-                "invoiceSize": len(invoice_xml),
-                "encryptedInvoiceHash": encrypted_hash,
-                "encryptedInvoiceSize": len(encrypted_invoice),
-                "encryptedInvoiceContent": base64.b64encode(encrypted_invoice).decode(),
-                "offlineMode": False,
-            },
+            data=body,
         )
         logger.debug(
             "Send invoice in session response (%s): %s", response.status_code, response.text
         )
         response.raise_for_status()
-        response_data = response.json()
-        send_response = SendInvoiceResponse.from_dict(response_data)
-        send_response.session_reference_number = session_context.reference_number
-        send_response.invoice_xml = invoice_xml
-        send_response.raw_response = RawResponse(
+        return build_send_invoice_response(
+            response_data=response.json(),
             status_code=response.status_code,
             headers=dict(response.headers),
-            body=response_data,
+            session_context=session_context,
+            invoice_xml=invoice_xml,
         )
-        return send_response
 
     def close_session(self, session_context: SessionContext) -> CloseSessionResponse:
         """Close an active online session.
@@ -281,7 +522,10 @@ class Client:
             Contains the session reference number.
         """
         url = URL_SESSIONS_ONLINE_CLOSE.format(reference_number=session_context.reference_number)
-        response = self.session.post(
+        response = self._request(
+            "POST",
+            endpoint=URL_SESSIONS_ONLINE_CLOSE,
+            nip=session_context.nip,
             url=self.build_url(url=url),
             headers={
                 "Accept": "application/json",
@@ -297,6 +541,409 @@ class Client:
         response.raise_for_status()
         return CloseSessionResponse.from_dict(response.json())
 
+    def open_batch_session(
+        self, nip: str, package: BatchPackage, aes_key: bytes, iv: bytes
+    ) -> OpenBatchSessionResponse:
+        """Open a batch session for an already built package.
+
+        Parameters
+        ----------
+        nip : str
+            The NIP (tax identification number) to open the session for.
+        package : BatchPackage
+            The package built with `ksef.batch.build_batch_package` using `aes_key` and `iv`.
+        aes_key : bytes
+            The AES-256 key the package parts were encrypted with.
+        iv : bytes
+            The initialization vector the package parts were encrypted with.
+
+        Returns
+        -------
+        OpenBatchSessionResponse
+            Contains the session reference number and upload instructions for every part.
+        """
+        public_key = self._fetch_symmetric_key_cert()
+        encrypted_key = self._encrypt_aes_key(aes_key, public_key)
+
+        response = self._request(
+            "POST",
+            endpoint=URL_SESSIONS_BATCH,
+            nip=nip,
+            url=self.build_url(url=URL_SESSIONS_BATCH),
+            headers={
+                "Accept": "application/json",
+                "Content-Type": "application/json",
+                **self._auth_headers(),
+            },
+            json=build_open_batch_session_payload(
+                nip=nip, encrypted_key=encrypted_key, iv=iv, package=package
+            ),
+        )
+        logger.debug("Open batch session response (%s): %s", response.status_code, response.text)
+        response.raise_for_status()
+        return OpenBatchSessionResponse.from_dict(response.json())
+
+    def _upload_batch_part(self, part: BatchPart, upload_request: PartUploadRequest) -> None:
+        """Stream a single encrypted part from disk to its upload URL."""
+
+        def send() -> requests.Response:
+            # Reopen the part on every attempt, a retry has to stream it from the start
+            with part.path.open("rb") as part_file:
+                return self.session.request(
+                    method=upload_request.method,
+                    url=upload_request.url,
+                    headers=upload_request.headers,
+                    data=part_file,
+                )
+
+        # Uploading a part again overwrites it, so the upload is safe to repeat
+        response = self.retry_policy.call(send, idempotent=True)
+        logger.debug(
+            "Upload batch part %d response (%s)", part.ordinal_number, response.status_code
+        )
+        response.raise_for_status()
+
+    def upload_batch_parts(
+        self,
+        session: OpenBatchSessionResponse,
+        package: BatchPackage,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> None:
+        """Upload all parts of a batch package in parallel.
+
+        Parameters
+        ----------
+        session : OpenBatchSessionResponse
+            The response from open_batch_session().
+        package : BatchPackage
+            The package the session was opened for.
+        max_workers : int
+            Maximum number of parts uploaded concurrently.
+
+        Raises
+        ------
+        BatchUploadError
+            Some parts could not be uploaded; the others were uploaded nonetheless.
+        """
+        parts = {part.ordinal_number: part for part in package.parts}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                upload_request.ordinal_number: executor.submit(
+                    self._upload_batch_part, parts[upload_request.ordinal_number], upload_request
+                )
+                for upload_request in session.part_upload_requests
+            }
+        failed_parts: Dict[int, Exception] = {}
+        for ordinal_number, future in futures.items():
+            error = future.exception()
+            if isinstance(error, Exception):
+                logger.warning("Uploading batch part %d failed: %s", ordinal_number, error)
+                failed_parts[ordinal_number] = error
+            elif error is not None:
+                raise error
+        if failed_parts:
+            raise BatchUploadError(session.reference_number, failed_parts)
+
+    def close_batch_session(self, reference_number: str) -> CloseSessionResponse:
+        """Close a batch session, starting the processing of the uploaded package.
+
+        Parameters
+        ----------
+        reference_number : str
+            The batch session reference number.
+
+        Returns
+        -------
+        CloseSessionResponse
+            Contains the session reference number.
+        """
+        url = URL_SESSIONS_BATCH_CLOSE.format(reference_number=reference_number)
+        response = self._request(
+            "POST",
+            endpoint=URL_SESSIONS_BATCH_CLOSE,
+            url=self.build_url(url=url),
+            headers={
+                "Accept": "application/json",
+                "Content-Type": "application/json",
+                **self._auth_headers(),
+            },
+            json={},
+        )
+        logger.debug("Close batch session response (%s): %s", response.status_code, response.text)
+        if response.status_code == 204:  # noqa: PLR2004
+            return CloseSessionResponse(reference_number=reference_number)
+        response.raise_for_status()
+        return CloseSessionResponse.from_dict(response.json())
+
+    def send_batch(  # noqa: PLR0913
+        self,
+        nip: str,
+        invoices: Iterable[Invoice],
+        part_size: int = MAX_BATCH_PART_SIZE,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        directory: Optional[Path] = None,
+    ) -> OpenBatchSessionResponse:
+        """Send invoices in a batch session (handles packaging and session lifecycle).
+
+        The invoices are streamed into a ZIP archive on disk, which is split into encrypted
+        parts that are uploaded in parallel. The package never has to fit in memory.
+
+        Parameters
+        ----------
+        nip : str
+            The NIP (tax identification number) to send the invoices for.
+        invoices : Iterable[Invoice]
+            The invoices to send; consumed lazily.
+        part_size : int
+            Maximum size of a single unencrypted package part.
+        max_workers : int
+            Maximum number of parts uploaded concurrently.
+        directory : Path, optional
+            Directory for the temporary package files (system temp directory by default).
+
+        Returns
+        -------
+        OpenBatchSessionResponse
+            The batch session; use its reference number with get_session_status().
+
+        Raises
+        ------
+        BatchUploadError
+            Some parts could not be uploaded. The session is closed anyway, so it does not
+            stay open; KSEF rejects the incomplete package.
+        """
+        aes_key = os.urandom(AES_KEY_SIZE)
+        iv = os.urandom(IV_SIZE)
+        with tempfile.TemporaryDirectory(dir=directory) as package_directory:
+            package = build_batch_package(
+                invoices, Path(package_directory), aes_key=aes_key, iv=iv, part_size=part_size
+            )
+            session = self.open_batch_session(nip, package, aes_key=aes_key, iv=iv)
+            try:
+                self.upload_batch_parts(session, package, max_workers=max_workers)
+            except Exception:
+                try:
+                    self.close_batch_session(session.reference_number)
+                except Exception as exc:  # noqa: BLE001
+                    logger.warning(
+                        "Could not close batch session %s: %s", session.reference_number, exc
+                    )
+                raise
+        self.close_batch_session(session.reference_number)
+        return session
+
+    def start_export(self, filters: InvoiceQueryFilters) -> ExportContext:
+        """Start an asynchronous export of the invoices matching the query criteria.
+
+        Parameters
+        ----------
+        filters : InvoiceQueryFilters
+            The query criteria.
+
+        Returns
+        -------
+        ExportContext
+            Contains the export reference number and the key the package is encrypted with.
+        """
+        aes_key = os.urandom(AES_KEY_SIZE)
+        iv = os.urandom(IV_SIZE)
+        public_key = self._fetch_symmetric_key_cert()
+        encrypted_key = self._encrypt_aes_key(aes_key, public_key)
+
+        response = self._request(
+            "POST",
+            endpoint=URL_INVOICES_EXPORTS,
+            url=self.build_url(url=URL_INVOICES_EXPORTS),
+            headers={
+                "Accept": "application/json",
+                "Content-Type": "application/json",
+                **self._auth_headers(),
+            },
+            data=dumps_json(
+                {
+                    "encryption": {
+                        "encryptedSymmetricKey": base64.b64encode(encrypted_key).decode(),
+                        "initializationVector": base64.b64encode(iv).decode(),
+                    },
+                    "filters": filters.to_dict(),
+                }
+            ),
+        )
+        logger.debug("Start export response (%s): %s", response.status_code, response.text)
+        response.raise_for_status()
+        return ExportContext(
+            reference_number=response.json()["referenceNumber"], aes_key=aes_key, iv=iv
+        )
+
+    def _get_export_status_response(self, reference_number: str) -> requests.Response:
+        url = URL_INVOICES_EXPORTS_STATUS.format(reference_number=reference_number)
+        response = self._request(
+            "GET",
+            endpoint=URL_INVOICES_EXPORTS_STATUS,
+            url=self.build_url(url=url),
+            headers={
+                "Accept": "application/json",
+                **self._auth_headers(),
+            },
+        )
+        logger.debug("Get export status response (%s): %s", response.status_code, response.text)
+        response.raise_for_status()
+        return response
+
+    def get_export_status(self, reference_number: str) -> ExportStatusResponse:
+        """Get the status of an invoice export.
+
+        Parameters
+        ----------
+        reference_number : str
+            The export reference number from start_export().
+
+        Returns
+        -------
+        ExportStatusResponse
+            The export status, including the package once the export has completed.
+        """
+        response = self._get_export_status_response(reference_number)
+        return ExportStatusResponse.from_dict(response.json())
+
+    def wait_for_export(
+        self, reference_number: str, polling: PollingStrategy = EXPORT_POLLING_STRATEGY
+    ) -> ExportPackage:
+        """Poll the status of an invoice export until its package is ready.
+
+        Parameters
+        ----------
+        reference_number : str
+            The export reference number from start_export().
+        polling : PollingStrategy
+            How often to poll and for how long.
+
+        Returns
+        -------
+        ExportPackage
+            The package of the completed export.
+        """
+        started = polling.clock()
+        attempt = 0
+        while True:
+            response = self._get_export_status_response(reference_number)
+            status = ExportStatusResponse.from_dict(response.json())
+            if status.status.code >= EXPORT_STATUS_FAILURE:
+                raise ExportError(
+                    f"Export failed ({status.status.code}): {status.status.description}"
+                )
+            if status.status.code == EXPORT_STATUS_SUCCESS and status.package is not None:
+                return status.package
+
+            delay = polling.next_delay(started, attempt, response)
+            if delay is None:
+                raise ExportError(f"Export polling timed out after {attempt + 1} attempts.")
+            polling.sleep(delay)
+            attempt += 1
+
+    def _download_export_part(
+        self, context: ExportContext, part: ExportPart, directory: Path
+    ) -> None:
+        """Download a single part of an export package, decrypting it on the fly."""
+
+        def send() -> requests.Response:
+            # The part URL is pre-signed, it must not carry the access token
+            return self.session.request(part.method, part.url, stream=True)
+
+        response = self.retry_policy.call(send, idempotent=True)
+        with response:
+            logger.debug(
+                "Download export part %d response (%s)", part.ordinal_number, response.status_code
+            )
+            response.raise_for_status()
+            decrypt_part(
+                response.iter_content(DOWNLOAD_CHUNK_SIZE),
+                part,
+                part_path(directory, part),
+                context.aes_key,
+                context.iv,
+            )
+
+    def download_export(  # noqa: PLR0913
+        self,
+        context: ExportContext,
+        package: ExportPackage,
+        destination: Union[Path, str],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        directory: Optional[Path] = None,
+    ) -> List[Path]:
+        """Download an export package and extract its invoices into a directory.
+
+        Parts are downloaded in parallel and decrypted while they stream to disk; they are
+        then joined into the ZIP archive, which is extracted file by file.
+
+        Parameters
+        ----------
+        context : ExportContext
+            The context from start_export().
+        package : ExportPackage
+            The package from wait_for_export().
+        destination : Path or str
+            Directory the invoice files are extracted to.
+        max_workers : int
+            Maximum number of parts downloaded concurrently.
+        directory : Path, optional
+            Directory for the temporary package files (system temp directory by default).
+
+        Returns
+        -------
+        list[Path]
+            Paths of the extracted files.
+        """
+        with tempfile.TemporaryDirectory(dir=directory) as package_directory:
+            working_directory = Path(package_directory)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [
+                    executor.submit(self._download_export_part, context, part, working_directory)
+                    for part in package.parts
+                ]
+                for future in futures:
+                    future.result()
+            return extract_package(package, working_directory, Path(destination))
+
+    def export_invoices(  # noqa: PLR0913
+        self,
+        filters: InvoiceQueryFilters,
+        destination: Union[Path, str],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        polling: PollingStrategy = EXPORT_POLLING_STRATEGY,
+        directory: Optional[Path] = None,
+    ) -> ExportResult:
+        """Export the invoices matching the query criteria into a directory.
+
+        Starts the export, waits for the package and downloads it, see `start_export`,
+        `wait_for_export` and `download_export`.
+
+        Parameters
+        ----------
+        filters : InvoiceQueryFilters
+            The query criteria.
+        destination : Path or str
+            Directory the invoice files are extracted to.
+        max_workers : int
+            Maximum number of parts downloaded concurrently.
+        polling : PollingStrategy
+            How often to poll the export status and for how long.
+        directory : Path, optional
+            Directory for the temporary package files (system temp directory by default).
+
+        Returns
+        -------
+        ExportResult
+            The package metadata (check `is_truncated`) and the extracted files.
+        """
+        context = self.start_export(filters)
+        package = self.wait_for_export(context.reference_number, polling)
+        files = self.download_export(
+            context, package, destination, max_workers=max_workers, directory=directory
+        )
+        return ExportResult(reference_number=context.reference_number, package=package, files=files)
+
     def send_invoice(self, nip: str, invoice: Invoice) -> SendInvoiceResponse:
         """Send a single invoice (handles session lifecycle automatically).
 
@@ -329,6 +976,129 @@ class Client:
             # Always close session
             self.close_session(session_context)
 
+    def send_invoices(
+        self,
+        nip: str,
+        invoices: Iterable[Invoice],
+        max_workers: int = 1,
+        max_invoices_per_session: int = MAX_INVOICES_PER_ONLINE_SESSION,
+    ) -> List[InvoiceSendResult]:
+        """Send many invoices, reusing one online session for as many of them as possible.
+
+        A session is opened once and every invoice is streamed through
+        `send_invoice_in_session`. After `max_invoices_per_session` invoices the session is
+        closed and a new one is opened. Failures are reported per invoice instead of
+        aborting the whole run.
+
+        Parameters
+        ----------
+        nip : str
+            The NIP (tax identification number) to send the invoices for.
+        invoices : Iterable[Invoice]
+            The invoices to send; consumed lazily, one session's worth at a time.
+        max_workers : int
+            Number of invoices sent concurrently within a session (default 1).
+        max_invoices_per_session : int
+            Number of invoices after which the session is rotated.
+
+        Returns
+        -------
+        list[InvoiceSendResult]
+            One result per invoice, in submission order.
+        """
+        results: List[InvoiceSendResult] = []
+        invoice_iterator = iter(invoices)
+        while True:
+            first_invoice = next(invoice_iterator, None)
+            if first_invoice is None:
+                break
+            batch = chain([first_invoice], islice(invoice_iterator, max_invoices_per_session - 1))
+            offset = len(results)
+            try:
+                session_context = self.open_session(nip)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Could not open session: %s", exc)
+                results.extend(
+                    InvoiceSendResult(index=index, error=exc)
+                    for index, _invoice in enumerate(batch, start=offset)
+                )
+                continue
+
+            try:
+                results.extend(
+                    self.send_invoices_in_session(
+                        session_context=session_context,
+                        invoices=batch,
+                        max_workers=max_workers,
+                        start_index=offset,
+                    )
+                )
+            finally:
+                # A failed close must not discard the results of invoices already sent
+                try:
+                    self.close_session(session_context)
+                except Exception as exc:  # noqa: BLE001
+                    logger.warning(
+                        "Could not close session %s: %s", session_context.reference_number, exc
+                    )
+
+        return results
+
+    def send_invoices_in_session(
+        self,
+        session_context: SessionContext,
+        invoices: Iterable[Invoice],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        start_index: int = 0,
+    ) -> List[InvoiceSendResult]:
+        """Send many invoices within one active session using a bounded pool of workers.
+
+        All workers share the client's connection pool and the session's encryption key.
+        At most `max_workers` requests are in flight, and at most twice as many invoices are
+        held in memory at a time, so `invoices` may be a lazy iterable of any length.
+
+        Parameters
+        ----------
+        session_context : SessionContext
+            The session context from open_session().
+        invoices : Iterable[Invoice]
+            The invoices to send.
+        max_workers : int
+            Maximum number of concurrent requests.
+        start_index : int
+            Index assigned to the first invoice in the results (default 0).
+
+        Returns
+        -------
+        list[InvoiceSendResult]
+            One result per invoice in input order; failed invoices carry the error instead of
+            a response.
+        """
+        send = partial(self._send_invoice_result, session_context)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(
+                bounded_map(
+                    executor,
+                    lambda item: send(*item),
+                    enumerate(invoices, start=start_index),
+                    max_in_flight=2 * max_workers,
+                )
+            )
+
+    def _send_invoice_result(
+        self, session_context: SessionContext, index: int, invoice: Invoice
+    ) -> InvoiceSendResult:
+        """Send one invoice in a session, capturing any failure in the result."""
+        try:
+            response = self.send_invoice_in_session(
+                session_context=session_context,
+                invoice=invoice,
+            )
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Sending invoice #%d failed: %s", index, exc)
+            return InvoiceSendResult(index=index, error=exc)
+        return InvoiceSendResult(index=index, response=response)
+
     def get_session_status(self, session_reference_number: str) -> SessionStatusResponse:
         """Get the status of a session.
 
@@ -343,7 +1113,9 @@ class Client:
             Contains overall session status and invoice counts.
         """
         url = URL_SESSIONS_STATUS.format(reference_number=session_reference_number)
-        response = self.session.get(
+        response = self._request(
+            "GET",
+            endpoint=URL_SESSIONS_STATUS,
             url=self.build_url(url=url),
             headers={
                 "Accept": "application/json",
@@ -354,10 +1126,30 @@ class Client:
         response.raise_for_status()
         return SessionStatusResponse.from_dict(response.json())
 
+    def _get_session_invoices_page(
+        self, session_reference_number: str, page_size: int, continuation_token: Optional[str]
+    ) -> SessionInvoicesPage:
+        """Fetch one page of invoice statuses, continuing from `continuation_token`."""
+        url = URL_SESSIONS_INVOICES.format(reference_number=session_reference_number)
+        headers = {"Accept": "application/json", **self._auth_headers()}
+        if continuation_token is not None:
+            headers[CONTINUATION_TOKEN_HEADER] = continuation_token
+        response = self._request(
+            "GET",
+            endpoint=URL_SESSIONS_INVOICES,
+            url=self.build_url(url=url, params={"PageSize": page_size}),
+            headers=headers,
+        )
+        logger.debug("Get session invoices response (%s): %s", response.status_code, response.text)
+        response.raise_for_status()
+        return SessionInvoicesPage.from_dict(response.json())
+
     def get_session_invoices(
         self, session_reference_number: str, page_size: int = 10
     ) -> list[SessionInvoiceStatusResponse]:
-        """Get the status of all invoices in a session.
+        """Get the status of the invoices in a session (first page only).
+
+        Use iter_session_invoices() to get the statuses of all invoices.
 
         Parameters
         ----------
@@ -371,18 +1163,52 @@ class Client:
         list[SessionInvoiceStatusResponse]
             List of invoice statuses for the session.
         """
-        url = URL_SESSIONS_INVOICES.format(reference_number=session_reference_number)
-        response = self.session.get(
-            url=self.build_url(url=url, params={"PageSize": page_size}),
-            headers={
-                "Accept": "application/json",
-                **self._auth_headers(),
-            },
-        )
-        logger.debug("Get session invoices response (%s): %s", response.status_code, response.text)
-        response.raise_for_status()
-        data = response.json()
-        return [SessionInvoiceStatusResponse.from_dict(item) for item in data]
+        page = self._get_session_invoices_page(session_reference_number, page_size, None)
+        return page.invoices
+
+    def iter_session_invoices(
+        self,
+        session_reference_number: str,
+        page_size: int = DEFAULT_SESSION_INVOICES_PAGE_SIZE,
+        prefetch: bool = True,
+    ) -> Iterator[SessionInvoiceStatusResponse]:
+        """Iterate over the statuses of all invoices in a session, page by page.
+
+        Pages are requested lazily by following the continuation token, so at most two
+        pages are held in memory at a time.
+
+        Parameters
+        ----------
+        session_reference_number : str
+            The session reference number.
+        page_size : int
+            Number of results per page.
+        prefetch : bool
+            Whether to fetch the next page in the background while the current one is
+            being consumed.
+
+        Yields
+        ------
+        SessionInvoiceStatusResponse
+            The status of each invoice in the session.
+        """
+        fetch = partial(self._get_session_invoices_page, session_reference_number, page_size)
+        if not prefetch:
+            page = fetch(None)
+            yield from page.invoices
+            while page.continuation_token is not None:
+                page = fetch(page.continuation_token)
+                yield from page.invoices
+            return
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            next_page: Optional["Future[SessionInvoicesPage]"] = executor.submit(fetch, None)
+            while next_page is not None:
+                page = next_page.result()
+                next_page = None
+                if page.continuation_token is not None:
+                    next_page = executor.submit(fetch, page.continuation_token)
+                yield from page.invoices
 
     def get_invoice_status(
         self, session_reference_number: str, invoice_reference_number: str
@@ -405,7 +1231,9 @@ class Client:
             reference_number=session_reference_number,
             invoice_reference_number=invoice_reference_number,
         )
-        response = self.session.get(
+        response = self._request(
+            "GET",
+            endpoint=URL_SESSIONS_INVOICES_STATUS,
             url=self.build_url(url=url),
             headers={
                 "Accept": "application/json",
@@ -430,7 +1258,9 @@ class Client:
             The invoice XML content.
         """
         url = URL_INVOICES_GET.format(ksef_reference_number=ksef_reference_number)
-        response = self.session.get(
+        response = self._request(
+            "GET",
+            endpoint=URL_INVOICES_GET,
             url=self.build_url(url=url),
             headers={
                 "Accept": "application/xml",
@@ -444,3 +1274,94 @@ class Client:
         )
         response.raise_for_status()
         return response.content
+
+    def download_invoice_to_file(
+        self, ksef_reference_number: str, path: Path, compress: bool = False
+    ) -> None:
+        """Download invoice XML by KSEF reference number, streaming it to a file.
+
+        The file is written under a temporary name and renamed when complete, so `path`
+        never holds a partial download.
+
+        Parameters
+        ----------
+        ksef_reference_number : str
+            The KSEF reference number of the invoice to download.
+        path : Path
+            Where to store the invoice XML.
+        compress : bool
+            Whether to store the XML gzip-compressed.
+        """
+        url = URL_INVOICES_GET.format(ksef_reference_number=ksef_reference_number)
+        response = self._request(
+            "GET",
+            endpoint=URL_INVOICES_GET,
+            url=self.build_url(url=url),
+            headers={
+                "Accept": "application/xml",
+                **self._auth_headers(),
+            },
+            stream=True,
+        )
+        with response:
+            logger.debug("Download invoice response (%s)", response.status_code)
+            response.raise_for_status()
+            write_atomic(path, response.iter_content(DOWNLOAD_CHUNK_SIZE), compress=compress)
+
+    def download_invoices(  # noqa: PLR0913
+        self,
+        ksef_reference_numbers: Iterable[str],
+        directory: Union[Path, str],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        compress: bool = False,
+        overwrite: bool = False,
+    ) -> List[InvoiceDownloadResult]:
+        """Download many invoices concurrently into a directory.
+
+        Every invoice is streamed to `<KSEF number>.xml` (`.xml.gz` when compressed) and
+        renamed into place when complete. Invoices whose file is already present are skipped
+        unless `overwrite` is set, so an interrupted download can simply be restarted.
+        Failures are reported per invoice instead of aborting the whole run.
+
+        Parameters
+        ----------
+        ksef_reference_numbers : Iterable[str]
+            The KSEF reference numbers of the invoices; consumed lazily.
+        directory : Path or str
+            Directory for the invoice files; created if missing.
+        max_workers : int
+            Maximum number of concurrent downloads.
+        compress : bool
+            Whether to store the XML gzip-compressed.
+        overwrite : bool
+            Whether to download invoices whose file is already present again.
+
+        Returns
+        -------
+        list[InvoiceDownloadResult]
+            One result per invoice, in input order.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        suffix = ".xml.gz" if compress else ".xml"
+
+        def download(ksef_reference_number: str) -> InvoiceDownloadResult:
+            path = directory / f"{ksef_reference_number}{suffix}"
+            if path.parent != directory:
+                error = ValueError(f"Invalid KSEF reference number: {ksef_reference_number!r}")
+                return InvoiceDownloadResult(ksef_reference_number, error=error)
+            if path.exists() and not overwrite:
+                return InvoiceDownloadResult(ksef_reference_number, path=path, skipped=True)
+            try:
+                self.download_invoice_to_file(ksef_reference_number, path, compress=compress)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Downloading invoice %s failed: %s", ksef_reference_number, exc)
+                return InvoiceDownloadResult(ksef_reference_number, error=exc)
+            return InvoiceDownloadResult(ksef_reference_number, path=path)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(
+                bounded_map(
+                    executor, download, ksef_reference_numbers, max_in_flight=2 * max_workers
+                )
+            )
@@ -12,9 +12,17 @@ class Environment(Enum):
 
 
 DEFAULT_HEADERS = {"Accept": "application/json"}
+# Header carrying the token of the next page of paginated listings
+CONTINUATION_TOKEN_HEADER = "x-continuation-token"  # noqa: S105
 
 TIMEOUT = 30
 
+# Number of invoices sent through one online session before the client rotates to a new one
+MAX_INVOICES_PER_ONLINE_SESSION = 10_000
+
+# Maximum size of a single (unencrypted) part of a batch session ZIP package
+MAX_BATCH_PART_SIZE = 100 * 1024 * 1024
+
 URL_AUTH_CHALLENGE = "auth/challenge"
 URL_AUTH_KSEF_TOKEN = "auth/ksef-token"  # noqa: S105
 URL_AUTH_XADES_SIGNATURE = "auth/xades-signature"
@@ -28,8 +36,12 @@ URL_QUERY_INVOICES = "invoices/query/metadata"
 URL_SESSIONS_ONLINE = "sessions/online"
 URL_SESSIONS_ONLINE_INVOICES = "sessions/online/{reference_number}/invoices"
 URL_SESSIONS_ONLINE_CLOSE = "sessions/online/{reference_number}/close"
+URL_SESSIONS_BATCH = "sessions/batch"
+URL_SESSIONS_BATCH_CLOSE = "sessions/batch/{reference_number}/close"
 URL_SESSIONS_STATUS = "sessions/{reference_number}"
 URL_SESSIONS_INVOICES = "sessions/{reference_number}/invoices"
 URL_SESSIONS_INVOICES_STATUS = "sessions/{reference_number}/invoices/{invoice_reference_number}"
 
 URL_INVOICES_GET = "invoices/ksef/{ksef_reference_number}"
+URL_INVOICES_EXPORTS = "invoices/exports"
+URL_INVOICES_EXPORTS_STATUS = "invoices/exports/{reference_number}"
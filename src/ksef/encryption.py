@@ -1,7 +1,9 @@
 """Invoice encryption for KSEF submission."""
 import base64
+import hashlib
 import os
 from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional, Protocol, Union
 
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import padding
@@ -12,6 +14,17 @@ from cryptography.hazmat.primitives.padding import PKCS7
 AES_KEY_SIZE = 32  # 256 bits
 AES_BLOCK_SIZE = 128  # bits
 IV_SIZE = 16  # bytes
+AES_BLOCK_BYTES = AES_BLOCK_SIZE // 8
+CHUNK_SIZE = 1024 * 1024  # bytes processed at a time by the streaming functions
+
+Chunk = Union[bytes, bytearray, memoryview]
+
+
+class ReadableInto(Protocol):
+    """Binary file object that reads into a caller's buffer, e.g. an `io.BufferedReader`."""
+
+    def readinto(self, buffer: memoryview, /) -> Optional[int]:  # noqa: D102
+        ...
 
 
 @dataclass
@@ -35,10 +48,33 @@ def _unpad_data(data: bytes) -> bytes:
 
 def _encrypt_aes_cbc(data: bytes, key: bytes, iv: bytes) -> bytes:
     """Encrypt data using AES-256-CBC."""
-    cipher = Cipher(algorithms.AES(key), modes.CBC(iv))
-    encryptor = cipher.encryptor()
-    padded_data = _pad_data(data)
-    return encryptor.update(padded_data) + encryptor.finalize()
+    encryptor = Cipher(algorithms.AES(key), modes.CBC(iv)).encryptor()
+    # Pad only the last block instead of copying the whole payload into a padded buffer
+    padding_size = AES_BLOCK_BYTES - len(data) % AES_BLOCK_BYTES
+    return b"".join(
+        [
+            encryptor.update(data),
+            encryptor.update(bytes([padding_size]) * padding_size),
+            encryptor.finalize(),
+        ]
+    )
+
+
+def encrypt_buffer(data: Chunk, key: bytes, iv: bytes) -> memoryview:
+    """Encrypt data using AES-256-CBC into a single buffer, returning a view of the ciphertext.
+
+    The cipher writes straight into a buffer allocated once for the whole ciphertext, so
+    apart from it no copy of the payload is made.
+    """
+    encryptor = Cipher(algorithms.AES(key), modes.CBC(iv)).encryptor()
+    padding_size = AES_BLOCK_BYTES - len(data) % AES_BLOCK_BYTES
+    # update_into() wants room for one block more than it may write
+    buffer = bytearray(len(data) + padding_size + AES_BLOCK_BYTES - 1)
+    view = memoryview(buffer)
+    written = encryptor.update_into(data, buffer)
+    written += encryptor.update_into(bytes([padding_size]) * padding_size, view[written:])
+    encryptor.finalize()
+    return view[:written]
 
 
 def _decrypt_aes_cbc(ciphertext: bytes, key: bytes, iv: bytes) -> bytes:
@@ -49,7 +85,170 @@ def _decrypt_aes_cbc(ciphertext: bytes, key: bytes, iv: bytes) -> bytes:
     return _unpad_data(padded_data)
 
 
-def _encrypt_key_rsa_oaep(key: bytes, public_key: RSAPublicKey) -> bytes:
+class StreamDigest:
+    """Sizes and SHA-256 digests of the plaintext and ciphertext of a streamed payload.
+
+    Pass an instance to `encrypt_stream` or `decrypt_stream`; it is complete once the
+    stream has been consumed.
+    """
+
+    def __init__(self) -> None:
+        self.plaintext_size = 0
+        self.ciphertext_size = 0
+        self._plaintext_hash = hashlib.sha256()
+        self._ciphertext_hash = hashlib.sha256()
+
+    def update_plaintext(self, data: Chunk) -> None:
+        """Account for a chunk of plaintext."""
+        self.plaintext_size += len(data)
+        self._plaintext_hash.update(data)
+
+    def update_ciphertext(self, data: Chunk) -> None:
+        """Account for a chunk of ciphertext."""
+        self.ciphertext_size += len(data)
+        self._ciphertext_hash.update(data)
+
+    @property
+    def plaintext_sha256(self) -> bytes:
+        """SHA-256 digest of the plaintext."""
+        return self._plaintext_hash.digest()
+
+    @property
+    def ciphertext_sha256(self) -> bytes:
+        """SHA-256 digest of the ciphertext."""
+        return self._ciphertext_hash.digest()
+
+
+def read_chunks(
+    file: ReadableInto, chunk_size: int = CHUNK_SIZE, length: Optional[int] = None
+) -> Iterator[memoryview]:
+    """Read a file chunk by chunk into a single reused buffer.
+
+    Every chunk is a view of the buffer, valid until the next one is read. Reading stops
+    at the end of the file or after `length` bytes.
+    """
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    remaining = length
+    while remaining is None or remaining > 0:
+        size = file.readinto(view if remaining is None else view[: min(chunk_size, remaining)])
+        if not size:
+            return
+        if remaining is not None:
+            remaining -= size
+        yield view[:size]
+
+
+def _slices(chunks: Iterable[Chunk], chunk_size: int) -> Iterator[memoryview]:
+    """Split chunks into views of at most `chunk_size` bytes, without copying."""
+    for chunk in chunks:
+        view = memoryview(chunk)
+        for offset in range(0, len(view), chunk_size):
+            yield view[offset : offset + chunk_size]
+
+
+def encrypt_stream(
+    chunks: Iterable[Chunk],
+    key: bytes,
+    iv: bytes,
+    digest: Optional[StreamDigest] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[memoryview]:
+    """Encrypt a stream of plaintext chunks with AES-256-CBC and PKCS7 padding.
+
+    The ciphertext is written into one preallocated buffer: every yielded chunk is a view
+    of it, valid until the next one is requested, so consume (write, hash, send) each chunk
+    right away. Plaintext of any length is processed in pieces of at most `chunk_size`.
+
+    Parameters
+    ----------
+    chunks : Iterable[bytes]
+        The plaintext, e.g. `read_chunks(file)`.
+    key : bytes
+        The AES-256 key.
+    iv : bytes
+        The initialization vector.
+    digest : StreamDigest, optional
+        Collects sizes and SHA-256 digests of the plaintext and ciphertext along the way.
+    chunk_size : int
+        Maximum size of a plaintext piece encrypted at once.
+
+    Yields
+    ------
+    memoryview
+        Chunks of the ciphertext.
+    """
+    encryptor = Cipher(algorithms.AES(key), modes.CBC(iv)).encryptor()
+    buffer = bytearray(chunk_size + AES_BLOCK_BYTES - 1)
+    view = memoryview(buffer)
+    size = 0
+    for piece in _slices(chunks, chunk_size):
+        size += len(piece)
+        if digest is not None:
+            digest.update_plaintext(piece)
+        written = encryptor.update_into(piece, buffer)
+        if written:
+            if digest is not None:
+                digest.update_ciphertext(view[:written])
+            yield view[:written]
+
+    # PKCS7: pad with N bytes of value N, a whole block if the plaintext is aligned
+    padding_size = AES_BLOCK_BYTES - size % AES_BLOCK_BYTES
+    written = encryptor.update_into(bytes([padding_size]) * padding_size, buffer)
+    encryptor.finalize()
+    if digest is not None:
+        digest.update_ciphertext(view[:written])
+    yield view[:written]
+
+
+def decrypt_stream(
+    chunks: Iterable[Chunk],
+    key: bytes,
+    iv: bytes,
+    digest: Optional[StreamDigest] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """Decrypt a stream of AES-256-CBC ciphertext chunks and remove the PKCS7 padding.
+
+    Parameters
+    ----------
+    chunks : Iterable[bytes]
+        The ciphertext, e.g. `read_chunks(file)` or the body of a streamed response.
+    key : bytes
+        The AES-256 key.
+    iv : bytes
+        The initialization vector.
+    digest : StreamDigest, optional
+        Collects sizes and SHA-256 digests of the plaintext and ciphertext along the way.
+    chunk_size : int
+        Maximum size of a ciphertext piece decrypted at once.
+
+    Yields
+    ------
+    bytes
+        Chunks of the plaintext.
+    """
+    decryptor = Cipher(algorithms.AES(key), modes.CBC(iv)).decryptor()
+    unpadder = PKCS7(AES_BLOCK_SIZE).unpadder()
+    buffer = bytearray(chunk_size + AES_BLOCK_BYTES - 1)
+    view = memoryview(buffer)
+    for piece in _slices(chunks, chunk_size):
+        if digest is not None:
+            digest.update_ciphertext(piece)
+        written = decryptor.update_into(piece, buffer)
+        plaintext = unpadder.update(view[:written])
+        if plaintext:
+            if digest is not None:
+                digest.update_plaintext(plaintext)
+            yield plaintext
+    decryptor.finalize()
+    plaintext = unpadder.finalize()
+    if digest is not None:
+        digest.update_plaintext(plaintext)
+    yield plaintext
+
+
+def encrypt_key_rsa_oaep(key: bytes, public_key: RSAPublicKey) -> bytes:
     """Encrypt AES key using RSA-OAEP with SHA-256."""
     return public_key.encrypt(
         key,
@@ -96,7 +295,7 @@ def encrypt_invoice(invoice_xml: bytes, public_key_b64: str) -> EncryptedInvoice
     ciphertext = _encrypt_aes_cbc(invoice_xml, aes_key, iv)
 
     # Encrypt the AES key with RSA-OAEP
-    encrypted_key = _encrypt_key_rsa_oaep(aes_key, public_key)
+    encrypted_key = encrypt_key_rsa_oaep(aes_key, public_key)
 
     # Concatenate: encrypted_key || iv || ciphertext
     combined = encrypted_key + iv + ciphertext
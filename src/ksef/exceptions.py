@@ -1,5 +1,22 @@
 """KSEF-specific exceptions."""
-from requests import Response
+from typing import Mapping, Protocol, runtime_checkable
+
+
+@runtime_checkable
+class Response(Protocol):
+    """Minimal HTTP response interface shared by `requests` and `httpx` responses."""
+
+    @property
+    def status_code(self) -> int:  # noqa: D102
+        ...
+
+    @property
+    def text(self) -> str:  # noqa: D102
+        ...
+
+    @property
+    def headers(self) -> Mapping[str, str]:  # noqa: D102
+        ...
 
 
 class KsefError(Exception):
@@ -77,3 +94,57 @@ class AuthenticationPendingError(KsefError):
     def message(self) -> str:
         """Human-readable error message."""
         return "Authentication is still pending."
+
+
+class ExportError(KsefError):
+    """Invoice export failure."""
+
+    def __init__(self, detail: str):
+        self.detail = detail
+        super().__init__(detail)
+
+    @property
+    def message(self) -> str:
+        """Human-readable error message."""
+        return self.detail
+
+
+class SyncError(KsefError):
+    """Incremental synchronization failure."""
+
+    def __init__(self, detail: str):
+        self.detail = detail
+        super().__init__(detail)
+
+    @property
+    def message(self) -> str:
+        """Human-readable error message."""
+        return self.detail
+
+
+class BatchUploadError(KsefError):
+    """Failure to upload some parts of a batch package."""
+
+    def __init__(self, reference_number: str, failed_parts: Mapping[int, Exception]):
+        self.reference_number = reference_number
+        self.failed_parts = failed_parts  # Errors by part ordinal number
+        super().__init__(reference_number, failed_parts)
+
+    @property
+    def message(self) -> str:
+        """Human-readable error message."""
+        parts = ", ".join(str(number) for number in sorted(self.failed_parts))
+        return f"Uploading parts {parts} of batch session {self.reference_number} failed."
+
+
+class InvoiceParseError(KsefError):
+    """Invoice XML that cannot be parsed."""
+
+    def __init__(self, detail: str):
+        self.detail = detail
+        super().__init__(detail)
+
+    @property
+    def message(self) -> str:
+        """Human-readable error message."""
+        return self.detail
@@ -0,0 +1,120 @@
+"""Unpacking of KSEF invoice export packages.
+
+An export package is a ZIP archive of invoice XML files, split into parts which are
+encrypted separately with AES-256-CBC using the key and IV sent with the export request.
+Parts are decrypted while they are downloaded, joined into the archive and extracted, all
+streaming through files on disk, so no part and no invoice is held in memory as a whole.
+"""
+import base64
+import hashlib
+import shutil
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, List
+
+from ksef.encryption import decrypt_stream
+from ksef.exceptions import ExportError
+from ksef.models.responses.invoices import ExportPackage, ExportPart
+from ksef.polling import PollingStrategy
+from ksef.utils import write_atomic
+
+CHUNK_SIZE = 1024 * 1024  # bytes copied at a time
+
+EXPORT_STATUS_SUCCESS = 200
+# Status codes from 400 up mean the export has failed for good
+EXPORT_STATUS_FAILURE = 400
+
+# Exports take from seconds to many minutes, poll patiently
+EXPORT_POLLING_STRATEGY = PollingStrategy(
+    initial_delay=1.0, multiplier=1.5, max_delay=30.0, deadline=60.0 * 60
+)
+
+
+@dataclass
+class ExportContext:
+    """Context of a started invoice export."""
+
+    reference_number: str
+    aes_key: bytes
+    iv: bytes
+
+
+@dataclass
+class ExportResult:
+    """A downloaded and extracted invoice export."""
+
+    reference_number: str
+    package: ExportPackage
+    files: List[Path]  # The extracted invoice files
+
+
+def _verify_hash(chunks: Iterable[bytes], part: ExportPart) -> Iterator[bytes]:
+    """Pass `chunks` through, checking their SHA-256 digest against the part's hash at the end."""
+    hasher = hashlib.sha256()
+    for chunk in chunks:
+        hasher.update(chunk)
+        yield chunk
+    digest = base64.b64encode(hasher.digest()).decode()
+    if part.encrypted_part_hash is not None and digest != part.encrypted_part_hash:
+        raise ExportError(f"Export package part {part.ordinal_number} is corrupted.")
+
+
+def decrypt_part(
+    chunks: Iterable[bytes], part: ExportPart, destination: Path, aes_key: bytes, iv: bytes
+) -> None:
+    """Decrypt the ciphertext chunks of an export part into `destination`.
+
+    The file only appears once the whole part is decrypted and its hash verified.
+    """
+    write_atomic(destination, decrypt_stream(_verify_hash(chunks, part), aes_key, iv))
+
+
+def part_path(directory: Path, part: ExportPart) -> Path:
+    """Return the path of the decrypted part in the working directory."""
+    return directory / f"package.zip.{part.ordinal_number:03d}"
+
+
+def extract_package(
+    package: ExportPackage,
+    working_directory: Path,
+    destination: Path,
+    keep_parts: bool = False,
+) -> List[Path]:
+    """Join the decrypted parts of a package and extract the invoices into `destination`.
+
+    Parameters
+    ----------
+    package : ExportPackage
+        The export package whose parts were decrypted with `decrypt_part`.
+    working_directory : Path
+        Directory holding the decrypted parts, also used for the joined ZIP archive.
+    destination : Path
+        Directory the invoice files are extracted to.
+    keep_parts : bool
+        Whether to keep the decrypted parts and the archive after extracting.
+
+    Returns
+    -------
+    list[Path]
+        Paths of the extracted files.
+    """
+    zip_path = working_directory / "package.zip"
+    with zip_path.open("wb") as archive_file:
+        for part in package.parts:
+            with part_path(working_directory, part).open("rb") as part_file:
+                shutil.copyfileobj(part_file, archive_file, CHUNK_SIZE)
+
+    destination.mkdir(parents=True, exist_ok=True)
+    files: List[Path] = []
+    with zipfile.ZipFile(zip_path) as archive:
+        for member in archive.infolist():
+            if not member.is_dir():
+                # ZipFile.extract sanitizes member names, nothing lands outside `destination`
+                files.append(Path(archive.extract(member, destination)))
+
+    if not keep_parts:
+        zip_path.unlink()
+        for part in package.parts:
+            part_path(working_directory, part).unlink()
+    return files
@@ -0,0 +1,134 @@
+"""Criteria for the invoice metadata query (POST /invoices/query/metadata)."""
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+from ksef.utils import ensure_aware
+
+
+class SubjectType(Enum):
+    """The role of the authorized subject on the invoices being queried."""
+
+    SELLER = "Subject1"
+    BUYER = "Subject2"
+    THIRD_PARTY = "Subject3"
+    AUTHORIZED = "SubjectAuthorized"
+
+
+class DateType(Enum):
+    """The invoice date the date range applies to."""
+
+    ISSUE = "Issue"
+    INVOICING = "Invoicing"
+    PERMANENT_STORAGE = "PermanentStorage"
+
+
+class AmountType(Enum):
+    """The invoice amount the amount range applies to."""
+
+    GROSS = "Brutto"
+    NET = "Netto"
+    VAT = "Vat"
+
+
+class SortOrder(Enum):
+    """Order of the query results."""
+
+    ASCENDING = "Asc"
+    DESCENDING = "Desc"
+
+
+@dataclass(frozen=True)
+class DateRange:
+    """Date range of the queried invoices; an open range when `end` is None.
+
+    With `restrict_to_hwm`, a range of permanent storage dates ends at KSEF's high-water
+    mark: the point up to which all invoices are known to be stored, so that none can still
+    show up in the range later.
+
+    Naive datetimes are taken to be in UTC.
+    """
+
+    start: datetime
+    end: Optional[datetime] = None
+    date_type: DateType = DateType.INVOICING
+    restrict_to_hwm: bool = False
+
+    def __post_init__(self) -> None:
+        """Make naive bounds aware, so they compare with the aware dates of the records."""
+        object.__setattr__(self, "start", ensure_aware(self.start))
+        if self.end is not None:
+            object.__setattr__(self, "end", ensure_aware(self.end))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to the `dateRange` object of the query criteria."""
+        data: Dict[str, Any] = {"dateType": self.date_type.value, "from": self.start.isoformat()}
+        if self.end is not None:
+            data["to"] = self.end.isoformat()
+        if self.restrict_to_hwm:
+            data["restrictToPermanentStorageHwmDate"] = True
+        return data
+
+
+@dataclass(frozen=True)
+class AmountRange:
+    """Amount range of the queried invoices; either bound may be left open."""
+
+    minimum: Optional[Decimal] = None
+    maximum: Optional[Decimal] = None
+    amount_type: AmountType = AmountType.GROSS
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to the `amount` object of the query criteria.
+
+        The bounds stay `Decimal`, to be written as exact numbers by `ksef.utils.dumps_json`.
+        """
+        data: Dict[str, Any] = {"type": self.amount_type.value}
+        if self.minimum is not None:
+            data["from"] = self.minimum
+        if self.maximum is not None:
+            data["to"] = self.maximum
+        return data
+
+
+@dataclass(frozen=True)
+class InvoiceQueryFilters:
+    """Criteria of an invoice metadata query.
+
+    Only `subject_type` and `date_range` are required, every other criterion narrows the
+    results down further when set.
+    """
+
+    subject_type: SubjectType
+    date_range: DateRange
+    ksef_number: Optional[str] = None
+    invoice_number: Optional[str] = None
+    amount: Optional[AmountRange] = None
+    seller_nip: Optional[str] = None
+    buyer_nip: Optional[str] = None
+    currency_codes: List[str] = field(default_factory=list)
+    has_attachment: Optional[bool] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to the request body of POST /invoices/query/metadata."""
+        data: Dict[str, Any] = {
+            "subjectType": self.subject_type.value,
+            "dateRange": self.date_range.to_dict(),
+        }
+        if self.ksef_number is not None:
+            data["ksefNumber"] = self.ksef_number
+        if self.invoice_number is not None:
+            data["invoiceNumber"] = self.invoice_number
+        if self.amount is not None:
+            data["amount"] = self.amount.to_dict()
+        if self.seller_nip is not None:
+            data["sellerNip"] = self.seller_nip
+        if self.buyer_nip is not None:
+            data["buyerIdentifier"] = {"type": "Nip", "value": self.buyer_nip}
+        if self.currency_codes:
+            data["currencyCodes"] = list(self.currency_codes)
+        if self.has_attachment is not None:
+            data["hasAttachment"] = self.has_attachment
+        return data
@@ -1,7 +1,10 @@
 """Models for KSEF API v2 authentication responses."""
 from dataclasses import dataclass
+from datetime import datetime
 from typing import Any, Dict, Optional
 
+from ksef.utils import parse_datetime
+
 
 @dataclass
 class TokenInfo:  # noqa: D101
@@ -15,6 +18,19 @@ class TokenInfo:  # noqa: D101
             valid_until=data.get("validUntil"),
         )
 
+    def to_dict(self) -> Dict[str, Any]:  # noqa: D102
+        data: Dict[str, Any] = {"token": self.token}
+        if self.valid_until is not None:
+            data["validUntil"] = self.valid_until
+        return data
+
+    @property
+    def expires_at(self) -> Optional[datetime]:
+        """Expiry of the token, or None if the API did not report it."""
+        if self.valid_until is None:
+            return None
+        return parse_datetime(self.valid_until)
+
 
 @dataclass
 class AuthChallenge:
@@ -91,3 +107,20 @@ class AuthTokens:
             access_token=TokenInfo.from_dict(data["accessToken"]),
             refresh_token=TokenInfo.from_dict(data["refreshToken"]),
         )
+
+    def to_dict(self) -> Dict[str, Any]:  # noqa: D102
+        return {
+            "accessToken": self.access_token.to_dict(),
+            "refreshToken": self.refresh_token.to_dict(),
+        }
+
+
+@dataclass
+class RefreshedAccessToken:
+    """Response from POST /auth/token/refresh."""
+
+    access_token: TokenInfo
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RefreshedAccessToken":  # noqa: D102
+        return cls(access_token=TokenInfo.from_dict(data["accessToken"]))
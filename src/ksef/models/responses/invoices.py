@@ -0,0 +1,146 @@
+"""Models for KSEF API v2 invoice query and export responses."""
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from ksef.models.responses.session import InvoiceStatus
+from ksef.utils import parse_datetime
+
+
+def _optional_datetime(value: Optional[str]) -> Optional[datetime]:
+    return parse_datetime(value) if value else None
+
+
+@dataclass
+class InvoiceMetadata:
+    """Metadata of a single invoice returned by POST /invoices/query/metadata."""
+
+    ksef_number: str
+    invoice_number: str
+    issue_date: date
+    invoicing_date: datetime
+    seller_nip: str
+    net_amount: Decimal
+    gross_amount: Decimal
+    vat_amount: Decimal
+    currency: str
+    seller_name: Optional[str] = None
+    buyer_identifier_type: Optional[str] = None
+    buyer_identifier: Optional[str] = None
+    buyer_name: Optional[str] = None
+    acquisition_date: Optional[datetime] = None
+    permanent_storage_date: Optional[datetime] = None
+    invoice_type: Optional[str] = None
+    invoicing_mode: Optional[str] = None
+    has_attachment: bool = False
+    invoice_hash: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "InvoiceMetadata":
+        """Create InvoiceMetadata from API response dictionary."""
+        seller = data.get("seller") or {}
+        buyer = data.get("buyer") or {}
+        buyer_identifier = buyer.get("identifier") or {}
+        return cls(
+            ksef_number=data["ksefNumber"],
+            invoice_number=data["invoiceNumber"],
+            issue_date=date.fromisoformat(data["issueDate"][:10]),
+            invoicing_date=parse_datetime(data["invoicingDate"]),
+            seller_nip=seller.get("nip", ""),
+            net_amount=Decimal(str(data["netAmount"])),
+            gross_amount=Decimal(str(data["grossAmount"])),
+            vat_amount=Decimal(str(data["vatAmount"])),
+            currency=data["currency"],
+            seller_name=seller.get("name"),
+            buyer_identifier_type=buyer_identifier.get("type"),
+            buyer_identifier=buyer_identifier.get("value"),
+            buyer_name=buyer.get("name"),
+            acquisition_date=_optional_datetime(data.get("acquisitionDate")),
+            permanent_storage_date=_optional_datetime(data.get("permanentStorageDate")),
+            invoice_type=data.get("invoiceType"),
+            invoicing_mode=data.get("invoicingMode"),
+            has_attachment=data.get("hasAttachment", False),
+            invoice_hash=data.get("invoiceHash"),
+        )
+
+
+@dataclass
+class InvoiceMetadataPage:
+    """A page of POST /invoices/query/metadata results."""
+
+    invoices: List[InvoiceMetadata]
+    has_more: bool = False
+    # KSEF stops paging after a fixed number of records; the rest needs a narrower query
+    is_truncated: bool = False
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "InvoiceMetadataPage":
+        """Create InvoiceMetadataPage from API response dictionary."""
+        return cls(
+            invoices=[InvoiceMetadata.from_dict(item) for item in data.get("invoices", [])],
+            has_more=data.get("hasMore", False),
+            is_truncated=data.get("isTruncated", False),
+        )
+
+
+@dataclass
+class ExportPart:
+    """A single encrypted part of an invoice export package."""
+
+    ordinal_number: int
+    url: str
+    method: str = "GET"
+    encrypted_part_size: Optional[int] = None
+    encrypted_part_hash: Optional[str] = None  # Base64-encoded SHA-256 digest
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ExportPart":
+        """Create ExportPart from API response dictionary."""
+        return cls(
+            ordinal_number=data["ordinalNumber"],
+            url=data["url"],
+            method=data.get("method", "GET"),
+            encrypted_part_size=data.get("encryptedPartSize"),
+            encrypted_part_hash=data.get("encryptedPartHash"),
+        )
+
+
+@dataclass
+class ExportPackage:
+    """The package produced by an invoice export."""
+
+    invoice_count: int
+    parts: List[ExportPart]
+    is_truncated: bool = False
+    last_permanent_storage_date: Optional[datetime] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ExportPackage":
+        """Create ExportPackage from API response dictionary."""
+        return cls(
+            invoice_count=data.get("invoiceCount", 0),
+            parts=sorted(
+                (ExportPart.from_dict(item) for item in data.get("parts", [])),
+                key=lambda part: part.ordinal_number,
+            ),
+            is_truncated=data.get("isTruncated", False),
+            last_permanent_storage_date=_optional_datetime(data.get("lastPermanentStorageDate")),
+        )
+
+
+@dataclass
+class ExportStatusResponse:
+    """Response from GET /invoices/exports/{referenceNumber}."""
+
+    status: InvoiceStatus
+    package: Optional[ExportPackage] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ExportStatusResponse":
+        """Create ExportStatusResponse from API response dictionary."""
+        package = data.get("package")
+        return cls(
+            status=InvoiceStatus.from_dict(data["status"]),
+            package=ExportPackage.from_dict(package) if package else None,
+        )
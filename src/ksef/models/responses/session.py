@@ -53,6 +53,44 @@ class OpenSessionResponse:
         )
 
 
+@dataclass
+class PartUploadRequest:
+    """Upload instructions for a single part of a batch session package."""
+
+    ordinal_number: int
+    method: str
+    url: str
+    headers: Dict[str, str]
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PartUploadRequest":
+        """Create PartUploadRequest from API response dictionary."""
+        return cls(
+            ordinal_number=data["ordinalNumber"],
+            method=data["method"],
+            url=data["url"],
+            headers=data.get("headers") or {},
+        )
+
+
+@dataclass
+class OpenBatchSessionResponse:
+    """Response from POST /sessions/batch."""
+
+    reference_number: str
+    part_upload_requests: List[PartUploadRequest]
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "OpenBatchSessionResponse":
+        """Create OpenBatchSessionResponse from API response dictionary."""
+        return cls(
+            reference_number=data["referenceNumber"],
+            part_upload_requests=[
+                PartUploadRequest.from_dict(item) for item in data["partUploadRequests"]
+            ],
+        )
+
+
 @dataclass
 class RawResponse:
     """Raw HTTP response data for audit purposes."""
@@ -149,6 +187,24 @@ class SessionInvoiceStatusResponse:
         )
 
 
+@dataclass
+class SessionInvoicesPage:
+    """A page of GET /sessions/{referenceNumber}/invoices."""
+
+    invoices: List[SessionInvoiceStatusResponse]
+    continuation_token: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Any) -> "SessionInvoicesPage":
+        """Create SessionInvoicesPage from API response (a page object or a bare list)."""
+        if isinstance(data, list):
+            return cls(invoices=[SessionInvoiceStatusResponse.from_dict(item) for item in data])
+        return cls(
+            invoices=[SessionInvoiceStatusResponse.from_dict(item) for item in data["invoices"]],
+            continuation_token=data.get("continuationToken"),
+        )
+
+
 @dataclass
 class SessionStatusResponse:
     """Response from GET /sessions/{ref}."""
@@ -0,0 +1,137 @@
+"""Client acting on behalf of many NIP contexts (tenants)."""
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional, Union
+
+from ksef.auth.pool import AuthorizationPool, PooledAuthorization
+from ksef.certificates import PublicKeyCertificateCache, default_certificate_cache
+from ksef.client import (
+    DEFAULT_MAX_CONNECTIONS,
+    Client,
+    InvoiceDownloadResult,
+    InvoiceSendResult,
+    SessionContext,
+    build_session,
+)
+from ksef.constants import Environment
+from ksef.models.invoice import Invoice
+from ksef.models.invoice_query import InvoiceQueryFilters
+from ksef.models.responses.invoices import InvoiceMetadata
+from ksef.models.responses.session import (
+    CloseSessionResponse,
+    OpenBatchSessionResponse,
+    SendInvoiceResponse,
+    SessionInvoiceStatusResponse,
+    SessionStatusResponse,
+)
+from ksef.rate_limit import RateLimiter
+from ksef.retry import DEFAULT_RETRY_POLICY, RetryPolicy
+
+
+class MultiTenantClient:
+    """Client routing every call to the NIP it is made for.
+
+    All tenants share one connection pool, retry policy and, if given, rate limiter (which
+    still keeps a separate budget per NIP); tokens come from an `AuthorizationPool`, which
+    authorizes tenants lazily and refreshes their tokens independently.
+
+    Parameters
+    ----------
+    pool : AuthorizationPool
+        The authorizations of the tenants.
+    environment : Environment
+        The KSEF environment all tenants use.
+    max_connections : int
+        Size of the shared connection pool.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        pool: AuthorizationPool,
+        environment: Environment = Environment.PRODUCTION,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        certificate_cache: PublicKeyCertificateCache = default_certificate_cache,
+        retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
+        self.pool = pool
+        self.environment = environment
+        self.certificate_cache = certificate_cache
+        self.retry_policy = retry_policy
+        self.rate_limiter = rate_limiter
+        self.session = build_session(max_connections)
+
+    def for_nip(self, nip: str) -> Client:
+        """Return a client acting on behalf of the NIP, sharing this client's resources."""
+        return Client(
+            authorization=PooledAuthorization(self.pool, nip),
+            environment=self.environment,
+            certificate_cache=self.certificate_cache,
+            retry_policy=self.retry_policy,
+            rate_limiter=self.rate_limiter,
+            session=self.session,
+        )
+
+    def open_session(self, nip: str) -> SessionContext:
+        """Open an online session for the NIP, see `Client.open_session`."""
+        return self.for_nip(nip).open_session(nip=nip)
+
+    def close_session(self, session_context: SessionContext) -> CloseSessionResponse:
+        """Close an online session opened with `open_session`, see `Client.close_session`.
+
+        Raises
+        ------
+        ValueError
+            If the session context does not carry the NIP it was opened for.
+        """
+        if session_context.nip is None:
+            raise ValueError("Session context has no NIP to close the session for.")
+        return self.for_nip(session_context.nip).close_session(session_context)
+
+    def send_invoice(self, nip: str, invoice: Invoice) -> SendInvoiceResponse:
+        """Send a single invoice for the NIP, see `Client.send_invoice`."""
+        return self.for_nip(nip).send_invoice(nip=nip, invoice=invoice)
+
+    def send_invoices(
+        self, nip: str, invoices: Iterable[Invoice], **kwargs: Any
+    ) -> List[InvoiceSendResult]:
+        """Send many invoices for the NIP, see `Client.send_invoices`."""
+        return self.for_nip(nip).send_invoices(nip=nip, invoices=invoices, **kwargs)
+
+    def send_batch(
+        self, nip: str, invoices: Iterable[Invoice], **kwargs: Any
+    ) -> OpenBatchSessionResponse:
+        """Send invoices for the NIP in a batch session, see `Client.send_batch`."""
+        return self.for_nip(nip).send_batch(nip=nip, invoices=invoices, **kwargs)
+
+    def get_session_status(self, nip: str, session_reference_number: str) -> SessionStatusResponse:
+        """Get the status of one of the NIP's sessions, see `Client.get_session_status`."""
+        return self.for_nip(nip).get_session_status(session_reference_number)
+
+    def get_invoice_status(
+        self, nip: str, session_reference_number: str, invoice_reference_number: str
+    ) -> SessionInvoiceStatusResponse:
+        """Get the status of one of the NIP's invoices, see `Client.get_invoice_status`."""
+        return self.for_nip(nip).get_invoice_status(
+            session_reference_number=session_reference_number,
+            invoice_reference_number=invoice_reference_number,
+        )
+
+    def iter_invoices(
+        self, nip: str, filters: InvoiceQueryFilters, **kwargs: Any
+    ) -> Iterator[InvoiceMetadata]:
+        """Iterate over the NIP's invoices matching the criteria, see `Client.iter_invoices`."""
+        return self.for_nip(nip).iter_invoices(filters, **kwargs)
+
+    def download_invoice(self, nip: str, ksef_reference_number: str) -> bytes:
+        """Download an invoice on behalf of the NIP, see `Client.download_invoice`."""
+        return self.for_nip(nip).download_invoice(ksef_reference_number)
+
+    def download_invoices(
+        self,
+        nip: str,
+        ksef_reference_numbers: Iterable[str],
+        directory: Union[Path, str],
+        **kwargs: Any,
+    ) -> List[InvoiceDownloadResult]:
+        """Download many invoices on behalf of the NIP, see `Client.download_invoices`."""
+        return self.for_nip(nip).download_invoices(ksef_reference_numbers, directory, **kwargs)
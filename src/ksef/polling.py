@@ -0,0 +1,59 @@
+"""Polling of the status of long-running KSEF operations."""
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from ksef.exceptions import Response
+from ksef.retry import parse_retry_after
+
+
+@dataclass
+class PollingStrategy:
+    """How often to poll the status of a long-running operation until it completes.
+
+    Operations such as authorization often finish within a fraction of a second, so the
+    status is probed quickly at first and then less and less often. A `Retry-After` header sent with a
+    status response replaces the computed delay, but never shortens it below
+    `initial_delay`, so `Retry-After: 0` does not turn into a busy poll.
+
+    Parameters
+    ----------
+    initial_delay : float
+        Delay in seconds after the first status check.
+    multiplier : float
+        Factor the delay grows by after every further check.
+    max_delay : float
+        Upper bound of a single delay.
+    deadline : float
+        Total time in seconds after which polling gives up.
+    """
+
+    initial_delay: float = 0.1
+    multiplier: float = 2.0
+    max_delay: float = 2.0
+    deadline: float = 60.0
+    clock: Callable[[], float] = field(default=time.monotonic, repr=False, compare=False)
+    sleep: Callable[[float], None] = field(default=time.sleep, repr=False, compare=False)
+
+    def delay(self, attempt: int, hint: Optional[float] = None) -> float:
+        """Return the delay after status check number `attempt` (counted from 0).
+
+        >>> [PollingStrategy().delay(attempt) for attempt in range(6)]
+        [0.1, 0.2, 0.4, 0.8, 1.6, 2.0]
+        >>> PollingStrategy().delay(0, hint=1.5)
+        1.5
+        >>> PollingStrategy().delay(3, hint=0)
+        0.1
+        """
+        if hint is not None:
+            return max(hint, self.initial_delay)
+        return min(self.max_delay, self.initial_delay * self.multiplier**attempt)
+
+    def next_delay(self, started: float, attempt: int, response: Response) -> Optional[float]:
+        """Return the delay before the next status check, or None if the deadline is reached."""
+        hint = parse_retry_after(response.headers.get("Retry-After"))
+        delay = self.delay(attempt, hint)
+        remaining = self.deadline - (self.clock() - started)
+        if remaining <= 0:
+            return None
+        return min(delay, remaining)
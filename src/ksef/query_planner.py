@@ -0,0 +1,236 @@
+"""Planner splitting large invoice metadata queries into date windows.
+
+KSEF stops returning results of a metadata query after a fixed number of records and
+marks the last page as truncated. The planner works around the cap: it keeps the records
+of a truncated window, splits the rest of the window in two and queries both halves in
+parallel, recursively, until every window fits under the cap.
+"""
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from datetime import datetime, time, timedelta, timezone
+from queue import Full, Queue
+from typing import Callable, Iterator, List, Optional, Set, Union
+
+from ksef.client import DEFAULT_INVOICE_QUERY_PAGE_SIZE, DEFAULT_MAX_WORKERS, Client
+from ksef.models.invoice_query import DateRange, DateType, InvoiceQueryFilters, SortOrder
+from ksef.models.responses.invoices import InvoiceMetadata
+
+logger = logging.getLogger(__name__)
+
+# Windows shorter than this are not split any further
+DEFAULT_MIN_WINDOW = timedelta(seconds=1)
+
+# Pages buffered per worker before the workers wait for the consumer
+QUEUED_PAGES_PER_WORKER = 2
+# How often a worker waiting for room in the queue checks whether the consumer has stopped
+_PUT_TIMEOUT = 0.1  # seconds
+
+
+@dataclass
+class _WindowDone:
+    remainder: Optional[DateRange] = None  # The part of a truncated window left to query
+    error: Optional[Exception] = None
+
+
+# A page of records, or the end of a window query
+_Event = Union[List[InvoiceMetadata], _WindowDone]
+
+
+def _put(events: "Queue[_Event]", event: _Event, stopped: threading.Event) -> bool:
+    """Put the event on the queue, waiting for room; False if the consumer stopped meanwhile."""
+    while not stopped.is_set():
+        try:
+            events.put(event, timeout=_PUT_TIMEOUT)
+        except Full:
+            continue
+        return True
+    return False
+
+
+def split_date_range(date_range: DateRange, window: timedelta) -> List[DateRange]:
+    """Split a closed date range into consecutive windows of at most `window` length.
+
+    Adjacent windows share their boundary, as both ends of a KSEF date range are inclusive.
+
+    >>> start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    >>> windows = split_date_range(DateRange(start, start + timedelta(days=3)), timedelta(days=2))
+    >>> [(w.start.day, w.end.day) for w in windows]
+    [(1, 3), (3, 4)]
+    """
+    if date_range.end is None:
+        raise ValueError("Cannot split an open date range.")
+    windows = []
+    start = date_range.start
+    while start < date_range.end:
+        end = min(start + window, date_range.end)
+        windows.append(replace(date_range, start=start, end=end))
+        start = end
+    return windows or [date_range]
+
+
+def _record_date(invoice: InvoiceMetadata, date_type: DateType) -> Optional[datetime]:
+    """Return the date of the invoice the query's date range applies to."""
+    if date_type is DateType.ISSUE:
+        return datetime.combine(invoice.issue_date, time(), tzinfo=timezone.utc)
+    if date_type is DateType.PERMANENT_STORAGE:
+        return invoice.permanent_storage_date
+    return invoice.invoicing_date
+
+
+class QueryPlanner:
+    """Run invoice metadata queries of any size by splitting them into date windows.
+
+    Parameters
+    ----------
+    client : Client
+        The client used to query KSEF.
+    page_size : int
+        Number of results per page.
+    max_workers : int
+        Maximum number of windows queried concurrently.
+    initial_window : timedelta, optional
+        Split the requested date range into windows of this length up front, so that they
+        are queried in parallel right away rather than after hitting the cap.
+    min_window : timedelta
+        Truncated windows shorter than this are not split further; the records beyond the
+        cap are skipped with a warning.
+    clock : Callable[[], datetime]
+        Returns the current time, used as the end of open date ranges.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        client: Client,
+        page_size: int = DEFAULT_INVOICE_QUERY_PAGE_SIZE,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        initial_window: Optional[timedelta] = None,
+        min_window: timedelta = DEFAULT_MIN_WINDOW,
+        clock: Callable[[], datetime] = lambda: datetime.now(tz=timezone.utc),
+    ):
+        self.client = client
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.initial_window = initial_window
+        self.min_window = min_window
+        self.clock = clock
+
+    def _query_window(
+        self, filters: InvoiceQueryFilters, events: "Queue[_Event]", stopped: threading.Event
+    ) -> Optional[DateRange]:
+        """Put the pages of a single window on the queue as they arrive, stopping at the cap.
+
+        Returns the part of the window left to query when it was truncated.
+        """
+        latest: Optional[datetime] = None
+        page_offset = 0
+        while not stopped.is_set():
+            page = self.client.search_invoices(
+                filters, self.page_size, page_offset, SortOrder.ASCENDING
+            )
+            if not _put(events, page.invoices, stopped):
+                return None
+            for invoice in page.invoices:
+                date = _record_date(invoice, filters.date_range.date_type)
+                if date is not None and (latest is None or date > latest):
+                    latest = date
+            if page.is_truncated:
+                return self._remainder(filters.date_range, latest)
+            if not page.has_more:
+                return None
+            page_offset += 1
+        return None
+
+    def _run_window(
+        self, filters: InvoiceQueryFilters, events: "Queue[_Event]", stopped: threading.Event
+    ) -> None:
+        """Query a single window, ending its pages with a `_WindowDone` event."""
+        try:
+            done = _WindowDone(remainder=self._query_window(filters, events, stopped))
+        except Exception as error:  # noqa: BLE001 - re-raised by the consumer
+            done = _WindowDone(error=error)
+        _put(events, done, stopped)
+
+    def _remainder(self, date_range: DateRange, latest: Optional[datetime]) -> Optional[DateRange]:
+        """Return the part of a truncated window after the latest record received."""
+        start = max(latest or date_range.start, date_range.start)
+        end = date_range.end or self.clock()
+        if end - start < self.min_window:
+            logger.warning(
+                "Query window %s - %s is truncated and too short to split, skipping the rest",
+                start,
+                end,
+            )
+            return None
+        return replace(date_range, start=start, end=end)
+
+    def _split(self, date_range: DateRange) -> List[DateRange]:
+        """Split a window in two halves."""
+        end = date_range.end or self.clock()
+        middle = date_range.start + (end - date_range.start) / 2
+        return [replace(date_range, end=middle), replace(date_range, start=middle, end=end)]
+
+    def iter_invoices(self, filters: InvoiceQueryFilters) -> Iterator[InvoiceMetadata]:
+        """Iterate over the metadata of all invoices matching the query criteria.
+
+        Records are yielded page by page as they arrive from the concurrently queried
+        windows, so the stream is not sorted. Invoices on the boundary of adjacent windows are
+        returned only once.
+
+        Parameters
+        ----------
+        filters : InvoiceQueryFilters
+            The query criteria.
+
+        Yields
+        ------
+        InvoiceMetadata
+            The metadata of each matching invoice.
+        """
+        date_range = filters.date_range
+        if self.initial_window is not None:
+            date_range = replace(date_range, end=date_range.end or self.clock())
+            windows = split_date_range(date_range, self.initial_window)
+        else:
+            windows = [date_range]
+
+        # Workers put every page on the queue, followed by a `_WindowDone` event. The queue is
+        # bounded, so workers wait while the consumer is busy instead of buffering records.
+        events: "Queue[_Event]" = Queue(maxsize=QUEUED_PAGES_PER_WORKER * self.max_workers)
+        stopped = threading.Event()
+        seen: Set[str] = set()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures: List["Future[None]"] = []
+
+            def submit(window: DateRange) -> None:
+                futures.append(
+                    executor.submit(
+                        self._run_window, replace(filters, date_range=window), events, stopped
+                    )
+                )
+
+            for window in windows:
+                submit(window)
+            running = len(windows)
+            try:
+                while running:
+                    event = events.get()
+                    if isinstance(event, _WindowDone):
+                        running -= 1
+                        if event.error is not None:
+                            raise event.error
+                        if event.remainder is not None:
+                            logger.debug("Splitting truncated query window %s", event.remainder)
+                            for window in self._split(event.remainder):
+                                submit(window)
+                                running += 1
+                        continue
+                    for invoice in event:
+                        if invoice.ksef_number not in seen:
+                            seen.add(invoice.ksef_number)
+                            yield invoice
+            finally:
+                stopped.set()
+                for future in futures:
+                    future.cancel()
@@ -0,0 +1,175 @@
+"""Client-side rate limiting of KSEF API calls."""
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Mapping, Optional, Tuple
+
+from ksef.constants import (
+    URL_INVOICES_GET,
+    URL_QUERY_INVOICES,
+    URL_SESSIONS_BATCH,
+    URL_SESSIONS_INVOICES,
+    URL_SESSIONS_INVOICES_STATUS,
+    URL_SESSIONS_ONLINE,
+    URL_SESSIONS_ONLINE_INVOICES,
+    URL_SESSIONS_STATUS,
+    Environment,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Limit:
+    """Sustained request rate (per second) and burst size of a single token bucket."""
+
+    rate: float
+    burst: int
+
+
+# Conservative starting points, not derived from published KSEF limits; tune them to the
+# limits of your environment and to your traffic
+DEFAULT_LIMITS: Dict[str, Limit] = {
+    URL_SESSIONS_ONLINE: Limit(rate=2, burst=5),
+    URL_SESSIONS_BATCH: Limit(rate=2, burst=5),
+    URL_SESSIONS_ONLINE_INVOICES: Limit(rate=10, burst=30),
+    URL_SESSIONS_STATUS: Limit(rate=10, burst=20),
+    URL_SESSIONS_INVOICES: Limit(rate=10, burst=20),
+    URL_SESSIONS_INVOICES_STATUS: Limit(rate=10, burst=20),
+    URL_INVOICES_GET: Limit(rate=8, burst=16),
+    URL_QUERY_INVOICES: Limit(rate=2, burst=8),
+}
+DEFAULT_LIMIT = Limit(rate=10, burst=20)
+# How often buckets that have refilled completely are dropped
+SWEEP_INTERVAL = 60.0  # seconds
+
+_BucketKey = Tuple[Optional[Environment], str, Optional[str]]
+
+
+class TokenBucket:
+    """Thread-safe token bucket.
+
+    Tokens are reserved in arrival order: a caller that finds the bucket empty takes a token
+    on credit and is told how long to wait until that token has been refilled. This keeps
+    the outgoing rate smooth, without callers racing each other after every wait.
+    """
+
+    def __init__(self, limit: Limit, clock: Callable[[], float] = time.monotonic):
+        self.limit = limit
+        self._clock = clock
+        self._tokens = float(limit.burst)
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+
+    def is_full(self, now: float) -> bool:
+        """Whether the bucket has refilled completely, i.e. it is as good as a new one."""
+        with self._lock:
+            return self._tokens + (now - self._updated_at) * self.limit.rate >= self.limit.burst
+
+    def reserve(self) -> float:
+        """Take one token and return the number of seconds to wait before using it."""
+        with self._lock:
+            now = self._clock()
+            elapsed = now - self._updated_at
+            self._tokens = min(float(self.limit.burst), self._tokens + elapsed * self.limit.rate)
+            self._updated_at = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.limit.rate
+
+
+class RateLimiter:
+    """Token buckets per environment, endpoint and NIP context, shareable between clients.
+
+    Clients do not limit their requests unless given a limiter. Buckets are created on first
+    use; buckets that have refilled completely are equivalent to new ones and are dropped
+    every `SWEEP_INTERVAL` seconds, so the number of buckets stays bounded by the number of
+    recently active contexts.
+
+    Parameters
+    ----------
+    limits : Mapping[str, Limit]
+        Limits per endpoint, keyed by URL template (e.g. `URL_SESSIONS_ONLINE_INVOICES`).
+    default : Limit, optional
+        Limit of endpoints missing from `limits`; those are not limited when None.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Mapping[str, Limit]] = None,
+        default: Optional[Limit] = DEFAULT_LIMIT,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.limits = dict(DEFAULT_LIMITS if limits is None else limits)
+        self.default = default
+        self._clock = clock
+        self._sleep = sleep
+        self._buckets: Dict[_BucketKey, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self._swept_at = clock()
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self._buckets)
+
+    def _bucket(
+        self, endpoint: str, nip: Optional[str], environment: Optional[Environment]
+    ) -> Optional[TokenBucket]:
+        limit = self.limits.get(endpoint, self.default)
+        if limit is None:
+            return None
+        key = (environment, endpoint, nip)
+        with self._lock:
+            now = self._clock()
+            if now - self._swept_at >= SWEEP_INTERVAL:
+                self._evict_full_buckets(now)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(limit, clock=self._clock)
+            return bucket
+
+    def _evict_full_buckets(self, now: float) -> None:
+        full = [key for key, bucket in self._buckets.items() if bucket.is_full(now)]
+        for key in full:
+            del self._buckets[key]
+        self._swept_at = now
+
+    def reserve(
+        self, endpoint: str, nip: Optional[str] = None, environment: Optional[Environment] = None
+    ) -> float:
+        """Take a token for the endpoint and context, returning how long to wait first."""
+        bucket = self._bucket(endpoint, nip, environment)
+        if bucket is None:
+            return 0.0
+        delay = bucket.reserve()
+        if delay:
+            logger.debug("Rate limiting %s for %s: waiting %.3fs", endpoint, nip, delay)
+        return delay
+
+    def acquire(
+        self, endpoint: str, nip: Optional[str] = None, environment: Optional[Environment] = None
+    ) -> None:
+        """Block until a request to the endpoint may be sent for the context."""
+        delay = self.reserve(endpoint, nip, environment)
+        if delay:
+            self._sleep(delay)
+
+    async def acquire_async(
+        self, endpoint: str, nip: Optional[str] = None, environment: Optional[Environment] = None
+    ) -> None:
+        """Wait, without blocking the event loop, until a request may be sent."""
+        delay = self.reserve(endpoint, nip, environment)
+        if delay:
+            await asyncio.sleep(delay)
+
+    def clear(self) -> None:
+        """Drop all buckets, resetting every context to a full burst."""
+        with self._lock:
+            self._buckets.clear()
+
+
+# Opt-in limiter for sharing one budget between all clients of the process
+default_rate_limiter = RateLimiter()
@@ -0,0 +1,234 @@
+"""Retry policy with exponential backoff for KSEF API calls."""
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
+from typing import (
+    TYPE_CHECKING,
+    Awaitable,
+    Callable,
+    FrozenSet,
+    Optional,
+    Protocol,
+    Tuple,
+    Type,
+    TypeVar,
+    cast,
+)
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+from ksef.exceptions import Response
+
+logger = logging.getLogger(__name__)
+
+if TYPE_CHECKING:  # noqa: SIM108 - a TypeVar must be assigned a plain call
+    R = TypeVar("R", bound=Response)
+else:
+    # Runtime checkers cannot test a class against a protocol with data members
+    R = TypeVar("R")
+
+
+class _ClosableResponse(Response, Protocol):
+    def close(self) -> None:
+        ...
+
+
+class _AsyncClosableResponse(Response, Protocol):
+    async def aclose(self) -> None:
+        ...
+
+
+RETRYABLE_STATUS_CODES = frozenset(
+    {
+        HTTPStatus.TOO_MANY_REQUESTS,
+        HTTPStatus.INTERNAL_SERVER_ERROR,
+        HTTPStatus.BAD_GATEWAY,
+        HTTPStatus.SERVICE_UNAVAILABLE,
+        HTTPStatus.GATEWAY_TIMEOUT,
+    }
+)
+
+# Errors raised before the request was sent, safe to retry for any request. Other connection
+# errors, e.g. "Connection aborted", may happen after the server received the request.
+# NameResolutionError is a subclass of NewConnectionError.
+_CONNECT_ERRORS: Tuple[Type[BaseException], ...] = (
+    requests.exceptions.ConnectTimeout,
+    NewConnectionError,
+)
+# Errors after which the server may or may not have processed the request
+_TRANSPORT_ERRORS: Tuple[Type[BaseException], ...] = (requests.ConnectionError, requests.Timeout)
+
+try:
+    import httpx
+
+    _CONNECT_ERRORS += (httpx.ConnectError, httpx.ConnectTimeout)
+    _TRANSPORT_ERRORS += (httpx.TransportError,)
+except ImportError:  # pragma: no cover - httpx is an optional dependency
+    pass
+
+
+def _is_connect_error(error: BaseException) -> bool:
+    """Whether the request failed before it was sent, so the server never received it."""
+    if isinstance(error, _CONNECT_ERRORS):
+        return True
+    if isinstance(error, requests.ConnectionError) and error.args:
+        # requests wraps the urllib3 error: ConnectionError(MaxRetryError(reason=...))
+        reason = getattr(error.args[0], "reason", error.args[0])
+        return isinstance(reason, _CONNECT_ERRORS)
+    return False
+
+
+def parse_retry_after(value: Optional[str], now: Optional[datetime] = None) -> Optional[float]:
+    """Parse a `Retry-After` header value (delay in seconds or an HTTP date) into seconds.
+
+    >>> parse_retry_after("3")
+    3.0
+    >>> parse_retry_after("Wed, 01 Jan 2025 00:00:10 GMT", now=datetime(2025, 1, 1, tzinfo=timezone.utc))
+    10.0
+    >>> parse_retry_after("Wed, 01 Jan 2025 00:00:10 -0000", now=datetime(2025, 1, 1, tzinfo=timezone.utc))
+    10.0
+    >>> parse_retry_after("soon") is None
+    True
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        # A "-0000" zone means UTC with no further information
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(tz=timezone.utc)
+    return max(0.0, (retry_at - now).total_seconds())
+
+
+@dataclass
+class RetryPolicy:
+    """When and how long to wait before retrying a failed API call.
+
+    Throttled (429) responses are always retried, as the server rejected the request without
+    processing it. Errors raised before the request was sent (e.g. a refused connection) are
+    always retried too. Server errors and other transport errors are retried only for
+    idempotent calls, so an invoice is never submitted twice. The delay honours `Retry-After`
+    and otherwise grows exponentially with full jitter. No retry is attempted once it would
+    exceed the total `deadline`.
+
+    Parameters
+    ----------
+    max_attempts : int
+        Maximum number of attempts, including the first one. Use 1 to disable retries.
+    backoff_factor : float
+        Base delay in seconds; attempt ``n`` waits up to ``backoff_factor * 2 ** n``.
+    max_backoff : float
+        Upper bound of a single delay, also applied to `Retry-After`.
+    deadline : float, optional
+        Total time budget in seconds for all attempts of one call.
+    retry_statuses : frozenset of int
+        Response status codes that are considered transient.
+    """
+
+    max_attempts: int = 5
+    backoff_factor: float = 0.5
+    max_backoff: float = 30.0
+    deadline: Optional[float] = 120.0
+    retry_statuses: FrozenSet[int] = RETRYABLE_STATUS_CODES
+    clock: Callable[[], float] = field(default=time.monotonic, repr=False, compare=False)
+    sleep: Callable[[float], None] = field(default=time.sleep, repr=False, compare=False)
+
+    def backoff(self, attempt: int) -> float:
+        """Return the jittered delay before retry number `attempt` (counted from 0)."""
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * 2**attempt))
+
+    def _delay_after_response(
+        self, response: Response, attempt: int, idempotent: bool
+    ) -> Optional[float]:
+        if response.status_code not in self.retry_statuses:
+            return None
+        if response.status_code != HTTPStatus.TOO_MANY_REQUESTS and not idempotent:
+            return None
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+        return self.backoff(attempt)
+
+    def _delay_after_error(
+        self, error: BaseException, attempt: int, idempotent: bool
+    ) -> Optional[float]:
+        if _is_connect_error(error) or (idempotent and isinstance(error, _TRANSPORT_ERRORS)):
+            return self.backoff(attempt)
+        return None
+
+    def _within_budget(self, started: float, attempt: int, delay: float) -> bool:
+        if attempt + 1 >= self.max_attempts:
+            return False
+        return self.deadline is None or self.clock() - started + delay <= self.deadline
+
+    def call(self, send: Callable[[], R], idempotent: bool = False) -> R:
+        """Call `send` until it returns a non-transient response or the policy gives up.
+
+        Parameters
+        ----------
+        send : Callable[[], Response]
+            Sends the request; called once per attempt, so it must rebuild any streamed body.
+        idempotent : bool
+            Whether repeating the request cannot change the outcome.
+
+        Returns
+        -------
+        Response
+            The last response; raising for its status is left to the caller.
+        """
+        started = self.clock()
+        attempt = 0
+        while True:
+            try:
+                response = send()
+            except Exception as error:  # noqa: BLE001
+                delay = self._delay_after_error(error, attempt, idempotent)
+                if delay is None or not self._within_budget(started, attempt, delay):
+                    raise
+                logger.debug("Retrying in %.2fs after error: %s", delay, error)
+            else:
+                delay = self._delay_after_response(response, attempt, idempotent)
+                if delay is None or not self._within_budget(started, attempt, delay):
+                    return response
+                logger.debug("Retrying in %.2fs after status %s", delay, response.status_code)
+                # Release the connection of the discarded response, e.g. of a streamed download
+                cast(_ClosableResponse, response).close()
+            self.sleep(delay)
+            attempt += 1
+
+    async def call_async(self, send: Callable[[], Awaitable[R]], idempotent: bool = False) -> R:
+        """Asyncio variant of `call`, waiting with `asyncio.sleep`."""
+        started = self.clock()
+        attempt = 0
+        while True:
+            try:
+                response = await send()
+            except Exception as error:  # noqa: BLE001
+                delay = self._delay_after_error(error, attempt, idempotent)
+                if delay is None or not self._within_budget(started, attempt, delay):
+                    raise
+                logger.debug("Retrying in %.2fs after error: %s", delay, error)
+            else:
+                delay = self._delay_after_response(response, attempt, idempotent)
+                if delay is None or not self._within_budget(started, attempt, delay):
+                    return response
+                logger.debug("Retrying in %.2fs after status %s", delay, response.status_code)
+                await cast(_AsyncClosableResponse, response).aclose()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+NO_RETRY = RetryPolicy(max_attempts=1)
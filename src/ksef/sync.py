@@ -0,0 +1,241 @@
+"""Incremental synchronization of invoices with persisted checkpoints.
+
+Every run only asks KSEF for invoices stored after the previous run's high-water mark (the
+latest permanent storage date seen), so hourly runs neither re-query overlapping ranges nor
+re-download invoices that have already been processed.
+"""
+import hashlib
+import json
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from ksef.client import DEFAULT_INVOICE_QUERY_PAGE_SIZE, Client
+from ksef.exceptions import SyncError
+from ksef.models.invoice_query import (
+    DateRange,
+    DateType,
+    InvoiceQueryFilters,
+    SortOrder,
+    SubjectType,
+)
+from ksef.models.responses.invoices import InvoiceMetadata
+from ksef.utils import ensure_aware, parse_datetime, write_atomic
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_INTERVAL = 100  # invoices processed between checkpoint saves
+
+
+@dataclass
+class SyncCheckpoint:
+    """Progress of the synchronization of one NIP and subject type."""
+
+    high_water_mark: datetime  # Permanent storage date of the newest invoice processed
+    # KSEF numbers of the invoices processed with exactly that date, which the next query
+    # (starting at the inclusive high-water mark) returns again
+    seen: List[str] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        """Take a naive high-water mark to be in UTC, like the dates KSEF returns."""
+        self.high_water_mark = ensure_aware(self.high_water_mark)
+
+    def advance(self, invoice: InvoiceMetadata) -> None:
+        """Move the checkpoint past the invoice."""
+        stored_at = _storage_date(invoice)
+        if stored_at > self.high_water_mark:
+            self.high_water_mark = stored_at
+            self.seen = []
+        self.seen.append(invoice.ksef_number)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the checkpoint to a JSON-compatible dictionary."""
+        return {"highWaterMark": self.high_water_mark.isoformat(), "seen": self.seen}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SyncCheckpoint":
+        """Create SyncCheckpoint from a dictionary created by `to_dict`."""
+        return cls(high_water_mark=parse_datetime(data["highWaterMark"]), seen=data["seen"])
+
+
+def _storage_date(invoice: InvoiceMetadata) -> datetime:
+    return invoice.permanent_storage_date or invoice.invoicing_date
+
+
+class CheckpointStore(ABC):
+    """Storage of synchronization checkpoints, keyed by NIP and subject type."""
+
+    @abstractmethod
+    def load(self, key: str) -> Optional[SyncCheckpoint]:
+        """Return the checkpoint stored under the key, or None."""
+        ...
+
+    @abstractmethod
+    def save(self, key: str, checkpoint: SyncCheckpoint) -> None:
+        """Store the checkpoint under the key, replacing any previous one."""
+        ...
+
+
+class FileCheckpointStore(CheckpointStore):
+    """Checkpoint store keeping one JSON file per key in a directory.
+
+    Files are replaced atomically, so a crash mid-save leaves the previous checkpoint.
+
+    Parameters
+    ----------
+    directory : Path or str
+        Directory for the checkpoint files; created if missing.
+    """
+
+    def __init__(self, directory: Union[Path, str]):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+
+    def load(self, key: str) -> Optional[SyncCheckpoint]:
+        """Return the checkpoint stored under the key, or None if missing."""
+        try:
+            data = json.loads(self._path(key).read_bytes())
+        except FileNotFoundError:
+            return None
+        return SyncCheckpoint.from_dict(data)
+
+    def save(self, key: str, checkpoint: SyncCheckpoint) -> None:
+        """Store the checkpoint, atomically replacing any previous file."""
+        write_atomic(self._path(key), json.dumps(checkpoint.to_dict()).encode())
+
+
+@dataclass
+class SyncedInvoice:
+    """A new invoice found by the synchronization."""
+
+    metadata: InvoiceMetadata
+    content: Optional[bytes] = None  # The invoice XML, if downloaded
+
+
+class InvoiceSync:
+    """Incremental synchronization of the invoices of the authorized NIP.
+
+    Parameters
+    ----------
+    client : Client
+        The client used to query and download invoices; it must be authorized.
+    store : CheckpointStore
+        Where the progress is kept between runs.
+    start : datetime
+        Where the first run starts, when there is no checkpoint yet; UTC if naive.
+    subject_type : SubjectType
+        Which invoices to synchronize, received ones (buyer) by default.
+    download : bool
+        Whether to download the XML of every new invoice.
+    page_size : int
+        Number of results per page of the metadata query.
+    checkpoint_interval : int
+        Number of processed invoices between checkpoint saves.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        client: Client,
+        store: CheckpointStore,
+        start: datetime,
+        subject_type: SubjectType = SubjectType.BUYER,
+        download: bool = True,
+        page_size: int = DEFAULT_INVOICE_QUERY_PAGE_SIZE,
+        checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL,
+    ):
+        self.client = client
+        self.store = store
+        self.start = ensure_aware(start)
+        self.subject_type = subject_type
+        self.download = download
+        self.page_size = page_size
+        self.checkpoint_interval = checkpoint_interval
+
+    @property
+    def key(self) -> str:
+        """Key of this synchronization's checkpoint."""
+        environment = self.client.environment.name
+        return f"{environment}:{self.client.authorization.nip}:{self.subject_type.value}"
+
+    def load_checkpoint(self) -> SyncCheckpoint:
+        """Return the stored checkpoint, or the starting point of the first run."""
+        return self.store.load(self.key) or SyncCheckpoint(high_water_mark=self.start)
+
+    def _query_new(self, checkpoint: SyncCheckpoint) -> Iterator[InvoiceMetadata]:
+        """Yield invoices stored since the checkpoint, in permanent storage order."""
+        seen = set(checkpoint.seen)
+        filters = InvoiceQueryFilters(
+            subject_type=self.subject_type,
+            date_range=DateRange(
+                start=checkpoint.high_water_mark,
+                date_type=DateType.PERMANENT_STORAGE,
+                restrict_to_hwm=True,
+            ),
+        )
+        page_offset = 0
+        while True:
+            page = self.client.search_invoices(
+                filters, self.page_size, page_offset, SortOrder.ASCENDING
+            )
+            for invoice in page.invoices:
+                if invoice.ksef_number not in seen:
+                    seen.add(invoice.ksef_number)
+                    yield invoice
+            if page.is_truncated and page.invoices:
+                # Continue with a new query from the newest invoice received
+                start = max(_storage_date(invoice) for invoice in page.invoices)
+                if start <= filters.date_range.start:
+                    # The query would return the same capped results again
+                    raise SyncError(
+                        f"More invoices stored at {start.isoformat()} than a single query "
+                        "returns, cannot synchronize past them."
+                    )
+                filters = replace(filters, date_range=replace(filters.date_range, start=start))
+                page_offset = 0
+            elif page.has_more:
+                page_offset += 1
+            else:
+                return
+
+    def iter_new_invoices(self) -> Iterator[SyncedInvoice]:
+        """Iterate over the invoices stored since the last run, oldest first.
+
+        An invoice counts as processed once the next one is requested; the checkpoint is
+        saved every `checkpoint_interval` processed invoices and when the iteration ends,
+        also when it is stopped early or fails.
+        After a crash the next run resumes from the last saved checkpoint, so up to
+        `checkpoint_interval` invoices may be returned again.
+
+        Yields
+        ------
+        SyncedInvoice
+            The metadata, and the XML if downloading, of every new invoice.
+
+        Raises
+        ------
+        SyncError
+            If more invoices share one permanent storage date than a single query returns.
+        """
+        checkpoint = self.load_checkpoint()
+        unsaved = 0
+        try:
+            for invoice in self._query_new(checkpoint):
+                content = (
+                    self.client.download_invoice(invoice.ksef_number) if self.download else None
+                )
+                yield SyncedInvoice(metadata=invoice, content=content)
+                checkpoint.advance(invoice)
+                unsaved += 1
+                if unsaved >= self.checkpoint_interval:
+                    self.store.save(self.key, checkpoint)
+                    unsaved = 0
+        finally:
+            # Also keeps the progress when the consumer stops early or an error is raised
+            self.store.save(self.key, checkpoint)
+        logger.debug("Invoice sync %s done at %s", self.key, checkpoint.high_water_mark)
@@ -1,16 +1,31 @@
 """Miscellaneous utilities."""
 
+import gzip
+import json
+import os
 import re
+import secrets
+import tempfile
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from decimal import Decimal
 from http import HTTPStatus
-from typing import Optional
+from pathlib import Path
+from typing import Any, Callable, Deque, Iterable, Iterator, List, Optional, Set, TypeVar, Union
 
-from requests import Response
-
-from ksef.exceptions import KsefError, RateLimitExceededError, UnsupportedResponseError
+from ksef.exceptions import KsefError, RateLimitExceededError, Response, UnsupportedResponseError
 
 _CAMELCASE_TO_UNDERSCORE_RE = re.compile("((?<=[a-z0-9])[A-Z]|(?!^)[A-Z](?=[a-z]))")
 _HTTP_STATUS_RANGE_START = 200
 _HTTP_STATUS_RANGE_END = 299
+# KSEF sends 1 to 7 fractional second digits; `datetime.fromisoformat` accepts at most 6,
+# and before Python 3.11 exactly 3 or 6
+_FRACTION_RE = re.compile(r"\.(\d+)")
+
+T = TypeVar("T")
+R = TypeVar("R")
 
 
 def camelcase_to_words(value: str) -> str:
@@ -25,8 +40,56 @@ def camelcase_to_words(value: str) -> str:
     return new_value[0].upper() + new_value[1:]
 
 
+def parse_datetime(value: str) -> datetime:
+    """Parse an ISO 8601 timestamp from the KSEF API into an aware datetime (UTC if naive).
+
+    >>> parse_datetime("2025-07-11T12:23:56.0154302+00:00")
+    datetime.datetime(2025, 7, 11, 12, 23, 56, 15430, tzinfo=datetime.timezone.utc)
+    >>> parse_datetime("2025-07-11T12:23:56Z")
+    datetime.datetime(2025, 7, 11, 12, 23, 56, tzinfo=datetime.timezone.utc)
+    >>> parse_datetime("2025-01-01T10:00:00.1Z")
+    datetime.datetime(2025, 1, 1, 10, 0, 0, 100000, tzinfo=datetime.timezone.utc)
+    """
+    value = _FRACTION_RE.sub(
+        lambda match: "." + match[1][:6].ljust(6, "0"), value.replace("Z", "+00:00")
+    )
+    return ensure_aware(datetime.fromisoformat(value))
+
+
+def ensure_aware(value: datetime) -> datetime:
+    """Return the datetime as is if it is aware, taking a naive one to be in UTC.
+
+    >>> ensure_aware(datetime(2025, 1, 1))
+    datetime.datetime(2025, 1, 1, 0, 0, tzinfo=datetime.timezone.utc)
+    """
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def dumps_json(data: Any) -> str:
+    """Serialize to JSON, writing `Decimal` values as exact numbers instead of binary floats.
+
+    >>> dumps_json({"from": Decimal("0.10"), "to": Decimal("12345678901234567.89")})
+    '{"from": 0.10, "to": 12345678901234567.89}'
+    """
+    # `json` cannot emit raw number text, so Decimals are written as unique placeholder
+    # strings first and substituted afterwards
+    marker = secrets.token_hex(8)
+    numbers: List[str] = []
+
+    def default(value: Any) -> str:
+        if isinstance(value, Decimal) and value.is_finite():
+            numbers.append(str(value))
+            return f"{marker}{len(numbers) - 1}"
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+    text = json.dumps(data, default=default)
+    return re.sub(f'"{marker}(\\d+)"', lambda match: numbers[int(match[1])], text)
+
+
 def response_to_exception(response: Response) -> Optional[KsefError]:
-    """Convert a requests.Response object to a KsefError exception instance."""
+    """Convert a `requests` or `httpx` response object to a KsefError exception instance."""
     if _HTTP_STATUS_RANGE_START <= response.status_code <= _HTTP_STATUS_RANGE_END:
         return None
 
@@ -34,3 +97,67 @@ def response_to_exception(response: Response) -> Optional[KsefError]:
         return RateLimitExceededError(response=response)
 
     return UnsupportedResponseError(response=response)
+
+
+def bounded_map(
+    executor: Executor,
+    fn: Callable[[T], R],
+    iterable: Iterable[T],
+    max_in_flight: int,
+) -> Iterator[R]:
+    """Map `fn` over `iterable` on `executor`, yielding results in input order.
+
+    Unlike `Executor.map`, the input is consumed lazily: no more than `max_in_flight` items
+    are submitted ahead of the result currently being yielded.
+    """
+    pending: Deque["Future[R]"] = deque()
+    for item in iterable:
+        if len(pending) >= max_in_flight:
+            yield pending.popleft().result()
+        pending.append(executor.submit(fn, item))
+    while pending:
+        yield pending.popleft().result()
+
+
+def bounded_map_unordered(
+    executor: Executor,
+    fn: Callable[[T], R],
+    iterable: Iterable[T],
+    max_in_flight: int,
+) -> Iterator[R]:
+    """Map `fn` over `iterable` on `executor`, yielding results as soon as they are ready.
+
+    Like `bounded_map`, but a slow item does not hold back the results of later ones. No
+    more than `max_in_flight` items are submitted and not yet yielded.
+    """
+    pending: Set["Future[R]"] = set()
+    for item in iterable:
+        if len(pending) >= max_in_flight:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+        pending.add(executor.submit(fn, item))
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield future.result()
+
+
+def write_atomic(path: Path, data: Union[bytes, Iterable[bytes]], compress: bool = False) -> None:
+    """Write `data` to `path` atomically, so readers see either the old or the new file.
+
+    `data` may be an iterable of chunks, which are streamed to disk one by one. With
+    `compress`, the file is written gzip-compressed.
+    """
+    chunks = [data] if isinstance(data, bytes) else data
+    descriptor, temporary_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as file, (
+            gzip.GzipFile(fileobj=file, mode="wb") if compress else nullcontext(file)
+        ) as out:
+            for chunk in chunks:
+                out.write(chunk)
+        Path(temporary_path).replace(path)
+    except BaseException:
+        Path(temporary_path).unlink(missing_ok=True)
+        raise
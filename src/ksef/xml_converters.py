@@ -1,20 +1,67 @@
 """XML converters used to convert library models into KSEF-compliant XML files."""
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
-from typing import Optional, cast
+from enum import Enum
+from itertools import islice
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+    cast,
+)
 from xml.etree import ElementTree
+from xml.sax.saxutils import escape, quoteattr
 
 from ksef.models.invoice import (
+    Address,
     EuVatIdentification,
     ForeignIdentification,
     Invoice,
+    Issuer,
     NipIdentification,
     NoIdentification,
     PaymentInfo,
 )
+from ksef.models.invoice_annotations import InvoiceAnnotations
+from ksef.models.invoice_rows import InvoiceRow
+from ksef.utils import bounded_map, bounded_map_unordered
+
+T = TypeVar("T")
+
+# An invoice model, or its raw dict to be validated with Invoice.parse_obj
+InvoiceSource = Union[Invoice, Dict[str, Any]]
 
 # FA(3) schema namespace
 FA3_NAMESPACE = "http://crd.gov.pl/wzor/2025/06/25/13775/"
 
+ROOT_ATTRIBUTES = {
+    "xmlns:etd": "http://crd.gov.pl/xml/schematy/dziedzinowe/mf/2022/01/05/eD/DefinicjeTypy/",
+    "xmlns:xsi": "http://www.w3.org/2001/XMLSchema-instance",
+    "xmlns:xsd": "http://www.w3.org/2001/XMLSchema",
+    "xmlns": FA3_NAMESPACE,
+}
+
+
+class XmlSerializer(Enum):
+    """Implementation used by `convert_invoice_to_xml`; both produce identical bytes."""
+
+    # Builds an xml.etree element tree, then serializes it
+    ELEMENT_TREE = "etree"
+    # Writes the XML text directly, without building a tree first
+    DIRECT = "direct"
+
 
 def _build_header(
     root: ElementTree.Element,
@@ -339,20 +386,8 @@ def _build_invoice_data(root: ElementTree.Element, invoice: Invoice) -> None:
         _build_payment_info(invoice_data, invoice.invoice_data.payment_info)
 
 
-def convert_invoice_to_xml(invoice: Invoice, invoicing_software_name: str = "python-ksef") -> bytes:
-    """Convert an invoice model instance to XML document representing this invoice.
-
-    Uses FA(3) schema format (http://crd.gov.pl/wzor/2025/06/25/13775/).
-    """
-    root = ElementTree.Element(
-        "Faktura",
-        attrib={
-            "xmlns:etd": "http://crd.gov.pl/xml/schematy/dziedzinowe/mf/2022/01/05/eD/DefinicjeTypy/",
-            "xmlns:xsi": "http://www.w3.org/2001/XMLSchema-instance",
-            "xmlns:xsd": "http://www.w3.org/2001/XMLSchema",
-            "xmlns": FA3_NAMESPACE,
-        },
-    )
+def _convert_with_element_tree(invoice: Invoice, invoicing_software_name: str) -> bytes:
+    root = ElementTree.Element("Faktura", attrib=ROOT_ATTRIBUTES)
 
     _build_header(root, invoicing_software_name, invoice.creation_datetime)
     _build_issuer(root, invoice)
@@ -361,3 +396,531 @@ def convert_invoice_to_xml(invoice: Invoice, invoicing_software_name: str = "pyt
     _build_invoice_data(root, invoice)
 
     return cast(bytes, ElementTree.tostring(root, encoding="utf-8", xml_declaration=True))
+
+
+# The direct serializer below mirrors the _build_* functions above element by element, and
+# writes exactly what ElementTree.tostring() does: text escaped the same way and empty
+# elements written as "<Tag />".
+
+XML_DECLARATION = "<?xml version='1.0' encoding='utf-8'?>\n"
+ROOT_START_TAG = (
+    "<Faktura "
+    + " ".join(f"{name}={quoteattr(value)}" for name, value in ROOT_ATTRIBUTES.items())
+    + ">"
+)
+ROOT_END_TAG = "</Faktura>"
+
+ROWS_PER_CHUNK = 100  # invoice rows rendered at a time by the streaming functions
+DEFAULT_FRAGMENT_CACHE_SIZE = 1024  # rendered fragments kept by a FragmentCache
+DEFAULT_CONVERSION_CHUNK_SIZE = 64  # invoices sent to a worker process at a time
+# Chunks submitted ahead per worker process, so workers never wait for the next chunk
+CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
+
+def _element(tag: str, text: Optional[str]) -> str:
+    """Render an element holding only text."""
+    if text:
+        return f"<{tag}>{escape(text)}</{tag}>"
+    return f"<{tag} />"
+
+
+def _address_lines(address: Address) -> str:
+    address_l1 = f"{address.street} {address.house_number}"
+    if address.apartment_number is not None:
+        address_l1 += f"/{address.apartment_number}"
+    return (
+        "<Adres>"
+        + _element("KodKraju", address.country_code)
+        + _element("AdresL1", address_l1)
+        + _element("AdresL2", f"{address.postal_code} {address.city}")
+        + "</Adres>"
+    )
+
+
+def _subject_identification(
+    identification_data: Union[
+        NipIdentification, EuVatIdentification, ForeignIdentification, NoIdentification
+    ],
+    name: Optional[str],
+) -> str:
+    out = ["<DaneIdentyfikacyjne>"]
+    if isinstance(identification_data, NipIdentification):
+        out.append(_element("NIP", identification_data.nip))
+    elif isinstance(identification_data, EuVatIdentification):
+        out.append(_element("KodUE", identification_data.eu_country_code))
+        out.append(_element("NrVatUE", identification_data.eu_vat_number))
+    elif isinstance(identification_data, ForeignIdentification):
+        if identification_data.country_code is not None:
+            out.append(_element("KodKraju", identification_data.country_code))
+        out.append(_element("NrID", identification_data.tax_id))
+    elif isinstance(identification_data, NoIdentification):
+        out.append(_element("BrakID", "1"))
+    if name is not None:
+        out.append(_element("Nazwa", name))
+    out.append("</DaneIdentyfikacyjne>")
+    return "".join(out)
+
+
+class FragmentCache:
+    """Thread-safe LRU cache of rendered XML fragments.
+
+    Invoices sent in one run mostly share the issuer, the annotations and the software
+    name, so the direct serializer renders those parts once and reuses the text. Fragments
+    are keyed on every value they are rendered from, so a cached fragment is always exactly
+    what rendering would produce, escaping included.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_FRAGMENT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._fragments: "OrderedDict[Tuple[Hashable, ...], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_render(self, key: Tuple[Hashable, ...], render: Callable[[], str]) -> str:
+        """Return the fragment cached under the key, calling `render` to create it on a miss."""
+        with self._lock:
+            fragment = self._fragments.get(key)
+            if fragment is not None:
+                self._fragments.move_to_end(key)
+                return fragment
+        fragment = render()
+        with self._lock:
+            self._fragments[key] = fragment
+            while len(self._fragments) > self.maxsize:
+                self._fragments.popitem(last=False)
+        return fragment
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self._fragments)
+
+    def clear(self) -> None:
+        """Drop all cached fragments."""
+        with self._lock:
+            self._fragments.clear()
+
+
+default_fragment_cache = FragmentCache()
+
+
+def _cached(
+    cache: Optional[FragmentCache], key: Tuple[Hashable, ...], render: Callable[[], str]
+) -> str:
+    return render() if cache is None else cache.get_or_render(key, render)
+
+
+def _render_header_end(invoicing_software_name: str) -> str:
+    return _element("SystemInfo", invoicing_software_name) + "</Naglowek>"
+
+
+def _write_header(
+    out: List[str],
+    invoicing_software_name: str,
+    creation_datetime: Optional[datetime],
+    cache: Optional[FragmentCache],
+) -> None:
+    dt = creation_datetime or datetime.now(tz=timezone.utc)
+    out.append(
+        '<Naglowek><KodFormularza kodSystemowy="FA (3)" wersjaSchemy="1-0E">FA</KodFormularza>'
+        "<WariantFormularza>3</WariantFormularza>"
+    )
+    out.append(_element("DataWytworzeniaFa", dt.strftime("%Y-%m-%dT%H:%M:%S")))
+    out.append(
+        _cached(
+            cache,
+            ("SystemInfo", invoicing_software_name),
+            lambda: _render_header_end(invoicing_software_name),
+        )
+    )
+
+
+def _render_issuer(issuer: Issuer) -> str:
+    return (
+        "<Podmiot1><DaneIdentyfikacyjne>"
+        + _element("NIP", issuer.identification_data.nip)
+        + _element("Nazwa", issuer.identification_data.full_name)
+        + "</DaneIdentyfikacyjne>"
+        + _address_lines(issuer.address)
+        + "</Podmiot1>"
+    )
+
+
+def _write_issuer(out: List[str], invoice: Invoice, cache: Optional[FragmentCache]) -> None:
+    issuer = invoice.issuer
+    address = issuer.address
+    key = (
+        "Podmiot1",
+        issuer.identification_data.nip,
+        issuer.identification_data.full_name,
+        address.country_code,
+        address.street,
+        address.house_number,
+        address.apartment_number,
+        address.postal_code,
+        address.city,
+    )
+    out.append(_cached(cache, key, lambda: _render_issuer(issuer)))
+
+
+def _write_receiver(out: List[str], invoice: Invoice) -> None:
+    recipient = invoice.recipient
+    out.append("<Podmiot2>")
+    out.append(_subject_identification(recipient.identification_data, recipient.name))
+    if recipient.address is not None:
+        out.append(_address_lines(recipient.address))
+    out.append(_element("JST", str(recipient.jst)))
+    out.append(_element("GV", str(recipient.gv)))
+    out.append("</Podmiot2>")
+
+
+def _write_additional_recipients(out: List[str], invoice: Invoice) -> None:
+    for recipient in invoice.additional_recipients:
+        out.append("<Podmiot3>")
+        out.append(_subject_identification(recipient.identification_data, recipient.name))
+        if recipient.address is not None:
+            out.append(_address_lines(recipient.address))
+        out.append(_element("Rola", str(recipient.role)))
+        out.append("</Podmiot3>")
+
+
+def _render_annotations(data: InvoiceAnnotations) -> str:
+    if data.free_from_vat.value == "1":
+        exemption = "<Zwolnienie><P_19>1</P_19></Zwolnienie>"
+    else:
+        exemption = "<Zwolnienie><P_19N>1</P_19N></Zwolnienie>"
+    if data.intra_community_supply_of_new_transport_methods.value == "1":
+        new_transport = (
+            "<NoweSrodkiTransportu><P_22>1</P_22><P_42_5>2</P_42_5></NoweSrodkiTransportu>"
+        )
+    else:
+        new_transport = "<NoweSrodkiTransportu><P_22N>1</P_22N></NoweSrodkiTransportu>"
+    if data.margin_procedure.value == "1":
+        margin = "<PMarzy><P_PMarzy>1</P_PMarzy></PMarzy>"
+    else:
+        margin = "<PMarzy><P_PMarzyN>1</P_PMarzyN></PMarzy>"
+    return (
+        "<Adnotacje>"
+        + _element("P_16", data.tax_settlement_on_payment.value)
+        + _element("P_17", data.self_invoice.value)
+        + _element("P_18", data.reverse_charge.value)
+        + _element("P_18A", data.split_payment.value)
+        + exemption
+        + new_transport
+        + _element("P_23", data.simplified_procedure_by_second_tax_payer.value)
+        + margin
+        + "</Adnotacje>"
+    )
+
+
+def _write_annotations(out: List[str], invoice: Invoice, cache: Optional[FragmentCache]) -> None:
+    data = invoice.invoice_data.invoice_annotations
+    key = (
+        "Adnotacje",
+        data.tax_settlement_on_payment,
+        data.self_invoice,
+        data.reverse_charge,
+        data.split_payment,
+        data.free_from_vat,
+        data.intra_community_supply_of_new_transport_methods,
+        data.simplified_procedure_by_second_tax_payer,
+        data.margin_procedure,
+    )
+    out.append(_cached(cache, key, lambda: _render_annotations(data)))
+
+
+def _write_tax_summary(out: List[str], invoice: Invoice) -> None:
+    ts = invoice.invoice_data.tax_summary
+    if ts is None:
+        return
+    for tag, value in (
+        ("P_13_1", ts.net_standard),
+        ("P_14_1", ts.vat_standard),
+        ("P_14_1W", ts.vat_standard_pln),
+        ("P_13_2", ts.net_reduced_1),
+        ("P_14_2", ts.vat_reduced_1),
+        ("P_14_2W", ts.vat_reduced_1_pln),
+        ("P_13_3", ts.net_reduced_2),
+        ("P_14_3", ts.vat_reduced_2),
+        ("P_14_3W", ts.vat_reduced_2_pln),
+        ("P_13_4", ts.net_flat_rate),
+        ("P_14_4", ts.vat_flat_rate),
+        ("P_13_5", ts.net_oss),
+        ("P_14_5", ts.vat_oss),
+        ("P_13_6_1", ts.net_zero_domestic),
+        ("P_13_6_2", ts.net_zero_wdt),
+        ("P_13_6_3", ts.net_zero_export),
+        ("P_13_7", ts.net_exempt),
+        ("P_13_8", ts.net_not_subject),
+        ("P_13_9", ts.net_not_subject_art100),
+        ("P_13_10", ts.net_reverse_charge),
+    ):
+        if value is not None:
+            out.append(_element(tag, str(value)))
+
+
+def _write_additional_descriptions(out: List[str], invoice: Invoice) -> None:
+    for desc in invoice.invoice_data.additional_descriptions:
+        out.append("<DodatkowyOpis>")
+        if desc.row_number is not None:
+            out.append(_element("NrWiersza", str(desc.row_number)))
+        out.append(_element("Klucz", desc.key))
+        out.append(_element("Wartosc", desc.value))
+        out.append("</DodatkowyOpis>")
+
+
+def _write_invoice_row(out: List[str], index: int, row: InvoiceRow) -> None:
+    out.append(f"<FaWiersz><NrWierszaFa>{index}</NrWierszaFa>")
+    if row.delivery_date is not None:
+        out.append(f"<P_6A>{row.delivery_date:%Y-%m-%d}</P_6A>")
+    out.append(_element("P_7", row.name))
+    if row.unit_of_measure is not None:
+        out.append(_element("P_8A", row.unit_of_measure))
+    if row.quantity is not None:
+        out.append(_element("P_8B", str(row.quantity)))
+    if row.unit_net_price is not None:
+        out.append(_element("P_9A", str(row.unit_net_price)))
+    if row.net_value is not None:
+        out.append(_element("P_11", str(row.net_value)))
+    if row.tax_oss is not None:
+        out.append(_element("P_12_XII", str(row.tax_oss)))
+    elif row.tax is not None:
+        out.append(_element("P_12", str(row.tax)))
+    if row.exchange_rate is not None:
+        out.append(_element("KursWaluty", str(row.exchange_rate)))
+    out.append("</FaWiersz>")
+
+
+def _write_payment_info(out: List[str], payment: PaymentInfo) -> None:
+    out.append("<Platnosc>")
+    if payment.is_paid:
+        out.append("<Zaplacono>1</Zaplacono>")
+    if payment.payment_date is not None:
+        out.append(f"<DataZaplaty>{payment.payment_date:%Y-%m-%d}</DataZaplaty>")
+    if payment.due_date is not None or payment.due_description is not None:
+        out.append("<TerminPlatnosci>")
+        if payment.due_date is not None:
+            out.append(f"<Termin>{payment.due_date:%Y-%m-%d}</Termin>")
+        if payment.due_description is not None:
+            out.append(_element("TerminOpis", payment.due_description))
+        out.append("</TerminPlatnosci>")
+    if payment.method is not None:
+        out.append(_element("FormaPlatnosci", str(payment.method)))
+    if payment.bank_account_number is not None:
+        out.append(
+            "<RachunekBankowy>"
+            + _element("NrRB", payment.bank_account_number)
+            + "</RachunekBankowy>"
+        )
+    out.append("</Platnosc>")
+
+
+def _write_invoice_data_head(
+    out: List[str], invoice: Invoice, cache: Optional[FragmentCache]
+) -> None:
+    """Write the opening of the Fa element, up to its first row."""
+    data = invoice.invoice_data
+    out.append("<Fa>")
+    out.append(_element("KodWaluty", data.currency_code))
+    out.append(f"<P_1>{data.issue_date:%Y-%m-%d}</P_1>")
+    out.append(_element("P_2", data.issue_number))
+    out.append(f"<P_6>{data.sell_date:%Y-%m-%d}</P_6>")
+    _write_tax_summary(out, invoice)
+    out.append(_element("P_15", str(data.total_amount)))
+    _write_annotations(out, invoice, cache)
+    out.append(_element("RodzajFaktury", data.invoice_type.value))
+    _write_additional_descriptions(out, invoice)
+
+
+def _write_invoice_data_tail(out: List[str], invoice: Invoice) -> None:
+    """Write the rest of the Fa element, after its last row."""
+    if invoice.invoice_data.payment_info is not None:
+        _write_payment_info(out, invoice.invoice_data.payment_info)
+    out.append("</Fa>")
+
+
+def _iter_xml_text(
+    invoice: Invoice,
+    invoicing_software_name: str,
+    rows_per_chunk: Optional[int],
+    cache: Optional[FragmentCache],
+) -> Iterator[str]:
+    """Yield the XML text of an invoice, in one piece or split every `rows_per_chunk` rows."""
+    out = [XML_DECLARATION, ROOT_START_TAG]
+    _write_header(out, invoicing_software_name, invoice.creation_datetime, cache)
+    _write_issuer(out, invoice, cache)
+    _write_receiver(out, invoice)
+    _write_additional_recipients(out, invoice)
+    _write_invoice_data_head(out, invoice, cache)
+    for index, row in enumerate(invoice.invoice_data.invoice_rows.rows, start=1):
+        _write_invoice_row(out, index, row)
+        if rows_per_chunk and index % rows_per_chunk == 0:
+            yield "".join(out)
+            out.clear()
+    _write_invoice_data_tail(out, invoice)
+    out.append(ROOT_END_TAG)
+    yield "".join(out)
+
+
+def _convert_directly(
+    invoice: Invoice, invoicing_software_name: str, cache: Optional[FragmentCache]
+) -> bytes:
+    return "".join(_iter_xml_text(invoice, invoicing_software_name, None, cache)).encode()
+
+
+def iter_invoice_xml(
+    invoice: Invoice,
+    invoicing_software_name: str = "python-ksef",
+    rows_per_chunk: int = ROWS_PER_CHUNK,
+    fragment_cache: Optional[FragmentCache] = default_fragment_cache,
+) -> Iterator[bytes]:
+    """Serialize an invoice to FA(3) XML incrementally.
+
+    The chunks joined together are exactly what `convert_invoice_to_xml` returns, but only
+    `rows_per_chunk` rows are rendered at a time, so memory use does not grow with the
+    number of rows. The chunks can be passed straight to `ksef.encryption.encrypt_stream`.
+
+    Parameters
+    ----------
+    invoice : Invoice
+        The invoice to convert.
+    invoicing_software_name : str
+        Name of the software reported in SystemInfo.
+    rows_per_chunk : int
+        Number of invoice rows rendered into each chunk.
+    fragment_cache : FragmentCache, optional
+        Cache of the rendered parts shared between invoices, or None to render everything.
+
+    Yields
+    ------
+    bytes
+        Consecutive UTF-8 encoded pieces of the document.
+    """
+    for text in _iter_xml_text(invoice, invoicing_software_name, rows_per_chunk, fragment_cache):
+        yield text.encode()
+
+
+def write_invoice_xml(
+    invoice: Invoice,
+    file: IO[bytes],
+    invoicing_software_name: str = "python-ksef",
+    rows_per_chunk: int = ROWS_PER_CHUNK,
+    fragment_cache: Optional[FragmentCache] = default_fragment_cache,
+) -> int:
+    """Write an invoice as FA(3) XML to a binary file object, chunk by chunk.
+
+    See `iter_invoice_xml`. Returns the number of bytes written.
+    """
+    size = 0
+    for chunk in iter_invoice_xml(invoice, invoicing_software_name, rows_per_chunk, fragment_cache):
+        file.write(chunk)
+        size += len(chunk)
+    return size
+
+
+def convert_invoice_to_xml(
+    invoice: Invoice,
+    invoicing_software_name: str = "python-ksef",
+    serializer: XmlSerializer = XmlSerializer.DIRECT,
+    fragment_cache: Optional[FragmentCache] = default_fragment_cache,
+) -> bytes:
+    """Convert an invoice model instance to XML document representing this invoice.
+
+    Uses FA(3) schema format (http://crd.gov.pl/wzor/2025/06/25/13775/).
+
+    Parameters
+    ----------
+    invoice : Invoice
+        The invoice to convert.
+    invoicing_software_name : str
+        Name of the software reported in SystemInfo.
+    serializer : XmlSerializer
+        Implementation to use. Both produce byte-identical output; DIRECT skips building an
+        element tree and is several times faster on invoices with many rows.
+    fragment_cache : FragmentCache, optional
+        Cache of the parts shared between invoices (header, issuer, annotations) used by the
+        DIRECT serializer, or None to render everything.
+    """
+    if serializer is XmlSerializer.ELEMENT_TREE:
+        return _convert_with_element_tree(invoice, invoicing_software_name)
+    return _convert_directly(invoice, invoicing_software_name, fragment_cache)
+
+
+def _chunks(items: Iterable[T], size: int) -> Iterator[Tuple[int, List[T]]]:
+    """Split items into lists of `size`, each with the index of its first item."""
+    iterator = iter(items)
+    start = 0
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield start, chunk
+        start += len(chunk)
+
+
+def _convert_chunk(job: Tuple[int, List[InvoiceSource], str]) -> Tuple[int, List[bytes]]:
+    """Convert a chunk of invoices, in a worker process."""
+    start, invoices, invoicing_software_name = job
+    return start, [
+        convert_invoice_to_xml(
+            invoice if isinstance(invoice, Invoice) else Invoice.parse_obj(invoice),
+            invoicing_software_name,
+        )
+        for invoice in invoices
+    ]
+
+
+def convert_invoices_to_xml(
+    invoices: Iterable[InvoiceSource],
+    workers: Optional[int] = None,
+    invoicing_software_name: str = "python-ksef",
+    chunk_size: int = DEFAULT_CONVERSION_CHUNK_SIZE,
+    ordered: bool = True,
+) -> Iterator[Tuple[int, bytes]]:
+    """Convert many invoices to FA(3) XML in parallel, on a pool of worker processes.
+
+    Invoices are sent to the workers in chunks, and only a couple of chunks per worker are
+    in flight at a time, so `invoices` is consumed lazily and memory use stays bounded
+    however many there are.
+
+    Invoices may be given as `Invoice` models or as their raw dicts (e.g. `invoice.dict()`
+    or JSON loaded from a queue), which are validated with `Invoice.parse_obj` in the
+    workers. Raw dicts of JSON-compatible values are several times cheaper to send to
+    a worker than models, so use them if the parent process would otherwise become the
+    bottleneck.
+
+    Parameters
+    ----------
+    invoices : Iterable[Invoice or dict]
+        The invoices to convert; consumed lazily.
+    workers : int, optional
+        Number of worker processes, the number of CPUs by default. With 1, invoices are
+        converted in the calling process.
+    invoicing_software_name : str
+        Name of the software reported in SystemInfo.
+    chunk_size : int
+        Number of invoices sent to a worker at a time.
+    ordered : bool
+        Whether to yield the results in input order. Otherwise results are yielded as soon
+        as their chunk is converted.
+
+    Yields
+    ------
+    tuple[int, bytes]
+        Index of the invoice in `invoices` and its XML.
+    """
+    workers = workers or os.cpu_count() or 1
+    jobs = (
+        (start, chunk, invoicing_software_name) for start, chunk in _chunks(invoices, chunk_size)
+    )
+    if workers == 1:
+        for start, documents in map(_convert_chunk, jobs):
+            yield from enumerate(documents, start)
+        return
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        mapper = bounded_map if ordered else bounded_map_unordered
+        for start, documents in mapper(
+            executor, _convert_chunk, jobs, workers * CHUNKS_IN_FLIGHT_PER_WORKER
+        ):
+            yield from enumerate(documents, start)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,422 @@
+"""XML parsers used to read KSEF FA(3) invoice files back into library models.
+
+The document is read with `lxml.etree.iterparse`, one top-level part at a time; every
+part is discarded once it is converted, so invoices with many rows are parsed in constant
+memory. Row models are created without re-validation, the parser already produces values
+of the right types.
+
+The models describe only the part of the FA(3) schema that the library writes; other
+elements are ignored. The address lines (AdresL1/AdresL2) are split back into street,
+house number, apartment number, postal code and city on a best-effort basis.
+"""
+import io
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union, cast, get_args
+
+from lxml import etree
+
+from ksef.exceptions import InvoiceParseError
+from ksef.models.invoice import (
+    AdditionalDescription,
+    AdditionalRecipient,
+    Address,
+    EuVatIdentification,
+    ForeignIdentification,
+    Invoice,
+    InvoiceData,
+    InvoiceType,
+    Issuer,
+    IssuerIdentificationData,
+    NipIdentification,
+    NoIdentification,
+    PaymentInfo,
+    Subject,
+    TaxSummary,
+)
+from ksef.models.invoice_annotations import (
+    FreeFromVat,
+    IntraCommunitySupplyOfNewTransportMethods,
+    InvoiceAnnotations,
+    MarginProcedure,
+    ReverseCharge,
+    SelfInvoicing,
+    SimplifiedProcedureBySecondTaxPayer,
+    SplitPayment,
+    TaxSettlementOnPayment,
+)
+from ksef.models.invoice_rows import InvoiceRow, InvoiceRows, TaxRate
+from ksef.utils import parse_datetime
+from ksef.xml_converters import FA3_NAMESPACE
+
+# XML content (bytes), a path (str or Path) or a binary file object
+InvoiceXmlSource = Union[bytes, str, Path, BinaryIO]
+
+_PREFIX = f"{{{FA3_NAMESPACE}}}"
+_ROW_TAG = f"{_PREFIX}FaWiersz"
+_PART_TAGS = [
+    f"{_PREFIX}{name}"
+    for name in ("Naglowek", "Podmiot1", "Podmiot2", "Podmiot3", "FaWiersz", "Fa")
+]
+
+# Tax summary element names (P_13_*/P_14_*) and the TaxSummary fields they map to
+_TAX_SUMMARY_FIELDS = {
+    "P_13_1": "net_standard",
+    "P_14_1": "vat_standard",
+    "P_14_1W": "vat_standard_pln",
+    "P_13_2": "net_reduced_1",
+    "P_14_2": "vat_reduced_1",
+    "P_14_2W": "vat_reduced_1_pln",
+    "P_13_3": "net_reduced_2",
+    "P_14_3": "vat_reduced_2",
+    "P_14_3W": "vat_reduced_2_pln",
+    "P_13_4": "net_flat_rate",
+    "P_14_4": "vat_flat_rate",
+    "P_13_5": "net_oss",
+    "P_14_5": "vat_oss",
+    "P_13_6_1": "net_zero_domestic",
+    "P_13_6_2": "net_zero_wdt",
+    "P_13_6_3": "net_zero_export",
+    "P_13_7": "net_exempt",
+    "P_13_8": "net_not_subject",
+    "P_13_9": "net_not_subject_art100",
+    "P_13_10": "net_reverse_charge",
+}
+
+_Children = Dict[str, etree._Element]
+_SubjectIdentification = Union[
+    NipIdentification, EuVatIdentification, ForeignIdentification, NoIdentification
+]
+
+
+def _children(element: etree._Element) -> _Children:
+    """Map the local names of the FA(3) children of an element to the children."""
+    prefix_length = len(_PREFIX)
+    return {
+        child.tag[prefix_length:]: child
+        for child in element
+        if isinstance(child.tag, str) and child.tag.startswith(_PREFIX)
+    }
+
+
+def _text(children: _Children, name: str) -> Optional[str]:
+    child = children.get(name)
+    return None if child is None else (child.text or "")
+
+
+def _required_text(children: _Children, name: str) -> str:
+    text = _text(children, name)
+    if text is None:
+        raise InvoiceParseError(f"Missing required element {name}.")
+    return text
+
+
+def _decimal(text: Optional[str]) -> Optional[Decimal]:
+    return None if text is None else Decimal(text)
+
+
+def _date(text: Optional[str]) -> Optional[date]:
+    return None if text is None else date.fromisoformat(text)
+
+
+def _tax_rate(text: str) -> TaxRate:
+    rate: Union[int, str] = int(text) if text.isdigit() else text
+    if rate not in get_args(TaxRate):
+        raise InvoiceParseError(f"Unknown tax rate {text!r} in P_12.")
+    return cast(TaxRate, rate)
+
+
+def _split_address_line(line: str) -> Tuple[str, str]:
+    """Split "<first part> <last word>", as written to AdresL1 and AdresL2."""
+    first, _, last = line.rpartition(" ")
+    return (first, last) if first else (line, "")
+
+
+def _parse_address(element: etree._Element) -> Address:
+    children = _children(element)
+    street, house = _split_address_line(_text(children, "AdresL1") or "")
+    house_number, _, apartment_number = house.partition("/")
+    postal_code, _, city = (_text(children, "AdresL2") or "").partition(" ")
+    return Address(
+        country_code=_required_text(children, "KodKraju"),
+        street=street,
+        house_number=house_number,
+        apartment_number=apartment_number or None,
+        postal_code=postal_code,
+        city=city,
+    )
+
+
+def _parse_subject_identification(children: _Children) -> _SubjectIdentification:
+    if "NIP" in children:
+        return NipIdentification(nip=_required_text(children, "NIP"))
+    if "NrVatUE" in children:
+        return EuVatIdentification(
+            eu_country_code=_required_text(children, "KodUE"),
+            eu_vat_number=_required_text(children, "NrVatUE"),
+        )
+    if "NrID" in children:
+        return ForeignIdentification(
+            country_code=_text(children, "KodKraju"), tax_id=_required_text(children, "NrID")
+        )
+    return NoIdentification()
+
+
+def _parse_issuer(element: etree._Element) -> Issuer:
+    children = _children(element)
+    id_data = _children(children["DaneIdentyfikacyjne"])
+    contact = _children(children["DaneKontaktowe"]) if "DaneKontaktowe" in children else {}
+    return Issuer(
+        identification_data=IssuerIdentificationData(
+            nip=_required_text(id_data, "NIP"), full_name=_required_text(id_data, "Nazwa")
+        ),
+        address=_parse_address(children["Adres"]),
+        email=_text(contact, "Email") or "",
+        phone=_text(contact, "Telefon") or "",
+    )
+
+
+def _parse_recipient(element: etree._Element) -> Subject:
+    children = _children(element)
+    id_data = _children(children["DaneIdentyfikacyjne"])
+    return Subject(
+        identification_data=_parse_subject_identification(id_data),
+        name=_text(id_data, "Nazwa"),
+        address=_parse_address(children["Adres"]) if "Adres" in children else None,
+        jst=int(_text(children, "JST") or 2),
+        gv=int(_text(children, "GV") or 2),
+    )
+
+
+def _parse_additional_recipient(element: etree._Element) -> AdditionalRecipient:
+    children = _children(element)
+    id_data = _children(children["DaneIdentyfikacyjne"])
+    return AdditionalRecipient(
+        identification_data=_parse_subject_identification(id_data),
+        name=_text(id_data, "Nazwa"),
+        address=_parse_address(children["Adres"]) if "Adres" in children else None,
+        role=int(_required_text(children, "Rola")),
+    )
+
+
+def _parse_annotations(element: etree._Element) -> InvoiceAnnotations:
+    children = _children(element)
+    exemption = _children(children["Zwolnienie"]) if "Zwolnienie" in children else {}
+    new_transport = (
+        _children(children["NoweSrodkiTransportu"]) if "NoweSrodkiTransportu" in children else {}
+    )
+    margin = _children(children["PMarzy"]) if "PMarzy" in children else {}
+    return InvoiceAnnotations(
+        tax_settlement_on_payment=TaxSettlementOnPayment(_required_text(children, "P_16")),
+        self_invoice=SelfInvoicing(_required_text(children, "P_17")),
+        reverse_charge=ReverseCharge(_required_text(children, "P_18")),
+        split_payment=SplitPayment(_required_text(children, "P_18A")),
+        free_from_vat=FreeFromVat.YES if "P_19" in exemption else FreeFromVat.NO,
+        intra_community_supply_of_new_transport_methods=(
+            IntraCommunitySupplyOfNewTransportMethods.YES
+            if "P_22" in new_transport
+            else IntraCommunitySupplyOfNewTransportMethods.NO
+        ),
+        simplified_procedure_by_second_tax_payer=SimplifiedProcedureBySecondTaxPayer(
+            _required_text(children, "P_23")
+        ),
+        margin_procedure=MarginProcedure.YES if "P_PMarzy" in margin else MarginProcedure.NO,
+    )
+
+
+def _parse_payment_info(element: etree._Element) -> PaymentInfo:
+    children = _children(element)
+    due = _children(children["TerminPlatnosci"]) if "TerminPlatnosci" in children else {}
+    account = _children(children["RachunekBankowy"]) if "RachunekBankowy" in children else {}
+    method = _text(children, "FormaPlatnosci")
+    return PaymentInfo(
+        is_paid=_text(children, "Zaplacono") == "1",
+        payment_date=_date(_text(children, "DataZaplaty")),
+        due_date=_date(_text(due, "Termin")),
+        due_description=_text(due, "TerminOpis"),
+        method=int(method) if method else None,
+        bank_account_number=_text(account, "NrRB"),
+    )
+
+
+def _parse_row(element: etree._Element) -> InvoiceRow:
+    children = _children(element)
+    tax = _text(children, "P_12")
+    return InvoiceRow.construct(
+        name=_text(children, "P_7") or "",
+        unit_of_measure=_text(children, "P_8A"),
+        quantity=_decimal(_text(children, "P_8B")),
+        unit_net_price=_decimal(_text(children, "P_9A")),
+        net_value=_decimal(_text(children, "P_11")),
+        tax=None if tax is None else _tax_rate(tax),
+        tax_oss=_decimal(_text(children, "P_12_XII")),
+        delivery_date=_date(_text(children, "P_6A")),
+        exchange_rate=_decimal(_text(children, "KursWaluty")),
+    )
+
+
+def _parse_invoice_data(element: etree._Element, rows: List[InvoiceRow]) -> InvoiceData:
+    children = _children(element)
+    tax_summary = {
+        field: Decimal(children[name].text or "0")
+        for name, field in _TAX_SUMMARY_FIELDS.items()
+        if name in children
+    }
+    issue_date = date.fromisoformat(_required_text(children, "P_1"))
+    sell_date = _date(_text(children, "P_6"))
+    payment = children.get("Platnosc")
+    return InvoiceData(
+        currency_code=_required_text(children, "KodWaluty"),
+        issue_date=issue_date,
+        issue_number=_required_text(children, "P_2"),
+        sell_date=sell_date or issue_date,
+        total_amount=Decimal(_required_text(children, "P_15")),
+        tax_summary=TaxSummary(**tax_summary) if tax_summary else None,
+        invoice_annotations=_parse_annotations(children["Adnotacje"]),
+        invoice_type=InvoiceType(_required_text(children, "RodzajFaktury")),
+        additional_descriptions=tuple(
+            _parse_additional_description(child)
+            for child in element
+            if child.tag == f"{_PREFIX}DodatkowyOpis"
+        ),
+        invoice_rows=InvoiceRows.construct(rows=rows),
+        payment_info=None if payment is None else _parse_payment_info(payment),
+    )
+
+
+def _parse_additional_description(element: etree._Element) -> AdditionalDescription:
+    children = _children(element)
+    row_number = _text(children, "NrWiersza")
+    return AdditionalDescription(
+        key=_required_text(children, "Klucz"),
+        value=_required_text(children, "Wartosc"),
+        row_number=int(row_number) if row_number else None,
+    )
+
+
+def _iter_parts(source: InvoiceXmlSource) -> Iterator[Tuple[str, etree._Element]]:
+    """Yield the completed top-level parts and rows of a document, with their local names.
+
+    Every part is cleared once the caller is done with it, and rows are removed from the
+    tree altogether, so the tree never grows with the number of rows.
+    """
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    elif isinstance(source, Path):
+        source = str(source)
+    try:
+        for _, element in etree.iterparse(
+            source,
+            events=("end",),
+            tag=_PART_TAGS,
+            resolve_entities=False,
+            no_network=True,
+        ):
+            yield element.tag[len(_PREFIX) :], element
+            element.clear(keep_tail=True)
+            previous = element.getprevious()
+            if element.tag == _ROW_TAG and previous is not None and previous.tag == _ROW_TAG:
+                element.getparent().remove(previous)
+    except etree.XMLSyntaxError as error:
+        raise InvoiceParseError(f"Invalid invoice XML: {error}") from error
+    except OSError as error:
+        raise InvoiceParseError(f"Could not read invoice XML: {error}") from error
+
+
+@dataclass
+class _InvoiceParts:
+    """The parts of an invoice collected while reading the document."""
+
+    include_rows: bool
+    issuer: Optional[Issuer] = None
+    recipient: Optional[Subject] = None
+    additional_recipients: List[AdditionalRecipient] = field(default_factory=list)
+    rows: List[InvoiceRow] = field(default_factory=list)
+    invoice_data: Optional[InvoiceData] = None
+    creation_datetime: Optional[datetime] = None
+
+    def add(self, name: str, element: etree._Element) -> None:
+        """Convert a completed part of the document."""
+        if name == "FaWiersz":
+            if self.include_rows:
+                self.rows.append(_parse_row(element))
+        elif name == "Naglowek":
+            created = _text(_children(element), "DataWytworzeniaFa")
+            self.creation_datetime = parse_datetime(created) if created else None
+        elif name == "Podmiot1":
+            self.issuer = _parse_issuer(element)
+        elif name == "Podmiot2":
+            self.recipient = _parse_recipient(element)
+        elif name == "Podmiot3":
+            self.additional_recipients.append(_parse_additional_recipient(element))
+        elif name == "Fa":
+            self.invoice_data = _parse_invoice_data(element, self.rows)
+
+    def to_invoice(self) -> Invoice:
+        """Build the invoice, once the whole document is read."""
+        if self.issuer is None or self.recipient is None or self.invoice_data is None:
+            raise InvoiceParseError(f"Not an FA(3) invoice (namespace {FA3_NAMESPACE}).")
+        return Invoice(
+            issuer=self.issuer,
+            recipient=self.recipient,
+            additional_recipients=tuple(self.additional_recipients),
+            invoice_data=self.invoice_data,
+            creation_datetime=self.creation_datetime,
+        )
+
+
+def iter_invoice_rows(source: InvoiceXmlSource) -> Iterator[InvoiceRow]:
+    """Iterate over the rows (FaWiersz) of an FA(3) invoice, parsing them lazily.
+
+    Only one row is held in memory at a time, so this suits invoices with any number of
+    rows. Combine with `parse_invoice_xml(source, include_rows=False)` to read the rest of
+    the invoice.
+
+    Parameters
+    ----------
+    source : bytes, str, Path or file object
+        The invoice XML as bytes, or a path (a string is always a path, never XML content) or
+        binary file object to read it from.
+
+    Yields
+    ------
+    InvoiceRow
+        The invoice rows, in document order.
+    """
+    for name, element in _iter_parts(source):
+        if name == "FaWiersz":
+            yield _parse_row(element)
+
+
+def parse_invoice_xml(source: InvoiceXmlSource, include_rows: bool = True) -> Invoice:
+    """Parse an FA(3) invoice XML document, e.g. from `Client.download_invoice`, into a model.
+
+    Parameters
+    ----------
+    source : bytes, str, Path or file object
+        The invoice XML as bytes, or a path (a string is always a path, never XML content) or
+        binary file object to read it from.
+    include_rows : bool
+        Whether to parse the invoice rows. Without them the invoice has no rows, and the
+        document is still read in constant memory; use `iter_invoice_rows` to read the rows.
+
+    Returns
+    -------
+    Invoice
+        The parsed invoice.
+
+    Raises
+    ------
+    InvoiceParseError
+        If the document is not well-formed, not an FA(3) invoice or misses required data.
+    """
+    parts = _InvoiceParts(include_rows=include_rows)
+    try:
+        for name, element in _iter_parts(source):
+            parts.add(name, element)
+        # Model validation errors (pydantic's ValidationError is a ValueError) are reported too
+        return parts.to_invoice()
+    except (KeyError, ValueError, ArithmeticError) as error:
+        raise InvoiceParseError(f"Invalid FA(3) invoice: {error!r}") from error
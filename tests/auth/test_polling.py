@@ -0,0 +1,70 @@
+"""Tests for the authorization status polling strategy."""
+from typing import Any, Dict, List
+
+import pytest
+from responses import RequestsMock
+
+from ksef.auth.token import TokenAuthorization
+from ksef.constants import URL_AUTH_STATUS, Environment
+from ksef.exceptions import AuthenticationError
+from ksef.polling import PollingStrategy
+
+BASE = Environment.TEST.value
+STATUS_URL = f"{BASE}{URL_AUTH_STATUS.format(reference_number='ref-123')}"
+
+
+def _status(code: int, description: str = "In progress") -> Dict[str, Any]:
+    return {"status": {"code": code, "description": description}}
+
+
+def _authorization(sleeps: List[float], **kwargs: float) -> TokenAuthorization:
+    """Build an authorization whose polling records its delays instead of sleeping."""
+    now = [0.0]
+
+    def sleep(delay: float) -> None:
+        sleeps.append(delay)
+        now[0] += delay
+
+    polling = PollingStrategy(clock=lambda: now[0], sleep=sleep, **kwargs)  # type: ignore[arg-type]
+    return TokenAuthorization(
+        token="my-ksef-token", environment=Environment.TEST, polling=polling  # noqa: S106
+    )
+
+
+def test_polling_backs_off_and_honours_server_hints(mocked_responses: RequestsMock) -> None:
+    """Test fast initial probes, exponential growth and Retry-After hints."""
+    mocked_responses.add(url=STATUS_URL, method="GET", json=_status(100))
+    mocked_responses.add(url=STATUS_URL, method="GET", json=_status(100))
+    mocked_responses.add(
+        url=STATUS_URL, method="GET", json=_status(100), headers={"Retry-After": "1"}
+    )
+    mocked_responses.add(url=STATUS_URL, method="GET", json=_status(200, "OK"))
+    sleeps: List[float] = []
+
+    status = _authorization(sleeps)._poll_auth_status("ref-123", "auth-token")
+
+    assert status.status.code == 200  # noqa: PLR2004
+    assert sleeps == [0.1, 0.2, 1.0]
+
+
+def test_polling_stops_on_failed_authentication(mocked_responses: RequestsMock) -> None:
+    """Test that a failure status ends polling immediately."""
+    mocked_responses.add(url=STATUS_URL, method="GET", json=_status(450, "Invalid token"))
+    sleeps: List[float] = []
+
+    with pytest.raises(AuthenticationError, match="450"):
+        _authorization(sleeps)._poll_auth_status("ref-123", "auth-token")
+
+    assert sleeps == []
+
+
+def test_polling_deadline(mocked_responses: RequestsMock) -> None:
+    """Test that polling gives up once the deadline has passed."""
+    for _ in range(5):
+        mocked_responses.add(url=STATUS_URL, method="GET", json=_status(100))
+    sleeps: List[float] = []
+
+    with pytest.raises(AuthenticationError, match="timed out after 5 attempts"):
+        _authorization(sleeps, deadline=1.0)._poll_auth_status("ref-123", "auth-token")
+
+    assert sleeps == [0.1, 0.2, 0.4, pytest.approx(0.3)]
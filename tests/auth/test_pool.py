@@ -0,0 +1,125 @@
+"""Tests for the multi-tenant authorization pool."""
+import threading
+import time
+from typing import List
+
+import pytest
+from pytest_mock import MockerFixture
+
+from ksef.auth.base import Authorization
+from ksef.auth.pool import AuthorizationPool, PooledAuthorization
+from ksef.exceptions import AuthenticationError
+from ksef.models.responses.auth import AuthTokens, TokenInfo
+
+
+class _FakeAuthorization(Authorization):
+    """Authorization issuing a token derived from the NIP, recording every flow."""
+
+    def __init__(self, calls: List[str]):
+        super().__init__()
+        self.calls = calls
+
+    def authorize(self, nip: str) -> AuthTokens:
+        self.calls.append(nip)
+        time.sleep(0.01)
+        if nip == "0000000000":
+            raise AuthenticationError("unknown NIP")
+        self._tokens = AuthTokens(
+            access_token=TokenInfo(token=f"access-{nip}"),
+            refresh_token=TokenInfo(token=f"refresh-{nip}"),
+        )
+        self.nip = nip
+        return self._tokens
+
+    def _credential_fingerprint(self) -> str:
+        return "fake"
+
+
+def test_pool_authorizes_lazily_once_per_nip() -> None:
+    """Test that concurrent first uses of a NIP run a single authorization flow."""
+    calls: List[str] = []
+    pool = AuthorizationPool(lambda nip: _FakeAuthorization(calls))
+    tokens: List[str] = []
+
+    def use(nip: str) -> None:
+        tokens.append(pool.get_access_token(nip))
+
+    threads = [
+        threading.Thread(target=use, args=(nip,)) for nip in ["1111111111", "2222222222"] * 4
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(calls) == ["1111111111", "2222222222"]
+    assert sorted(set(tokens)) == ["access-1111111111", "access-2222222222"]
+    assert len(pool) == 2  # noqa: PLR2004
+
+
+def test_pool_warm_up_reports_failures() -> None:
+    """Test the parallel warm-up and its per-NIP error reporting."""
+    calls: List[str] = []
+    pool = AuthorizationPool(lambda nip: _FakeAuthorization(calls))
+
+    errors = pool.warm_up(["1111111111", "0000000000", "2222222222"], max_workers=2)
+
+    assert list(errors) == ["0000000000"]
+    assert isinstance(errors["0000000000"], AuthenticationError)
+    assert "1111111111" in pool
+    assert "0000000000" not in pool
+    with pytest.raises(AuthenticationError):
+        pool.get("0000000000")
+
+
+def test_pool_evicts_idle_tenants() -> None:
+    """Test that idle tenants are evicted and authorized again on their next use."""
+    now = [0.0]
+    calls: List[str] = []
+    pool = AuthorizationPool(
+        lambda nip: _FakeAuthorization(calls), max_idle=60, clock=lambda: now[0]
+    )
+    pool.get("1111111111")
+    now[0] = 30
+    pool.get("2222222222")
+
+    now[0] = 80
+    assert pool.evict_idle() == ["1111111111"]
+    assert "2222222222" in pool
+
+    pool.get("1111111111")
+    assert calls == ["1111111111", "2222222222", "1111111111"]
+
+
+def test_pool_forgets_evicted_tenants() -> None:
+    """Test that eviction also drops the tenant's lock and `get_authorized` never authorizes."""
+    calls: List[str] = []
+    pool = AuthorizationPool(lambda nip: _FakeAuthorization(calls))
+    assert pool.get_authorized("1111111111") is None
+
+    authorization = pool.get("1111111111")
+    assert pool.get_authorized("1111111111") is authorization
+
+    pool.evict("1111111111")
+    assert pool.get_authorized("1111111111") is None
+    assert pool._tenant_locks == {}
+    assert calls == ["1111111111"]
+
+    pool.get("2222222222")
+    tenant_lock = pool._tenant_locks["2222222222"]
+    with tenant_lock:
+        pool.evict("2222222222")
+    assert pool._tenant_locks["2222222222"] is tenant_lock
+
+
+def test_pooled_authorization_refreshes_through_the_pool(mocker: MockerFixture) -> None:
+    """Test that refreshing a pooled authorization refreshes the tenant's authorization."""
+    pool = AuthorizationPool(lambda nip: _FakeAuthorization([]))
+    refreshed = AuthTokens(
+        access_token=TokenInfo(token="access-2"),  # noqa: S106
+        refresh_token=TokenInfo(token="refresh-2"),  # noqa: S106
+    )
+    refresh = mocker.patch.object(_FakeAuthorization, "refresh", return_value=refreshed)
+
+    assert PooledAuthorization(pool, "1111111111").refresh() is refreshed
+    refresh.assert_called_once_with()
@@ -0,0 +1,134 @@
+"""Tests for the persistent token store."""
+import datetime
+import threading
+import time
+from pathlib import Path
+from typing import List
+
+from pytest_mock import MockerFixture
+
+from ksef.auth.store import FileTokenStore
+from ksef.auth.token import TokenAuthorization
+from ksef.constants import Environment
+from ksef.models.responses.auth import AuthTokens, TokenInfo
+
+
+def _tokens(access: str, valid_for: datetime.timedelta) -> AuthTokens:
+    valid_until = (datetime.datetime.now(tz=datetime.timezone.utc) + valid_for).isoformat()
+    return AuthTokens(
+        access_token=TokenInfo(token=access, valid_until=valid_until),
+        refresh_token=TokenInfo(token=f"refresh-{access}", valid_until=valid_until),
+    )
+
+
+def test_file_token_store_round_trip_encrypted(tmp_path: Path) -> None:
+    """Test that tokens survive a round trip and are not stored in plain text."""
+    store = FileTokenStore(tmp_path, secret=b"store-secret")
+    tokens = _tokens("access-abc", datetime.timedelta(hours=1))
+
+    store.save("TEST:1234567890:fingerprint", tokens)
+
+    assert store.load("TEST:1234567890:fingerprint") == tokens
+    assert store.load("TEST:0000000000:fingerprint") is None
+    files = list(tmp_path.glob("*.token"))
+    assert len(files) == 1
+    assert b"access-abc" not in files[0].read_bytes()
+    assert (
+        FileTokenStore(tmp_path, secret=b"other-secret").load("TEST:1234567890:fingerprint") is None
+    )
+
+    store.delete("TEST:1234567890:fingerprint")
+    assert store.load("TEST:1234567890:fingerprint") is None
+
+
+def test_authorizations_share_stored_tokens(tmp_path: Path, mocker: MockerFixture) -> None:
+    """Test that concurrent workers sharing a store run the authorization flow once."""
+    calls: List[str] = []
+
+    def flow(nip: str) -> AuthTokens:
+        calls.append(nip)
+        return _tokens("access-1", datetime.timedelta(hours=1))
+
+    mocker.patch.object(TokenAuthorization, "_authorize", side_effect=flow)
+    authorizations = [
+        TokenAuthorization(
+            token="my-ksef-token",  # noqa: S106
+            environment=Environment.TEST,
+            token_store=FileTokenStore(tmp_path, secret=b"store-secret"),
+        )
+        for _ in range(4)
+    ]
+    threads = [
+        threading.Thread(target=auth.authorize, args=("1234567890",)) for auth in authorizations
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["1234567890"]
+    assert {auth.get_access_token() for auth in authorizations} == {"access-1"}
+
+    other_credential = TokenAuthorization(
+        token="other-ksef-token",  # noqa: S106
+        environment=Environment.TEST,
+        token_store=FileTokenStore(tmp_path, secret=b"store-secret"),
+    )
+    other_credential.authorize("1234567890")
+    assert len(calls) == 2  # noqa: PLR2004
+
+
+def test_expired_stored_tokens_are_not_reused(tmp_path: Path, mocker: MockerFixture) -> None:
+    """Test that tokens past their expiry trigger a fresh authorization."""
+    store = FileTokenStore(tmp_path, secret=b"store-secret")
+    auth = TokenAuthorization(
+        token="my-ksef-token", environment=Environment.TEST, token_store=store  # noqa: S106
+    )
+    store.save(auth._token_store_key("1234567890"), _tokens("old", datetime.timedelta(hours=-1)))
+    mocker.patch.object(
+        auth, "_authorize", return_value=_tokens("new", datetime.timedelta(hours=1))
+    )
+
+    auth.authorize("1234567890")
+
+    assert auth.get_access_token() == "new"
+    stored = store.load(auth._token_store_key("1234567890"))
+    assert stored is not None
+    assert stored.access_token.token == "new"  # noqa: S105
+
+
+def test_authorizations_sharing_a_store_refresh_once(tmp_path: Path, mocker: MockerFixture) -> None:
+    """Test that concurrent workers sharing a store redeem the refresh token once."""
+    refreshed: List[str] = []
+    valid_until = datetime.datetime.now(tz=datetime.timezone.utc) + datetime.timedelta(hours=1)
+
+    def redeem(refresh_token: str) -> TokenInfo:
+        refreshed.append(refresh_token)
+        time.sleep(0.01)
+        return TokenInfo(token="access-2", valid_until=valid_until.isoformat())  # noqa: S106
+
+    mocker.patch.object(TokenAuthorization, "_redeem_refresh_token", side_effect=redeem)
+    mocker.patch.object(
+        TokenAuthorization,
+        "_authorize",
+        return_value=_tokens("access-1", datetime.timedelta(seconds=30)),
+    )
+    authorizations = [
+        TokenAuthorization(
+            token="my-ksef-token",  # noqa: S106
+            environment=Environment.TEST,
+            token_store=FileTokenStore(tmp_path, secret=b"store-secret"),
+        )
+        for _ in range(4)
+    ]
+    for auth in authorizations:
+        auth.authorize("1234567890")
+
+    threads = [threading.Thread(target=auth.get_access_token) for auth in authorizations]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert refreshed == ["refresh-access-1"]
+    assert {auth.get_access_token() for auth in authorizations} == {"access-2"}
@@ -1,7 +1,12 @@
 """Tests for token-based authorization (API v2)."""
+import asyncio
 import base64
 import datetime
+import json
+import threading
+from typing import Dict, List
 
+import httpx
 import pytest
 from cryptography import x509
 from cryptography.hazmat.primitives import hashes, serialization
@@ -12,19 +17,22 @@ from cryptography.hazmat.primitives.asymmetric.rsa import (
     generate_private_key,
 )
 from cryptography.x509.oid import NameOID
+from pytest_mock import MockerFixture
 from responses import RequestsMock
 
+from ksef.auth.base import Authorization
 from ksef.auth.token import TokenAuthorization
 from ksef.constants import (
     URL_AUTH_CHALLENGE,
     URL_AUTH_KSEF_TOKEN,
     URL_AUTH_STATUS,
     URL_AUTH_TOKEN_REDEEM,
+    URL_AUTH_TOKEN_REFRESH,
     URL_PUBLIC_KEY_CERTS,
     Environment,
 )
 from ksef.exceptions import UnsupportedResponseError
-from ksef.models.responses.auth import AuthChallenge
+from ksef.models.responses.auth import AuthChallenge, AuthTokens, TokenInfo
 
 _TEST_TIMESTAMP = 1700000000000
 
@@ -138,7 +146,7 @@ def test_authorize_full_flow(mocked_responses: RequestsMock) -> None:
             "referenceNumber": "ref-123",
             "authenticationToken": {
                 "token": "auth-token-abc",
-                "validUntil": "2024-01-01T00:00:00Z",
+                "validUntil": "2099-01-01T00:00:00Z",
             },
         },
     )
@@ -162,11 +170,11 @@ def test_authorize_full_flow(mocked_responses: RequestsMock) -> None:
         json={
             "accessToken": {
                 "token": "access-token-xyz",
-                "validUntil": "2024-01-01T01:00:00Z",
+                "validUntil": "2099-01-01T01:00:00Z",
             },
             "refreshToken": {
                 "token": "refresh-token-xyz",
-                "validUntil": "2024-01-02T00:00:00Z",
+                "validUntil": "2099-01-02T00:00:00Z",
             },
         },
     )
@@ -213,3 +221,217 @@ def test_authorize_error_on_challenge(mocked_responses: RequestsMock) -> None:
 
     with pytest.raises(UnsupportedResponseError, match="400"):
         auth.authorize(nip="1234567890")
+
+
+def test_authorize_async_concurrent_nips(mocker: MockerFixture) -> None:
+    """Test the asyncio flow authorizing several NIPs concurrently over one shared session."""
+    _private_key, _public_key, cert_b64 = _generate_test_cert()
+    sleep = mocker.patch("ksef.auth.async_flow.asyncio.sleep", new=mocker.AsyncMock())
+    polled: Dict[str, int] = {}
+
+    def dispatch(request: httpx.Request) -> httpx.Response:
+        path = str(request.url)[len(BASE) :]
+        if path == URL_PUBLIC_KEY_CERTS:
+            return httpx.Response(
+                200, json=[{"certificate": cert_b64, "usage": ["KsefTokenEncryption"]}]
+            )
+        if path == URL_AUTH_CHALLENGE:
+            return httpx.Response(200, json={"challenge": "c", "timestampMs": _TEST_TIMESTAMP})
+        if path == URL_AUTH_KSEF_TOKEN:
+            nip = json.loads(request.content)["contextIdentifier"]["value"]
+            return httpx.Response(
+                202,
+                json={"referenceNumber": f"ref-{nip}", "authenticationToken": {"token": nip}},
+            )
+        if path.startswith("auth/ref-"):
+            # First poll for every reference is still pending, the second one succeeds.
+            polled[path] = polled.get(path, 0) + 1
+            code = 200 if polled[path] > 1 else 100
+            return httpx.Response(200, json={"status": {"code": code, "description": "-"}})
+        assert path == URL_AUTH_TOKEN_REDEEM
+        nip = request.headers["Authorization"].removeprefix("Bearer ")
+        return httpx.Response(
+            200,
+            json={"accessToken": {"token": f"access-{nip}"}, "refreshToken": {"token": "r"}},
+        )
+
+    nips = ["1111111111", "2222222222", "3333333333"]
+    authorizations = [
+        TokenAuthorization(token="my-ksef-token", environment=Environment.TEST)  # noqa: S106
+        for _ in nips
+    ]
+
+    async def run() -> None:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(dispatch)) as session:
+            await asyncio.gather(
+                *(
+                    auth.authorize_async(nip, session=session)
+                    for auth, nip in zip(authorizations, nips)
+                )
+            )
+
+    asyncio.run(run())
+
+    assert [auth.get_access_token() for auth in authorizations] == [f"access-{n}" for n in nips]
+    assert sleep.await_count == len(nips)
+
+
+def test_authorize_async_concurrent_calls_share_one_flow(mocker: MockerFixture) -> None:
+    """Test that concurrent asyncio authorizations of one NIP run a single flow."""
+    _private_key, _public_key, cert_b64 = _generate_test_cert()
+    mocker.patch("ksef.auth.async_flow.asyncio.sleep", new=mocker.AsyncMock())
+    paths: List[str] = []
+
+    def dispatch(request: httpx.Request) -> httpx.Response:
+        path = str(request.url)[len(BASE) :]
+        paths.append(path)
+        if path == URL_PUBLIC_KEY_CERTS:
+            return httpx.Response(
+                200, json=[{"certificate": cert_b64, "usage": ["KsefTokenEncryption"]}]
+            )
+        if path == URL_AUTH_CHALLENGE:
+            return httpx.Response(200, json={"challenge": "c", "timestampMs": _TEST_TIMESTAMP})
+        if path == URL_AUTH_KSEF_TOKEN:
+            return httpx.Response(
+                202, json={"referenceNumber": "ref", "authenticationToken": {"token": "a"}}
+            )
+        if path == URL_AUTH_STATUS.format(reference_number="ref"):
+            return httpx.Response(200, json={"status": {"code": 200, "description": "-"}})
+        assert path == URL_AUTH_TOKEN_REDEEM
+        return httpx.Response(
+            200, json={"accessToken": {"token": "access"}, "refreshToken": {"token": "r"}}
+        )
+
+    auth = TokenAuthorization(token="my-ksef-token", environment=Environment.TEST)  # noqa: S106
+
+    async def run() -> List[AuthTokens]:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(dispatch)) as session:
+            return list(
+                await asyncio.gather(
+                    *(auth.authorize_async("1234567890", session=session) for _ in range(4))
+                )
+            )
+
+    tokens = asyncio.run(run())
+
+    assert [token.access_token.token for token in tokens] == ["access"] * 4
+    assert paths == [
+        URL_PUBLIC_KEY_CERTS,
+        URL_AUTH_CHALLENGE,
+        URL_AUTH_KSEF_TOKEN,
+        URL_AUTH_STATUS.format(reference_number="ref"),
+        URL_AUTH_TOKEN_REDEEM,
+    ]
+
+
+def test_authorize_async_error_on_challenge() -> None:
+    """Test that the asyncio flow maps error responses to KSEF exceptions."""
+    _private_key, _public_key, cert_b64 = _generate_test_cert()
+
+    def dispatch(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith(URL_PUBLIC_KEY_CERTS):
+            return httpx.Response(
+                200, json=[{"certificate": cert_b64, "usage": ["KsefTokenEncryption"]}]
+            )
+        return httpx.Response(400, json={"error": "bad request"})
+
+    auth = TokenAuthorization(token="my-ksef-token", environment=Environment.TEST)  # noqa: S106
+
+    async def run() -> None:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(dispatch)) as session:
+            await auth.authorize_async("1234567890", session=session)
+
+    with pytest.raises(UnsupportedResponseError, match="400"):
+        asyncio.run(run())
+
+
+def _issued_tokens(access_ttl: datetime.timedelta, refresh_ttl: datetime.timedelta) -> AuthTokens:
+    """Build tokens expiring after the given durations from now."""
+    now = datetime.datetime.now(tz=datetime.timezone.utc)
+    return AuthTokens(
+        access_token=TokenInfo(
+            token="old-access", valid_until=(now + access_ttl).isoformat()  # noqa: S106
+        ),
+        refresh_token=TokenInfo(
+            token="refresh", valid_until=(now + refresh_ttl).isoformat()  # noqa: S106
+        ),
+    )
+
+
+def test_get_access_token_refreshes_once_before_expiry(mocked_responses: RequestsMock) -> None:
+    """Test that concurrent callers trigger a single refresh shortly before expiry."""
+    valid_until = datetime.datetime.now(tz=datetime.timezone.utc) + datetime.timedelta(hours=1)
+    mocked_responses.add(
+        url=f"{BASE}{URL_AUTH_TOKEN_REFRESH}",
+        method="POST",
+        json={"accessToken": {"token": "new-access", "validUntil": valid_until.isoformat()}},
+    )
+    auth = TokenAuthorization(token="my-ksef-token", environment=Environment.TEST)  # noqa: S106
+    auth._tokens = _issued_tokens(datetime.timedelta(seconds=30), datetime.timedelta(days=7))
+
+    tokens = []
+    threads = [
+        threading.Thread(target=lambda: tokens.append(auth.get_access_token())) for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert tokens == ["new-access"] * 8
+    assert len(mocked_responses.calls) == 1
+    assert mocked_responses.calls[0].request.headers["Authorization"] == "Bearer refresh"
+    assert auth._tokens.refresh_token.token == "refresh"  # noqa: S105
+
+
+def test_get_access_token_reauthorizes_when_refresh_token_expired(mocker: MockerFixture) -> None:
+    """Test the fallback to a full authorization once the refresh token has expired."""
+    auth = TokenAuthorization(token="my-ksef-token", environment=Environment.TEST)  # noqa: S106
+    auth._tokens = _issued_tokens(datetime.timedelta(seconds=-1), datetime.timedelta(seconds=-1))
+    auth.nip = "1234567890"
+    fresh = _issued_tokens(datetime.timedelta(hours=1), datetime.timedelta(days=7))
+
+    def authorize(nip: str) -> AuthTokens:
+        auth._tokens = fresh
+        return fresh
+
+    authorize_mock = mocker.patch.object(auth, "authorize", side_effect=authorize)
+
+    assert auth.get_access_token() == fresh.access_token.token
+    authorize_mock.assert_called_once_with("1234567890")
+
+
+def test_custom_authorization_refreshes_and_falls_back(mocked_responses: RequestsMock) -> None:
+    """Test that any Authorization subclass refreshes via the base class, or re-authorizes.
+
+    The subclass neither calls `super().__init__()` nor supports a token store.
+    """
+    valid_until = datetime.datetime.now(tz=datetime.timezone.utc) + datetime.timedelta(hours=1)
+    mocked_responses.add(
+        url=f"{BASE}{URL_AUTH_TOKEN_REFRESH}",
+        method="POST",
+        json={"accessToken": {"token": "new-access", "validUntil": valid_until.isoformat()}},
+    )
+    mocked_responses.add(url=f"{BASE}{URL_AUTH_TOKEN_REFRESH}", method="POST", status=401)
+    fresh = _issued_tokens(datetime.timedelta(hours=1), datetime.timedelta(days=7))
+    authorized: List[str] = []
+
+    class CustomAuthorization(Authorization):
+        environment = Environment.TEST
+
+        def __init__(self, nip: str):  # Without calling `super().__init__()`
+            self.nip = nip
+
+        def authorize(self, nip: str) -> AuthTokens:
+            authorized.append(nip)
+            self._tokens = fresh
+            return fresh
+
+    auth = CustomAuthorization("1234567890")
+    auth._tokens = _issued_tokens(datetime.timedelta(seconds=30), datetime.timedelta(days=7))
+    assert auth.get_access_token() == "new-access"
+    assert authorized == []
+
+    auth._tokens = _issued_tokens(datetime.timedelta(seconds=30), datetime.timedelta(days=7))
+    assert auth.get_access_token() == fresh.access_token.token
+    assert authorized == ["1234567890"]
@@ -1,6 +1,9 @@
 """Tests for XAdES signature-based authorization (API v2)."""
+import asyncio
 import datetime
+from typing import List
 
+import httpx
 from cryptography import x509
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric.rsa import generate_private_key
@@ -165,3 +168,44 @@ def test_authorize_full_flow(mocked_responses: RequestsMock) -> None:
     assert tokens.access_token.token == "xades-access-token"  # noqa: S105
     assert tokens.refresh_token.token == "xades-refresh-token"  # noqa: S105
     assert auth.get_access_token() == "xades-access-token"
+
+
+def test_authorize_async_full_flow() -> None:
+    """Test the asyncio XAdES authorization flow."""
+    cert_pem, key_pem = _generate_self_signed_cert()
+    calls: List[httpx.Request] = []
+    routes = {
+        URL_AUTH_CHALLENGE: {"challenge": "xades-challenge", "timestampMs": _TEST_TIMESTAMP},
+        URL_AUTH_XADES_SIGNATURE: {
+            "referenceNumber": "xades-ref-456",
+            "authenticationToken": {"token": "xades-auth-token"},
+        },
+        URL_AUTH_STATUS.format(reference_number="xades-ref-456"): {
+            "status": {"code": 200, "description": "OK"},
+        },
+        URL_AUTH_TOKEN_REDEEM: {
+            "accessToken": {"token": "xades-access-token"},
+            "refreshToken": {"token": "xades-refresh-token"},
+        },
+    }
+
+    def dispatch(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, json=routes[str(request.url)[len(BASE) :]])
+
+    auth = XadesAuthorization(
+        signing_cert=cert_pem,
+        private_key=key_pem,
+        environment=Environment.TEST,
+    )
+
+    async def run() -> None:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(dispatch)) as session:
+            await auth.authorize_async(nip="1234567890", session=session)
+
+    asyncio.run(run())
+
+    assert auth.get_access_token() == "xades-access-token"
+    assert calls[1].headers["Content-Type"] == "application/xml"
+    assert b"<Nip>1234567890</Nip>" in calls[1].content
+    assert calls[2].headers["Authorization"] == "Bearer xades-auth-token"
@@ -10,3 +10,20 @@ def mocked_responses() -> Generator[responses.RequestsMock, None, None]:
     """Pytest-compatible fixture for responses."""
     with responses.RequestsMock() as rsps:
         yield rsps
+
+
+@pytest.fixture(autouse=True)
+def _clear_caches() -> Generator[None, None, None]:
+    """Make sure every test starts without cached state shared across clients."""
+    # Imported here: ksef must not be imported before typeguard's import hook is installed,
+    # which happens after this conftest is loaded
+    from ksef.certificates import default_certificate_cache
+    from ksef.rate_limit import default_rate_limiter
+    from ksef.xml_converters import default_fragment_cache
+
+    caches = (default_certificate_cache, default_rate_limiter, default_fragment_cache)
+    for cache in caches:
+        cache.clear()
+    yield
+    for cache in caches:
+        cache.clear()
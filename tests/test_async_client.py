@@ -0,0 +1,211 @@
+"""Tests for the asyncio client."""
+import asyncio
+import base64
+import json
+from typing import Callable, Dict, List, Tuple
+
+import httpx
+
+from ksef.async_client import AsyncClient
+from ksef.client import AES_KEY_SIZE, IV_SIZE, SessionContext
+from ksef.constants import (
+    URL_INVOICES_GET,
+    URL_PUBLIC_KEY_CERTS,
+    URL_QUERY_INVOICES,
+    URL_SESSIONS_INVOICES,
+    URL_SESSIONS_INVOICES_STATUS,
+    URL_SESSIONS_ONLINE,
+    Environment,
+)
+from ksef.models.responses.session import SendInvoiceResponse, SessionInvoiceStatusResponse
+from tests.test_client_invoices import (
+    _create_mock_authorization,
+    _create_test_invoice,
+    _generate_test_certificate,
+    _session_invoices_page,
+)
+from tests.test_invoice_query import FILTERS, _invoice_metadata
+
+BASE = Environment.TEST.value
+
+Route = Tuple[str, str]
+Handler = Callable[[httpx.Request], httpx.Response]
+
+
+def _build_client(routes: Dict[Route, Handler], calls: List[httpx.Request]) -> AsyncClient:
+    """Build an AsyncClient whose transport dispatches requests to the given route handlers."""
+
+    def dispatch(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return routes[(request.method, str(request.url))](request)
+
+    session = httpx.AsyncClient(transport=httpx.MockTransport(dispatch))
+    return AsyncClient(
+        authorization=_create_mock_authorization(),
+        environment=Environment.TEST,
+        session=session,
+    )
+
+
+def test_open_session() -> None:
+    """Test opening an online session asynchronously."""
+    cert_der, _ = _generate_test_certificate()
+    cert_b64 = base64.b64encode(cert_der).decode("ascii")
+    calls: List[httpx.Request] = []
+    routes: Dict[Route, Handler] = {
+        ("GET", f"{BASE}{URL_PUBLIC_KEY_CERTS}"): lambda _: httpx.Response(
+            200, json=[{"certificate": cert_b64, "usage": ["SymmetricKeyEncryption"]}]
+        ),
+        ("POST", f"{BASE}{URL_SESSIONS_ONLINE}"): lambda _: httpx.Response(
+            201, json={"referenceNumber": "session-ref-123"}
+        ),
+    }
+
+    async def run() -> SessionContext:
+        async with _build_client(routes, calls) as client:
+            return await client.open_session(nip="1234567890")
+
+    session_context = asyncio.run(run())
+
+    assert session_context.reference_number == "session-ref-123"
+    assert len(session_context.aes_key) == AES_KEY_SIZE
+    assert len(session_context.iv) == IV_SIZE
+    open_body = json.loads(calls[1].content)
+    assert open_body["contextIdentifier"] == {"type": "Nip", "value": "1234567890"}
+    assert calls[1].headers["Authorization"] == "Bearer test-access-token"
+
+
+def test_send_invoice_full_flow() -> None:
+    """Test the full send_invoice() flow and that invoices can be sent concurrently."""
+    cert_der, _ = _generate_test_certificate()
+    cert_b64 = base64.b64encode(cert_der).decode("ascii")
+    calls: List[httpx.Request] = []
+    routes: Dict[Route, Handler] = {
+        ("GET", f"{BASE}{URL_PUBLIC_KEY_CERTS}"): lambda _: httpx.Response(
+            200, json=[{"certificate": cert_b64, "usage": ["SymmetricKeyEncryption"]}]
+        ),
+        ("POST", f"{BASE}{URL_SESSIONS_ONLINE}"): lambda _: httpx.Response(
+            201, json={"referenceNumber": "session-ref-123"}
+        ),
+        ("POST", f"{BASE}sessions/online/session-ref-123/invoices"): lambda _: httpx.Response(
+            202, json={"referenceNumber": "invoice-ref-456"}
+        ),
+        ("POST", f"{BASE}sessions/online/session-ref-123/close"): lambda _: httpx.Response(204),
+    }
+
+    async def run() -> List[SendInvoiceResponse]:
+        async with _build_client(routes, calls) as client:
+            invoice = _create_test_invoice()
+            return list(
+                await asyncio.gather(
+                    *(client.send_invoice(nip="1234567890", invoice=invoice) for _ in range(3))
+                )
+            )
+
+    responses = asyncio.run(run())
+
+    assert [response.reference_number for response in responses] == ["invoice-ref-456"] * 3
+    assert all(response.session_reference_number == "session-ref-123" for response in responses)
+    # open + send + close for every invoice; the certificate listing is downloaded once
+    assert len([call for call in calls if call.method == "POST"]) == 9  # noqa: PLR2004
+    assert len([call for call in calls if call.method == "GET"]) == 1
+
+
+def test_get_invoice_status() -> None:
+    """Test getting a specific invoice status asynchronously."""
+    url = URL_SESSIONS_INVOICES_STATUS.format(
+        reference_number="session-ref-123", invoice_reference_number="invoice-ref-456"
+    )
+    calls: List[httpx.Request] = []
+    routes: Dict[Route, Handler] = {
+        ("GET", f"{BASE}{url}"): lambda _: httpx.Response(
+            200,
+            json={
+                "ordinalNumber": 1,
+                "referenceNumber": "invoice-ref-456",
+                "status": {"code": 200, "description": "Accepted"},
+                "ksefNumber": "KSEF-2024-001",
+            },
+        ),
+    }
+
+    async def run() -> SessionInvoiceStatusResponse:
+        async with _build_client(routes, calls) as client:
+            return await client.get_invoice_status(
+                session_reference_number="session-ref-123",
+                invoice_reference_number="invoice-ref-456",
+            )
+
+    status = asyncio.run(run())
+
+    assert status.ksef_number == "KSEF-2024-001"
+    assert status.status.code == 200  # noqa: PLR2004
+
+
+def test_download_invoice() -> None:
+    """Test downloading an invoice asynchronously."""
+    invoice_xml = b"<?xml version='1.0'?><Faktura><Test>content</Test></Faktura>"
+    url = URL_INVOICES_GET.format(ksef_reference_number="KSEF-2024-001")
+    calls: List[httpx.Request] = []
+    routes: Dict[Route, Handler] = {
+        ("GET", f"{BASE}{url}"): lambda _: httpx.Response(200, content=invoice_xml),
+    }
+
+    async def run() -> bytes:
+        async with _build_client(routes, calls) as client:
+            return await client.download_invoice(ksef_reference_number="KSEF-2024-001")
+
+    assert asyncio.run(run()) == invoice_xml
+    assert calls[0].headers["Accept"] == "application/xml"
+
+
+def test_iter_session_invoices() -> None:
+    """Test iterating over all pages of session invoice statuses asynchronously."""
+    url = f"{BASE}{URL_SESSIONS_INVOICES.format(reference_number='session-ref-123')}?PageSize=2"
+    pages = {
+        None: _session_invoices_page([1, 2], "token-2"),
+        "token-2": _session_invoices_page([3], None),
+    }
+    calls: List[httpx.Request] = []
+    routes: Dict[Route, Handler] = {
+        ("GET", url): lambda request: httpx.Response(
+            200, json=pages[request.headers.get("x-continuation-token")]
+        ),
+    }
+
+    async def run() -> List[int]:
+        async with _build_client(routes, calls) as client:
+            return [
+                invoice.ordinal_number
+                async for invoice in client.iter_session_invoices("session-ref-123", page_size=2)
+            ]
+
+    assert asyncio.run(run()) == [1, 2, 3]
+    assert len(calls) == 2  # noqa: PLR2004
+
+
+def test_iter_invoices() -> None:
+    """Test iterating over all pages of invoice metadata with pages requested ahead."""
+
+    def page(offset: int) -> Handler:
+        invoices = [_invoice_metadata(offset)] if offset < 3 else []  # noqa: PLR2004
+        return lambda _: httpx.Response(
+            200, json={"invoices": invoices, "hasMore": offset < 2}  # noqa: PLR2004
+        )
+
+    query = "PageSize=1&PageOffset={offset}&SortOrder=Asc"
+    calls: List[httpx.Request] = []
+    routes: Dict[Route, Handler] = {
+        ("POST", f"{BASE}{URL_QUERY_INVOICES}?{query.format(offset=offset)}"): page(offset)
+        for offset in range(5)
+    }
+
+    async def run() -> List[str]:
+        async with _build_client(routes, calls) as client:
+            return [
+                invoice.invoice_number
+                async for invoice in client.iter_invoices(FILTERS, page_size=1, max_concurrency=2)
+            ]
+
+    assert asyncio.run(run()) == ["FV/0/2025", "FV/1/2025", "FV/2/2025"]
+    assert json.loads(calls[0].content) == FILTERS.to_dict()
@@ -0,0 +1,53 @@
+"""Tests for batch package building."""
+import hashlib
+import io
+import os
+import zipfile
+from pathlib import Path
+
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.padding import PKCS7
+
+from ksef.batch import build_batch_package
+from ksef.client import AES_KEY_SIZE, IV_SIZE
+from ksef.encryption import AES_BLOCK_SIZE
+from tests.test_client_invoices import _create_test_invoice
+
+
+def _decrypt(data: bytes, aes_key: bytes, iv: bytes) -> bytes:
+    decryptor = Cipher(algorithms.AES(aes_key), modes.CBC(iv)).decryptor()
+    unpadder = PKCS7(AES_BLOCK_SIZE).unpadder()
+    padded = decryptor.update(data) + decryptor.finalize()
+    return unpadder.update(padded) + unpadder.finalize()
+
+
+def test_build_batch_package_splits_and_encrypts_parts(tmp_path: Path) -> None:
+    """Test that the decrypted parts reassemble into the hashed ZIP archive."""
+    aes_key = os.urandom(AES_KEY_SIZE)
+    iv = os.urandom(IV_SIZE)
+    invoices = (_create_test_invoice() for _ in range(5))
+
+    package = build_batch_package(invoices, tmp_path, aes_key=aes_key, iv=iv, part_size=1000)
+
+    assert package.invoice_count == 5  # noqa: PLR2004
+    assert len(package.parts) == -(-package.zip_size // 1000)
+    archive = b""
+    for ordinal_number, part in enumerate(package.parts, start=1):
+        encrypted = part.path.read_bytes()
+        assert part.ordinal_number == ordinal_number
+        assert part.size == len(encrypted)
+        assert part.sha256 == hashlib.sha256(encrypted).digest()
+        archive += _decrypt(encrypted, aes_key, iv)
+
+    assert len(archive) == package.zip_size
+    assert hashlib.sha256(archive).digest() == package.zip_sha256
+    with zipfile.ZipFile(io.BytesIO(archive)) as zip_file:
+        names = zip_file.namelist()
+        assert len(names) == 5  # noqa: PLR2004
+        assert zip_file.read(names[0]).startswith(b"<?xml")
+
+    batch_file = package.to_dict()
+    assert batch_file["fileSize"] == package.zip_size
+    assert [part["ordinalNumber"] for part in batch_file["fileParts"]] == [
+        part.ordinal_number for part in package.parts
+    ]
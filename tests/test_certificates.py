@@ -0,0 +1,145 @@
+"""Tests for the public key certificate cache."""
+import base64
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric.rsa import generate_private_key
+from cryptography.x509.oid import NameOID
+from responses import RequestsMock
+
+from ksef.certificates import (
+    USAGE_KSEF_TOKEN_ENCRYPTION,
+    USAGE_SYMMETRIC_KEY_ENCRYPTION,
+    PublicKeyCertificateCache,
+)
+from ksef.client import Client
+from ksef.constants import URL_PUBLIC_KEY_CERTS, Environment
+from tests.test_client_invoices import _create_mock_authorization
+
+BASE = Environment.TEST.value
+_NOW = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _certificate_entry(
+    usages: List[str], valid_from: datetime, valid_to: datetime
+) -> Dict[str, Any]:
+    """Build a public key certificate listing entry with the given usages and validity."""
+    private_key = generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "Test")])
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(private_key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(valid_from)
+        .not_valid_after(valid_to)
+        .sign(private_key, hashes.SHA256())
+    )
+    cert_der = cert.public_bytes(serialization.Encoding.DER)
+    return {"certificate": base64.b64encode(cert_der).decode("ascii"), "usage": usages}
+
+
+def test_cache_hits_until_ttl_expires() -> None:
+    """Test that keys are served from the cache until the TTL elapses."""
+    now = [_NOW.timestamp()]
+    listing = [
+        _certificate_entry(
+            [USAGE_SYMMETRIC_KEY_ENCRYPTION, USAGE_KSEF_TOKEN_ENCRYPTION],
+            _NOW - timedelta(days=1),
+            _NOW + timedelta(days=365),
+        )
+    ]
+    fetches: List[int] = []
+
+    def fetch() -> List[Dict[str, Any]]:
+        fetches.append(1)
+        return listing
+
+    cache = PublicKeyCertificateCache(ttl=60, clock=lambda: now[0])
+
+    key = cache.get_or_fetch(Environment.TEST, USAGE_SYMMETRIC_KEY_ENCRYPTION, fetch)
+    assert key is not None
+    # Other usages from the same listing are cached as well
+    assert cache.get_or_fetch(Environment.TEST, USAGE_KSEF_TOKEN_ENCRYPTION, fetch) is not None
+    assert cache.get(Environment.DEMO, USAGE_SYMMETRIC_KEY_ENCRYPTION) is None
+    assert len(fetches) == 1
+
+    now[0] += 61
+    assert cache.get(Environment.TEST, USAGE_SYMMETRIC_KEY_ENCRYPTION) is None
+    cache.get_or_fetch(Environment.TEST, USAGE_SYMMETRIC_KEY_ENCRYPTION, fetch)
+    assert len(fetches) == 2  # noqa: PLR2004
+
+
+def test_cache_honours_certificate_validity() -> None:
+    """Test that expired certificates are skipped and entries expire with the certificate."""
+    now = [_NOW.timestamp()]
+    expired = _certificate_entry(
+        [USAGE_SYMMETRIC_KEY_ENCRYPTION], _NOW - timedelta(days=30), _NOW - timedelta(days=1)
+    )
+    expiring = _certificate_entry(
+        [USAGE_SYMMETRIC_KEY_ENCRYPTION], _NOW - timedelta(days=1), _NOW + timedelta(seconds=30)
+    )
+    cache = PublicKeyCertificateCache(ttl=3600, clock=lambda: now[0])
+
+    cache.update(Environment.TEST, [expired])
+    assert cache.get(Environment.TEST, USAGE_SYMMETRIC_KEY_ENCRYPTION) is None
+
+    cache.update(Environment.TEST, [expired, expiring])
+    assert cache.get(Environment.TEST, USAGE_SYMMETRIC_KEY_ENCRYPTION) is not None
+
+    now[0] += 31
+    assert cache.get(Environment.TEST, USAGE_SYMMETRIC_KEY_ENCRYPTION) is None
+
+
+def test_cache_single_flight() -> None:
+    """Test that concurrent misses result in a single download."""
+    listing = [
+        _certificate_entry(
+            [USAGE_SYMMETRIC_KEY_ENCRYPTION],
+            datetime.now(tz=timezone.utc) - timedelta(days=1),
+            datetime.now(tz=timezone.utc) + timedelta(days=1),
+        )
+    ]
+    fetches: List[int] = []
+
+    def fetch() -> List[Dict[str, Any]]:
+        fetches.append(1)
+        time.sleep(0.05)
+        return listing
+
+    cache = PublicKeyCertificateCache()
+    threads = [
+        threading.Thread(
+            target=cache.get_or_fetch,
+            args=(Environment.TEST, USAGE_SYMMETRIC_KEY_ENCRYPTION, fetch),
+        )
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(fetches) == 1
+
+
+def test_client_reuses_cached_certificate(mocked_responses: RequestsMock) -> None:
+    """Test that the client downloads the certificate listing only once."""
+    entry = _certificate_entry(
+        [USAGE_SYMMETRIC_KEY_ENCRYPTION],
+        datetime.now(tz=timezone.utc) - timedelta(days=1),
+        datetime.now(tz=timezone.utc) + timedelta(days=1),
+    )
+    mocked_responses.add(url=f"{BASE}{URL_PUBLIC_KEY_CERTS}", method="GET", json=[entry])
+
+    client = Client(authorization=_create_mock_authorization(), environment=Environment.TEST)
+    first = client._fetch_symmetric_key_cert()
+    second = client._fetch_symmetric_key_cert()
+
+    assert first is second
+    assert len(mocked_responses.calls) == 1
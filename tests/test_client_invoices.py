@@ -1,14 +1,23 @@
 """Tests for Client invoice operations."""
 import base64
+import gzip
+import hashlib
+import json
 from datetime import date, datetime, timezone
 from decimal import Decimal
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 from unittest.mock import MagicMock
 
+import pytest
+import requests
+import responses
 from cryptography import x509
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric.rsa import generate_private_key
 from cryptography.x509.oid import NameOID
-from responses import RequestsMock
+from requests import PreparedRequest
+from responses import RequestsMock, matchers
 
 from ksef.auth.base import Authorization
 from ksef.client import AES_KEY_SIZE, IV_SIZE, Client, SessionContext
@@ -23,6 +32,8 @@ from ksef.constants import (
     URL_SESSIONS_STATUS,
     Environment,
 )
+from ksef.encryption import _encrypt_aes_cbc
+from ksef.exceptions import BatchUploadError
 from ksef.models.invoice import (
     Address,
     Invoice,
@@ -51,6 +62,7 @@ from ksef.models.responses.session import (
     SessionInvoiceStatusResponse,
     SessionStatusResponse,
 )
+from ksef.xml_converters import convert_invoice_to_xml
 
 BASE = Environment.TEST.value
 
@@ -140,6 +152,8 @@ def _create_mock_authorization() -> Authorization:
     """Create a mock authorization that returns a test access token."""
     auth = MagicMock(spec=Authorization)
     auth.get_access_token.return_value = "test-access-token"
+    auth.get_access_token_async.return_value = "test-access-token"
+    auth.nip = None
     return auth
 
 
@@ -222,6 +236,34 @@ def test_send_invoice_in_session(mocked_responses: RequestsMock) -> None:
     assert response.processing_code is None
 
 
+def test_send_invoice_in_session_body(mocked_responses: RequestsMock) -> None:
+    """Test that the request body holds the hashes, sizes and content of the invoice."""
+    session_context = SessionContext(
+        reference_number="session-ref-123", aes_key=b"\x01" * 32, iv=b"\x02" * 16
+    )
+    url = URL_SESSIONS_ONLINE_INVOICES.format(reference_number=session_context.reference_number)
+    mocked_responses.add(
+        url=f"{BASE}{url}", method="POST", status=202, json={"referenceNumber": "invoice-ref-456"}
+    )
+    client = Client(authorization=_create_mock_authorization(), environment=Environment.TEST)
+    invoice = _create_test_invoice()
+
+    client.send_invoice_in_session(session_context=session_context, invoice=invoice)
+
+    invoice_xml = convert_invoice_to_xml(invoice)
+    encrypted_invoice = _encrypt_aes_cbc(invoice_xml, session_context.aes_key, session_context.iv)
+    assert json.loads(mocked_responses.calls[0].request.body) == {
+        "invoiceHash": base64.b64encode(hashlib.sha256(invoice_xml).digest()).decode(),
+        "invoiceSize": len(invoice_xml),
+        "encryptedInvoiceHash": base64.b64encode(
+            hashlib.sha256(encrypted_invoice).digest()
+        ).decode(),
+        "encryptedInvoiceSize": len(encrypted_invoice),
+        "encryptedInvoiceContent": base64.b64encode(encrypted_invoice).decode(),
+        "offlineMode": False,
+    }
+
+
 def test_close_session(mocked_responses: RequestsMock) -> None:
     """Test closing an online session."""
     session_context = SessionContext(
@@ -470,3 +512,329 @@ def test_download_invoice(mocked_responses: RequestsMock) -> None:
     result = client.download_invoice(ksef_reference_number=ksef_ref)
 
     assert result == invoice_xml
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_download_invoices(mocked_responses: RequestsMock, tmp_path: Path, compress: bool) -> None:
+    """Test downloading many invoices to disk, skipping present files and reporting failures."""
+    invoice_xml = b"<?xml version='1.0'?><Faktura><Test>content</Test></Faktura>"
+    suffix = ".xml.gz" if compress else ".xml"
+    for ksef_ref in ["KSEF-1", "KSEF-3"]:
+        mocked_responses.add(
+            url=f"{BASE}{URL_INVOICES_GET.format(ksef_reference_number=ksef_ref)}",
+            method="GET",
+            body=invoice_xml,
+        )
+    mocked_responses.add(
+        url=f"{BASE}{URL_INVOICES_GET.format(ksef_reference_number='KSEF-4')}",
+        method="GET",
+        status=404,
+    )
+    (tmp_path / f"KSEF-2{suffix}").write_bytes(b"already downloaded")
+
+    client = Client(authorization=_create_mock_authorization(), environment=Environment.TEST)
+    results = client.download_invoices(
+        ["KSEF-1", "KSEF-2", "KSEF-3", "KSEF-4"], tmp_path, max_workers=2, compress=compress
+    )
+
+    assert [result.ok for result in results] == [True, True, True, False]
+    assert [result.skipped for result in results] == [False, True, False, False]
+    content = (tmp_path / f"KSEF-3{suffix}").read_bytes()
+    assert (gzip.decompress(content) if compress else content) == invoice_xml
+    assert (tmp_path / f"KSEF-2{suffix}").read_bytes() == b"already downloaded"
+    assert not (tmp_path / f"KSEF-4{suffix}").exists()
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        f"KSEF-{number}{suffix}" for number in (1, 2, 3)
+    ]
+
+
+def _mock_session_lifecycle(
+    mocked_responses: RequestsMock, cert_der: bytes, session_refs: List[str]
+) -> None:
+    """Add mock responses for opening and closing each of the given sessions, in order."""
+    # The certificate listing is cached, so it is downloaded only for the first session
+    _mock_public_key_certs(mocked_responses, cert_der)
+    for session_ref in session_refs:
+        mocked_responses.add(
+            url=f"{BASE}{URL_SESSIONS_ONLINE}",
+            method="POST",
+            content_type="application/json",
+            json={"referenceNumber": session_ref},
+        )
+        mocked_responses.add(
+            url=f"{BASE}{URL_SESSIONS_ONLINE_CLOSE.format(reference_number=session_ref)}",
+            method="POST",
+            status=204,
+        )
+
+
+def test_send_invoices_reuses_one_session(mocked_responses: RequestsMock) -> None:
+    """Test that send_invoices() sends all invoices through a single session concurrently."""
+    cert_der, _ = _generate_test_certificate()
+    _mock_session_lifecycle(mocked_responses, cert_der, ["session-ref-1"])
+    mocked_responses.add(
+        url=f"{BASE}{URL_SESSIONS_ONLINE_INVOICES.format(reference_number='session-ref-1')}",
+        method="POST",
+        status=202,
+        content_type="application/json",
+        json={"referenceNumber": "invoice-ref"},
+    )
+
+    client = Client(authorization=_create_mock_authorization(), environment=Environment.TEST)
+    invoices = [_create_test_invoice() for _ in range(5)]
+
+    results = client.send_invoices(nip="1234567890", invoices=iter(invoices), max_workers=3)
+
+    assert [result.index for result in results] == [0, 1, 2, 3, 4]
+    assert all(result.ok for result in results)
+    assert all(result.response is not None for result in results)
+    # certs + open + 5 x send + close
+    assert len(mocked_responses.calls) == 8  # noqa: PLR2004
+
+
+def test_send_invoices_rotates_sessions_and_reports_failures(
+    mocked_responses: RequestsMock,
+) -> None:
+    """Test session rotation after the per-session limit and per-invoice failure reporting."""
+    cert_der, _ = _generate_test_certificate()
+    _mock_session_lifecycle(mocked_responses, cert_der, ["session-ref-1", "session-ref-2"])
+    first_url = URL_SESSIONS_ONLINE_INVOICES.format(reference_number="session-ref-1")
+    mocked_responses.add(
+        url=f"{BASE}{first_url}",
+        method="POST",
+        status=202,
+        json={"referenceNumber": "invoice-ref-1"},
+    )
+    mocked_responses.add(
+        url=f"{BASE}{first_url}",
+        method="POST",
+        status=400,
+        json={"exception": "invalid invoice"},
+    )
+    mocked_responses.add(
+        url=f"{BASE}{URL_SESSIONS_ONLINE_INVOICES.format(reference_number='session-ref-2')}",
+        method="POST",
+        status=202,
+        json={"referenceNumber": "invoice-ref-3"},
+    )
+
+    client = Client(authorization=_create_mock_authorization(), environment=Environment.TEST)
+    invoices = [_create_test_invoice() for _ in range(3)]
+
+    results = client.send_invoices(nip="1234567890", invoices=invoices, max_invoices_per_session=2)
+
+    assert [result.ok for result in results] == [True, False, True]
+    assert results[0].response is not None
+    assert results[0].response.session_reference_number == "session-ref-1"
+    assert isinstance(results[1].error, requests.HTTPError)
+    assert results[2].response is not None
+    assert results[2].response.session_reference_number == "session-ref-2"
+
+
+def test_send_invoices_returns_results_when_close_fails(mocked_responses: RequestsMock) -> None:
+    """Test that a failure to close the session does not discard the results."""
+    cert_der, _ = _generate_test_certificate()
+    _mock_public_key_certs(mocked_responses, cert_der)
+    mocked_responses.add(
+        url=f"{BASE}{URL_SESSIONS_ONLINE}",
+        method="POST",
+        json={"referenceNumber": "session-ref-1"},
+    )
+    mocked_responses.add(
+        url=f"{BASE}{URL_SESSIONS_ONLINE_INVOICES.format(reference_number='session-ref-1')}",
+        method="POST",
+        status=202,
+        json={"referenceNumber": "invoice-ref"},
+    )
+    mocked_responses.add(
+        url=f"{BASE}{URL_SESSIONS_ONLINE_CLOSE.format(reference_number='session-ref-1')}",
+        method="POST",
+        status=400,
+        json={"exception": "session already closed"},
+    )
+
+    client = Client(authorization=_create_mock_authorization(), environment=Environment.TEST)
+    results = client.send_invoices(nip="1234567890", invoices=[_create_test_invoice()] * 2)
+
+    assert [result.ok for result in results] == [True, True]
+
+
+def test_send_invoices_in_session_parallel_partial_failure(
+    mocked_responses: RequestsMock,
+) -> None:
+    """Test the parallel in-session sender keeps input order and reports failed invoices."""
+    session_context = SessionContext(
+        reference_number="session-ref-123",
+        aes_key=b"\x00" * 32,
+        iv=b"\x00" * 16,
+    )
+    invoices = []
+    for issue_number in ["A/1", "BB/2", "CCC/3", "DDDD/4", "EEEEE/5", "FFFFFF/6"]:
+        invoice = _create_test_invoice()
+        invoice.invoice_data.issue_number = issue_number
+        invoices.append(invoice)
+    invoice_sizes = [len(convert_invoice_to_xml(invoice)) for invoice in invoices]
+    failing_size = invoice_sizes[3]
+
+    def callback(request: PreparedRequest) -> Tuple[int, Dict[str, str], str]:
+        size = json.loads(request.body or b"{}")["invoiceSize"]
+        if size == failing_size:
+            return 400, {}, json.dumps({"exception": "invalid invoice"})
+        return 202, {}, json.dumps({"referenceNumber": f"invoice-ref-{size}"})
+
+    url = URL_SESSIONS_ONLINE_INVOICES.format(reference_number=session_context.reference_number)
+    mocked_responses.add_callback(
+        responses.POST, f"{BASE}{url}", callback=callback, content_type="application/json"
+    )
+
+    client = Client(authorization=_create_mock_authorization(), environment=Environment.TEST)
+    results = client.send_invoices_in_session(
+        session_context=session_context, invoices=iter(invoices), max_workers=4, start_index=10
+    )
+
+    assert [result.index for result in results] == [10, 11, 12, 13, 14, 15]
+    assert [result.ok for result in results] == [True, True, True, False, True, True]
+    for result, size in zip(results, invoice_sizes):
+        if result.ok:
+            assert result.response is not None
+            assert result.response.reference_number == f"invoice-ref-{size}"
+    assert isinstance(results[3].error, requests.HTTPError)
+
+
+def test_send_batch_full_flow(mocked_responses: RequestsMock) -> None:
+    """Test that send_batch() opens a batch session, uploads every part and closes it."""
+    cert_der, _ = _generate_test_certificate()
+    _mock_public_key_certs(mocked_responses, cert_der)
+    upload_url = "https://upload.example.com/part/{}"
+    uploaded: Dict[int, int] = {}
+
+    def open_batch(request: PreparedRequest) -> Tuple[int, Dict[str, str], str]:
+        body = json.loads(request.body or b"{}")
+        parts = body["batchFile"]["fileParts"]
+        for part in parts:
+            mocked_responses.add_callback(
+                "PUT", upload_url.format(part["ordinalNumber"]), callback=upload_part
+            )
+        return (
+            201,
+            {},
+            json.dumps(
+                {
+                    "referenceNumber": "batch-ref-1",
+                    "partUploadRequests": [
+                        {
+                            "ordinalNumber": part["ordinalNumber"],
+                            "method": "PUT",
+                            "url": upload_url.format(part["ordinalNumber"]),
+                            "headers": {"x-ms-blob-type": "BlockBlob"},
+                        }
+                        for part in parts
+                    ],
+                }
+            ),
+        )
+
+    def upload_part(request: PreparedRequest) -> Tuple[int, Dict[str, str], str]:
+        assert "Authorization" not in request.headers
+        body = request.body
+        data = body.read() if hasattr(body, "read") else body
+        uploaded[int(str(request.url).rsplit("/", 1)[1])] = len(data or b"")
+        return (201, {}, "")
+
+    mocked_responses.add_callback("POST", f"{BASE}sessions/batch", callback=open_batch)
+    mocked_responses.add(url=f"{BASE}sessions/batch/batch-ref-1/close", method="POST", status=204)
+
+    client = Client(authorization=_create_mock_authorization(), environment=Environment.TEST)
+    invoices = (_create_test_invoice() for _ in range(3))
+
+    session = client.send_batch(nip="1234567890", invoices=invoices, part_size=1000)
+
+    assert session.reference_number == "batch-ref-1"
+    assert len(uploaded) == len(session.part_upload_requests) > 1
+    open_body = json.loads(mocked_responses.calls[1].request.body)
+    assert open_body["contextIdentifier"] == {"type": "Nip", "value": "1234567890"}
+    assert [part["fileSize"] for part in open_body["batchFile"]["fileParts"]] == [
+        uploaded[number] for number in sorted(uploaded)
+    ]
+    assert mocked_responses.calls[-1].request.url == f"{BASE}sessions/batch/batch-ref-1/close"
+
+
+def test_send_batch_closes_session_when_upload_fails(mocked_responses: RequestsMock) -> None:
+    """Test that send_batch() reports the failed parts and still closes the session."""
+    cert_der, _ = _generate_test_certificate()
+    _mock_public_key_certs(mocked_responses, cert_der)
+    upload_url = "https://upload.example.com/part/{}"
+    failing_part = 2
+
+    def open_batch(request: PreparedRequest) -> Tuple[int, Dict[str, str], str]:
+        parts = json.loads(request.body or b"{}")["batchFile"]["fileParts"]
+        for part in parts:
+            number = part["ordinalNumber"]
+            status = 400 if number == failing_part else 201
+            mocked_responses.add("PUT", upload_url.format(number), status=status)
+        upload_requests = [
+            {
+                "ordinalNumber": part["ordinalNumber"],
+                "method": "PUT",
+                "url": upload_url.format(part["ordinalNumber"]),
+                "headers": {},
+            }
+            for part in parts
+        ]
+        return (
+            201,
+            {},
+            json.dumps({"referenceNumber": "batch-ref-1", "partUploadRequests": upload_requests}),
+        )
+
+    mocked_responses.add_callback("POST", f"{BASE}sessions/batch", callback=open_batch)
+    mocked_responses.add(url=f"{BASE}sessions/batch/batch-ref-1/close", method="POST", status=204)
+
+    client = Client(authorization=_create_mock_authorization(), environment=Environment.TEST)
+    invoices = (_create_test_invoice() for _ in range(3))
+
+    with pytest.raises(BatchUploadError) as exc_info:
+        client.send_batch(nip="1234567890", invoices=invoices, part_size=1000)
+
+    assert exc_info.value.reference_number == "batch-ref-1"
+    assert list(exc_info.value.failed_parts) == [failing_part]
+    assert isinstance(exc_info.value.failed_parts[failing_part], requests.HTTPError)
+    assert mocked_responses.calls[-1].request.url == f"{BASE}sessions/batch/batch-ref-1/close"
+
+
+def _session_invoices_page(numbers: List[int], continuation_token: Optional[str]) -> Dict:
+    """Build a page of the session invoice status listing."""
+    return {
+        "continuationToken": continuation_token,
+        "invoices": [
+            {
+                "ordinalNumber": number,
+                "referenceNumber": f"invoice-ref-{number:03d}",
+                "status": {"code": 200, "description": "Accepted"},
+            }
+            for number in numbers
+        ],
+    }
+
+
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_iter_session_invoices_follows_continuation_token(
+    mocked_responses: RequestsMock, prefetch: bool
+) -> None:
+    """Test that all pages are fetched by following the continuation token."""
+    url = f"{BASE}{URL_SESSIONS_INVOICES.format(reference_number='session-ref-123')}?PageSize=2"
+    pages = [([1, 2], "token-2"), ([3, 4], "token-3"), ([5], None)]
+    for index, (numbers, continuation_token) in enumerate(pages):
+        headers = {} if index == 0 else {"x-continuation-token": pages[index - 1][1]}
+        mocked_responses.add(
+            url=url,
+            method="GET",
+            json=_session_invoices_page(numbers, continuation_token),
+            match=[matchers.header_matcher(headers)] if headers else [],
+        )
+
+    client = Client(authorization=_create_mock_authorization(), environment=Environment.TEST)
+    invoices = client.iter_session_invoices("session-ref-123", page_size=2, prefetch=prefetch)
+
+    assert [invoice.ordinal_number for invoice in invoices] == [1, 2, 3, 4, 5]
+    assert "x-continuation-token" not in mocked_responses.calls[0].request.headers
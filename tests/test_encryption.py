@@ -1,20 +1,28 @@
 """Tests for invoice encryption."""
 import base64
+import hashlib
+import io
 
+import pytest
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric.rsa import generate_private_key
 
 from ksef.encryption import (
     AES_KEY_SIZE,
     IV_SIZE,
+    StreamDigest,
     _decrypt_aes_cbc,
     _encrypt_aes_cbc,
-    _encrypt_key_rsa_oaep,
     _load_public_key_from_b64,
     _pad_data,
     _unpad_data,
     decrypt_invoice,
+    decrypt_stream,
+    encrypt_buffer,
     encrypt_invoice,
+    encrypt_key_rsa_oaep,
+    encrypt_stream,
+    read_chunks,
 )
 
 
@@ -98,7 +106,7 @@ def test_rsa_oaep_key_wrapping() -> None:
 
     aes_key = b"K" * AES_KEY_SIZE  # 32 bytes
 
-    encrypted_key = _encrypt_key_rsa_oaep(aes_key, public_key)
+    encrypted_key = encrypt_key_rsa_oaep(aes_key, public_key)
 
     # Decrypt with private key
     decrypted_key = private_key.decrypt(
@@ -174,3 +182,50 @@ def test_encrypt_large_invoice() -> None:
     decrypted = decrypt_invoice(encrypted.encrypted_content, private_key_pem)
 
     assert decrypted == invoice_xml
+
+
+@pytest.mark.parametrize("size", [0, 15, 16, 1000, 4096])
+def test_stream_roundtrip_matches_one_shot(size: int) -> None:
+    """Test that streaming encryption matches the one-shot functions for any chunking."""
+    key = b"0" * AES_KEY_SIZE
+    iv = b"1" * IV_SIZE
+    plaintext = bytes(range(256)) * (size // 256) + bytes(size % 256)
+    chunks = [plaintext[offset : offset + 7] for offset in range(0, size, 7)]
+
+    encrypt_digest = StreamDigest()
+    ciphertext = b"".join(
+        bytes(chunk) for chunk in encrypt_stream(chunks, key, iv, encrypt_digest, chunk_size=64)
+    )
+    decrypt_digest = StreamDigest()
+    decrypted = b"".join(
+        decrypt_stream(read_chunks(io.BytesIO(ciphertext), chunk_size=48), key, iv, decrypt_digest)
+    )
+
+    assert ciphertext == _encrypt_aes_cbc(plaintext, key, iv)
+    assert decrypted == plaintext
+    for digest in (encrypt_digest, decrypt_digest):
+        assert digest.plaintext_size == size
+        assert digest.plaintext_sha256 == hashlib.sha256(plaintext).digest()
+        assert digest.ciphertext_size == len(ciphertext)
+        assert digest.ciphertext_sha256 == hashlib.sha256(ciphertext).digest()
+
+
+def test_read_chunks_stops_after_length() -> None:
+    """Test reading a limited number of bytes from a file."""
+    file = io.BytesIO(b"0123456789")
+
+    assert [bytes(chunk) for chunk in read_chunks(file, chunk_size=4, length=6)] == [
+        b"0123",
+        b"45",
+    ]
+    assert file.read() == b"6789"
+
+
+@pytest.mark.parametrize("size", [0, 15, 16, 1000])
+def test_encrypt_buffer_matches_one_shot(size: int) -> None:
+    """Test that encrypting into a preallocated buffer gives the usual ciphertext."""
+    key = b"0" * AES_KEY_SIZE
+    iv = b"1" * IV_SIZE
+    plaintext = bytes(size)
+
+    assert bytes(encrypt_buffer(plaintext, key, iv)) == _encrypt_aes_cbc(plaintext, key, iv)
@@ -0,0 +1,137 @@
+"""Tests for invoice export packages."""
+import base64
+import hashlib
+import io
+import json
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import pytest
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPrivateKey
+from requests import PreparedRequest
+from responses import RequestsMock
+
+from ksef.client import Client
+from ksef.constants import URL_INVOICES_EXPORTS, URL_INVOICES_EXPORTS_STATUS, Environment
+from ksef.encryption import _encrypt_aes_cbc
+from ksef.exceptions import ExportError
+from ksef.polling import PollingStrategy
+from tests.test_client_invoices import (
+    _create_mock_authorization,
+    _generate_test_certificate,
+    _mock_public_key_certs,
+)
+from tests.test_invoice_query import FILTERS
+
+BASE = Environment.TEST.value
+PART_URL = "https://storage.example.com/export/part-{ordinal_number}"
+NO_WAIT = PollingStrategy(initial_delay=0.0, sleep=lambda _: None)
+
+
+def _package_zip(invoices: Dict[str, bytes]) -> bytes:
+    """Build the ZIP archive of an export package."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, mode="w") as archive:
+        for name, content in invoices.items():
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+def _mock_export(
+    mocked_responses: RequestsMock, invoices: Dict[str, bytes], parts: int, corrupt: bool = False
+) -> None:
+    """Serve an export whose package is split into `parts` encrypted parts."""
+    cert_der, private_key_pem = _generate_test_certificate()
+    private_key = serialization.load_pem_private_key(private_key_pem, password=None)
+    assert isinstance(private_key, RSAPrivateKey)
+    _mock_public_key_certs(mocked_responses, cert_der)
+    archive = _package_zip(invoices)
+    part_size = -(-len(archive) // parts)
+    encrypted_parts: List[bytes] = []
+
+    def start(request: PreparedRequest) -> Tuple[int, Dict[str, str], str]:
+        body = json.loads(request.body or "{}")
+        assert body["filters"] == FILTERS.to_dict()
+        aes_key = private_key.decrypt(
+            base64.b64decode(body["encryption"]["encryptedSymmetricKey"]),
+            padding.OAEP(
+                mgf=padding.MGF1(algorithm=hashes.SHA256()), algorithm=hashes.SHA256(), label=None
+            ),
+        )
+        iv = base64.b64decode(body["encryption"]["initializationVector"])
+        for offset in range(0, len(archive), part_size):
+            encrypted_parts.append(
+                _encrypt_aes_cbc(archive[offset : offset + part_size], aes_key, iv)
+            )
+        return 201, {}, json.dumps({"referenceNumber": "export-ref"})
+
+    statuses = iter([{"code": 100, "description": "In progress"}])
+
+    def status(_: PreparedRequest) -> Tuple[int, Dict[str, str], str]:
+        current = next(statuses, {"code": 200, "description": "Done"})
+        body = {"status": current}
+        if current["code"] == 200:  # noqa: PLR2004
+            body["package"] = {
+                "invoiceCount": len(invoices),
+                "isTruncated": False,
+                "parts": [
+                    {
+                        "ordinalNumber": number,
+                        "method": "GET",
+                        "url": PART_URL.format(ordinal_number=number),
+                        "encryptedPartSize": len(part),
+                        "encryptedPartHash": base64.b64encode(
+                            hashlib.sha256(b"" if corrupt else part).digest()
+                        ).decode(),
+                    }
+                    for number, part in enumerate(encrypted_parts, start=1)
+                ],
+            }
+        return 200, {}, json.dumps(body)
+
+    def download(request: PreparedRequest) -> Tuple[int, Dict[str, str], bytes]:
+        assert "Authorization" not in request.headers
+        number = int(str(request.url).rsplit("-", 1)[-1])
+        return 200, {}, encrypted_parts[number - 1]
+
+    mocked_responses.add_callback("POST", f"{BASE}{URL_INVOICES_EXPORTS}", callback=start)
+    status_url = URL_INVOICES_EXPORTS_STATUS.format(reference_number="export-ref")
+    mocked_responses.add_callback("GET", f"{BASE}{status_url}", callback=status)
+    for number in range(1, parts + 1):
+        mocked_responses.add_callback(
+            "GET", PART_URL.format(ordinal_number=number), callback=download
+        )
+
+
+def test_export_invoices(mocked_responses: RequestsMock, tmp_path: Path) -> None:
+    """Test starting an export, waiting for it and extracting its parts."""
+    invoices = {
+        f"KSEF-{number}.xml": f"<Faktura>{number}</Faktura>".encode() for number in range(20)
+    }
+    _mock_export(mocked_responses, invoices, parts=3)
+    client = Client(authorization=_create_mock_authorization(), environment=Environment.TEST)
+
+    result = client.export_invoices(
+        FILTERS, tmp_path / "invoices", polling=NO_WAIT, directory=tmp_path
+    )
+
+    assert result.reference_number == "export-ref"
+    assert result.package.invoice_count == 20  # noqa: PLR2004
+    assert len(result.package.parts) == 3  # noqa: PLR2004
+    assert {path.name: path.read_bytes() for path in result.files} == invoices
+    # Temporary package files are removed
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["invoices"]
+
+
+def test_export_rejects_corrupted_part(mocked_responses: RequestsMock, tmp_path: Path) -> None:
+    """Test that a part not matching its hash is rejected."""
+    _mock_export(mocked_responses, {"KSEF-1.xml": b"<Faktura/>"}, parts=1, corrupt=True)
+    client = Client(authorization=_create_mock_authorization(), environment=Environment.TEST)
+
+    with pytest.raises(ExportError, match="corrupted"):
+        client.export_invoices(FILTERS, tmp_path / "invoices", polling=NO_WAIT)
+
+    assert not (tmp_path / "invoices").exists()
@@ -0,0 +1,136 @@
+"""Tests for the invoice metadata query."""
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from requests import PreparedRequest
+from responses import RequestsMock
+
+from ksef.client import Client
+from ksef.constants import URL_QUERY_INVOICES, Environment
+from ksef.models.invoice_query import (
+    AmountRange,
+    AmountType,
+    DateRange,
+    DateType,
+    InvoiceQueryFilters,
+    SubjectType,
+)
+from ksef.models.responses.invoices import InvoiceMetadata
+from ksef.utils import dumps_json
+from tests.test_client_invoices import _create_mock_authorization
+
+BASE = Environment.TEST.value
+
+FILTERS = InvoiceQueryFilters(
+    subject_type=SubjectType.BUYER,
+    date_range=DateRange(
+        start=datetime(2025, 1, 1, tzinfo=timezone.utc),
+        end=datetime(2025, 2, 1, tzinfo=timezone.utc),
+    ),
+)
+
+
+def _invoice_metadata(number: int) -> Dict[str, Any]:
+    """Build an invoice metadata record as returned by the API."""
+    return {
+        "ksefNumber": f"1234567890-20250101-{number:010d}-AB",
+        "invoiceNumber": f"FV/{number}/2025",
+        "issueDate": "2025-01-10",
+        "invoicingDate": "2025-01-10T12:00:00.1234567+00:00",
+        "acquisitionDate": "2025-01-10T12:00:05+00:00",
+        "seller": {"nip": "1234567890", "name": "Seller"},
+        "buyer": {"identifier": {"type": "Nip", "value": "0987654321"}, "name": "Buyer"},
+        "netAmount": 100.1,
+        "grossAmount": 123.12,
+        "vatAmount": 23.02,
+        "currency": "PLN",
+        "invoiceType": "Vat",
+        "hasAttachment": False,
+    }
+
+
+def _mock_pages(mocked_responses: RequestsMock, pages: int, page_size: int) -> List[int]:
+    """Serve `pages` full pages of results, recording the requested page offsets."""
+    offsets: List[int] = []
+
+    def callback(request: PreparedRequest) -> Tuple[int, Dict[str, str], str]:
+        offset = int(parse_qs(urlparse(request.url).query)["PageOffset"][0])
+        offsets.append(offset)
+        assert json.loads(request.body or "{}") == FILTERS.to_dict()
+        numbers = range(offset * page_size, (offset + 1) * page_size) if offset < pages else []
+        body = {
+            "invoices": [_invoice_metadata(number) for number in numbers],
+            "hasMore": offset < pages - 1,
+            "isTruncated": False,
+        }
+        return 200, {}, json.dumps(body)
+
+    mocked_responses.add_callback("POST", f"{BASE}{URL_QUERY_INVOICES}", callback=callback)
+    return offsets
+
+
+def test_filters_to_dict() -> None:
+    """Test serializing the query criteria to the request body."""
+    filters = InvoiceQueryFilters(
+        subject_type=SubjectType.SELLER,
+        date_range=DateRange(
+            start=datetime(2025, 1, 1, tzinfo=timezone.utc), date_type=DateType.ISSUE
+        ),
+        amount=AmountRange(minimum=Decimal("100.50"), amount_type=AmountType.NET),
+        buyer_nip="0987654321",
+        currency_codes=["EUR"],
+    )
+
+    assert filters.to_dict() == {
+        "subjectType": "Subject1",
+        "dateRange": {"dateType": "Issue", "from": "2025-01-01T00:00:00+00:00"},
+        "amount": {"type": "Netto", "from": Decimal("100.50")},
+        "buyerIdentifier": {"type": "Nip", "value": "0987654321"},
+        "currencyCodes": ["EUR"],
+    }
+    assert '"amount": {"type": "Netto", "from": 100.50}' in dumps_json(filters.to_dict())
+
+
+def test_invoice_metadata_from_dict() -> None:
+    """Test parsing an invoice metadata record."""
+    metadata = InvoiceMetadata.from_dict(_invoice_metadata(7))
+
+    assert metadata.invoice_number == "FV/7/2025"
+    assert metadata.issue_date == date(2025, 1, 10)
+    assert metadata.invoicing_date == datetime(2025, 1, 10, 12, 0, 0, 123456, tzinfo=timezone.utc)
+    assert metadata.gross_amount == Decimal("123.12")
+    assert metadata.seller_nip == "1234567890"
+    assert metadata.buyer_identifier == "0987654321"
+    assert metadata.permanent_storage_date is None
+
+
+def test_search_invoices_single_page(mocked_responses: RequestsMock) -> None:
+    """Test fetching a single page of results."""
+    _mock_pages(mocked_responses, pages=2, page_size=10)
+    client = Client(authorization=_create_mock_authorization(), environment=Environment.TEST)
+
+    page = client.search_invoices(FILTERS, page_size=10)
+
+    assert len(page.invoices) == 10  # noqa: PLR2004
+    assert page.has_more
+    assert not page.is_truncated
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_iter_invoices_walks_all_pages(mocked_responses: RequestsMock, max_workers: int) -> None:
+    """Test that all pages are yielded in order, sequentially or concurrently."""
+    offsets = _mock_pages(mocked_responses, pages=3, page_size=10)
+    client = Client(authorization=_create_mock_authorization(), environment=Environment.TEST)
+
+    invoices = list(client.iter_invoices(FILTERS, page_size=10, max_workers=max_workers))
+
+    assert [invoice.invoice_number for invoice in invoices] == [
+        f"FV/{number}/2025" for number in range(30)
+    ]
+    assert sorted(offsets)[:3] == [0, 1, 2]
+    # Pages requested ahead of the last one are bounded by the number of workers
+    assert len(offsets) <= 2 + max_workers
@@ -0,0 +1,47 @@
+"""Tests for the multi-tenant client."""
+from typing import List
+
+import pytest
+from responses import RequestsMock
+
+from ksef.auth.pool import AuthorizationPool
+from ksef.client import SessionContext
+from ksef.constants import URL_INVOICES_GET, Environment
+from ksef.multi_tenant import MultiTenantClient
+from tests.auth.test_pool import _FakeAuthorization
+
+BASE = Environment.TEST.value
+
+
+def test_calls_are_routed_by_nip(mocked_responses: RequestsMock) -> None:
+    """Test that each call uses the token of its NIP and one shared connection pool."""
+    url = URL_INVOICES_GET.format(ksef_reference_number="KSEF-2024-001")
+    mocked_responses.add(url=f"{BASE}{url}", method="GET", body=b"<Faktura/>")
+    mocked_responses.add(url=f"{BASE}{url}", method="GET", body=b"<Faktura/>")
+    calls: List[str] = []
+    client = MultiTenantClient(
+        AuthorizationPool(lambda nip: _FakeAuthorization(calls)), environment=Environment.TEST
+    )
+
+    client.download_invoice("1111111111", ksef_reference_number="KSEF-2024-001")
+    client.download_invoice("2222222222", ksef_reference_number="KSEF-2024-001")
+
+    assert [call.request.headers["Authorization"] for call in mocked_responses.calls] == [
+        "Bearer access-1111111111",
+        "Bearer access-2222222222",
+    ]
+    assert client.for_nip("1111111111").session is client.session
+    assert calls == ["1111111111", "2222222222"]
+
+
+def test_close_session_requires_nip() -> None:
+    """Test that a session context without a NIP is rejected instead of routed to "None"."""
+    calls: List[str] = []
+    client = MultiTenantClient(
+        AuthorizationPool(lambda nip: _FakeAuthorization(calls)), environment=Environment.TEST
+    )
+
+    with pytest.raises(ValueError, match="no NIP"):
+        client.close_session(SessionContext(reference_number="ref", aes_key=b"k", iv=b"i"))
+
+    assert calls == []
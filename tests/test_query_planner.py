@@ -0,0 +1,137 @@
+"""Tests for the invoice metadata query planner."""
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from requests import PreparedRequest
+from responses import RequestsMock
+
+from ksef.client import Client
+from ksef.constants import URL_QUERY_INVOICES, Environment
+from ksef.models.invoice_query import DateRange, InvoiceQueryFilters, SubjectType
+from ksef.query_planner import QUEUED_PAGES_PER_WORKER, QueryPlanner
+from ksef.utils import parse_datetime
+from tests.test_client_invoices import _create_mock_authorization
+from tests.test_invoice_query import _invoice_metadata
+
+BASE = Environment.TEST.value
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+RESULT_CAP = 20  # Records returned by the fake KSEF for a single query
+INVOICE_COUNT = 100
+
+
+def _invoice(number: int) -> Dict[str, Any]:
+    """Build an invoice metadata record invoiced `number` hours after START."""
+    invoice = _invoice_metadata(number)
+    invoice["invoicingDate"] = (START + timedelta(hours=number)).isoformat()
+    return invoice
+
+
+def _mock_capped_query(
+    mocked_responses: RequestsMock, later_pages: Optional[threading.Event] = None
+) -> List[Dict[str, Any]]:
+    """Serve metadata queries over INVOICE_COUNT invoices, capping every query's results.
+
+    With `later_pages`, requests for pages after the first one wait until it is set.
+    """
+    invoices = [_invoice(number) for number in range(INVOICE_COUNT)]
+    queries: List[Dict[str, Any]] = []
+
+    def callback(request: PreparedRequest) -> Tuple[int, Dict[str, str], str]:
+        query = parse_qs(urlparse(request.url).query)
+        page_size = int(query["PageSize"][0])
+        page_offset = int(query["PageOffset"][0])
+        if later_pages is not None and page_offset > 0:
+            later_pages.wait(timeout=5)
+        date_range = json.loads(request.body or "{}")["dateRange"]
+        queries.append(date_range)
+        start, end = parse_datetime(date_range["from"]), parse_datetime(date_range["to"])
+        matching = [
+            invoice
+            for invoice in invoices
+            if start <= parse_datetime(invoice["invoicingDate"]) <= end
+        ]
+        reachable = matching[:RESULT_CAP]
+        page = reachable[page_offset * page_size : (page_offset + 1) * page_size]
+        last_page = (page_offset + 1) * page_size >= len(reachable)
+        body = {
+            "invoices": page,
+            "hasMore": not last_page,
+            "isTruncated": last_page and len(matching) > RESULT_CAP,
+        }
+        return 200, {}, json.dumps(body)
+
+    mocked_responses.add_callback("POST", f"{BASE}{URL_QUERY_INVOICES}", callback=callback)
+    return queries
+
+
+@pytest.mark.parametrize("initial_window", [None, timedelta(days=1)])
+def test_planner_splits_truncated_windows(
+    mocked_responses: RequestsMock, initial_window: Optional[timedelta]
+) -> None:
+    """Test that all invoices are returned exactly once despite the result cap."""
+    queries = _mock_capped_query(mocked_responses)
+    client = Client(
+        authorization=_create_mock_authorization(),
+        environment=Environment.TEST,
+        rate_limiter=None,
+    )
+    planner = QueryPlanner(client, page_size=10, max_workers=4, initial_window=initial_window)
+    filters = InvoiceQueryFilters(
+        subject_type=SubjectType.BUYER,
+        date_range=DateRange(start=START, end=START + timedelta(hours=INVOICE_COUNT)),
+    )
+
+    invoices = list(planner.iter_invoices(filters))
+
+    numbers = sorted(int(invoice.invoice_number.split("/")[1]) for invoice in invoices)
+    assert numbers == list(range(INVOICE_COUNT))
+    assert len(queries) > INVOICE_COUNT // RESULT_CAP
+
+
+def test_planner_streams_pages_and_accepts_naive_dates(mocked_responses: RequestsMock) -> None:
+    """Test that records are yielded before the rest of the window is fetched."""
+    later_pages = threading.Event()
+    queries = _mock_capped_query(mocked_responses, later_pages)
+    client = Client(authorization=_create_mock_authorization(), environment=Environment.TEST)
+    planner = QueryPlanner(client, page_size=10, max_workers=1)
+    naive_start = START.replace(tzinfo=None)
+    filters = InvoiceQueryFilters(
+        subject_type=SubjectType.BUYER,
+        date_range=DateRange(start=naive_start, end=naive_start + timedelta(hours=INVOICE_COUNT)),
+    )
+    assert filters.date_range.start == START
+
+    invoices = planner.iter_invoices(filters)
+    first = next(invoices)
+    assert len(queries) == 1
+
+    later_pages.set()
+    numbers = sorted(int(invoice.invoice_number.split("/")[1]) for invoice in [first, *invoices])
+    assert numbers == list(range(INVOICE_COUNT))
+
+
+def test_planner_waits_for_a_slow_consumer(mocked_responses: RequestsMock) -> None:
+    """Test that workers stop fetching pages while the queue is full, and stop on close."""
+    queries = _mock_capped_query(mocked_responses)
+    client = Client(authorization=_create_mock_authorization(), environment=Environment.TEST)
+    planner = QueryPlanner(client, page_size=1, max_workers=1)
+    filters = InvoiceQueryFilters(
+        subject_type=SubjectType.BUYER,
+        date_range=DateRange(start=START, end=START + timedelta(hours=INVOICE_COUNT)),
+    )
+
+    invoices = planner.iter_invoices(filters)
+    next(invoices)
+    time.sleep(0.2)
+    # The page consumed, the queued ones and the one waiting for room in the queue
+    assert len(queries) <= 2 + QUEUED_PAGES_PER_WORKER
+
+    invoices.close()
+    fetched = len(queries)
+    time.sleep(0.2)
+    assert len(queries) == fetched
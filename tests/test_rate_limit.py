@@ -0,0 +1,129 @@
+"""Tests for the client-side rate limiter."""
+import threading
+from typing import List
+
+from responses import RequestsMock
+
+from ksef.client import Client
+from ksef.constants import URL_INVOICES_GET, URL_SESSIONS_STATUS, Environment
+from ksef.rate_limit import SWEEP_INTERVAL, Limit, RateLimiter, TokenBucket
+from tests.test_client_invoices import _create_mock_authorization
+
+BASE = Environment.TEST.value
+
+
+def test_token_bucket_smooths_after_burst() -> None:
+    """Test that a burst passes immediately and later tokens are spaced by the rate."""
+    now = [0.0]
+    bucket = TokenBucket(Limit(rate=2, burst=3), clock=lambda: now[0])
+
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert [bucket.reserve() for _ in range(2)] == [0.5, 1.0]
+
+    now[0] += 10
+    assert bucket.reserve() == 0.0  # noqa: PLR2004
+
+
+def test_rate_limiter_buckets_per_endpoint_and_nip() -> None:
+    """Test that every endpoint and NIP context has an independent bucket."""
+    sleeps: List[float] = []
+    limiter = RateLimiter(
+        limits={URL_INVOICES_GET: Limit(rate=1, burst=1)},
+        default=None,
+        clock=lambda: 0.0,
+        sleep=sleeps.append,
+    )
+
+    limiter.acquire(URL_INVOICES_GET, "1111111111")
+    limiter.acquire(URL_INVOICES_GET, "2222222222")
+    limiter.acquire(URL_SESSIONS_STATUS, "1111111111")  # not limited
+    assert sleeps == []
+
+    limiter.acquire(URL_INVOICES_GET, "1111111111")
+    assert sleeps == [1.0]
+
+
+def test_rate_limiter_buckets_per_environment() -> None:
+    """Test that the same NIP has independent budgets in different environments."""
+    sleeps: List[float] = []
+    limiter = RateLimiter(
+        limits={URL_INVOICES_GET: Limit(rate=1, burst=1)}, clock=lambda: 0.0, sleep=sleeps.append
+    )
+
+    limiter.acquire(URL_INVOICES_GET, "1111111111", environment=Environment.TEST)
+    limiter.acquire(URL_INVOICES_GET, "1111111111", environment=Environment.PRODUCTION)
+    assert sleeps == []
+
+    limiter.acquire(URL_INVOICES_GET, "1111111111", environment=Environment.TEST)
+    assert sleeps == [1.0]
+
+
+def test_rate_limiter_evicts_refilled_buckets() -> None:
+    """Test that buckets of idle contexts are dropped once they have refilled."""
+    now = [0.0]
+    sleeps: List[float] = []
+    limiter = RateLimiter(
+        limits={URL_INVOICES_GET: Limit(rate=0.01, burst=1)},
+        clock=lambda: now[0],
+        sleep=sleeps.append,
+    )
+    for nip in range(100):
+        limiter.acquire(URL_INVOICES_GET, str(nip))
+
+    # Swept after a minute, but the buckets take 100 seconds to refill
+    now[0] = SWEEP_INTERVAL
+    limiter.acquire(URL_INVOICES_GET, "1111111111")
+    assert len(limiter) == 101  # noqa: PLR2004
+
+    # The active context keeps its bucket, and its budget
+    now[0] = 2 * SWEEP_INTERVAL
+    limiter.acquire(URL_INVOICES_GET, "1111111111")
+    assert len(limiter) == 1
+    assert [round(delay) for delay in sleeps] == [40]
+
+
+def test_rate_limiter_shared_between_threads() -> None:
+    """Test that concurrent callers reserve distinct slots from one bucket."""
+    sleeps: List[float] = []
+    lock = threading.Lock()
+
+    def sleep(delay: float) -> None:
+        with lock:
+            sleeps.append(delay)
+
+    limiter = RateLimiter(
+        limits={URL_INVOICES_GET: Limit(rate=10, burst=2)}, clock=lambda: 0.0, sleep=sleep
+    )
+    threads = [
+        threading.Thread(target=limiter.acquire, args=(URL_INVOICES_GET, "1111111111"))
+        for _ in range(6)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(round(delay, 6) for delay in sleeps) == [0.1, 0.2, 0.3, 0.4]
+
+
+def test_client_acquires_from_rate_limiter(mocked_responses: RequestsMock) -> None:
+    """Test that client calls take tokens from the endpoint's bucket."""
+    sleeps: List[float] = []
+    limiter = RateLimiter(
+        limits={URL_INVOICES_GET: Limit(rate=4, burst=1)},
+        clock=lambda: 0.0,
+        sleep=sleeps.append,
+    )
+    url = URL_INVOICES_GET.format(ksef_reference_number="KSEF-2024-001")
+    mocked_responses.add(url=f"{BASE}{url}", method="GET", body=b"<Faktura/>")
+    mocked_responses.add(url=f"{BASE}{url}", method="GET", body=b"<Faktura/>")
+
+    client = Client(
+        authorization=_create_mock_authorization(),
+        environment=Environment.TEST,
+        rate_limiter=limiter,
+    )
+    client.download_invoice(ksef_reference_number="KSEF-2024-001")
+    client.download_invoice(ksef_reference_number="KSEF-2024-001")
+
+    assert sleeps == [0.25]
@@ -0,0 +1,171 @@
+"""Tests for the retry policy."""
+import asyncio
+from http.client import RemoteDisconnected
+from typing import Dict, List, Optional
+
+import pytest
+import requests
+from responses import RequestsMock
+from urllib3.exceptions import MaxRetryError, NewConnectionError, ProtocolError
+
+from ksef.client import Client, SessionContext
+from ksef.constants import URL_SESSIONS_ONLINE_INVOICES, URL_SESSIONS_STATUS, Environment
+from ksef.retry import RetryPolicy
+from tests.test_client_invoices import _create_mock_authorization, _create_test_invoice
+
+BASE = Environment.TEST.value
+
+
+class _FakeResponse:
+    def __init__(self, status_code: int, headers: Optional[Dict[str, str]] = None):
+        self.status_code = status_code
+        self.text = ""
+        self.headers = headers or {}
+        self.closed = False
+
+    def close(self) -> None:
+        self.closed = True
+
+    async def aclose(self) -> None:
+        self.close()
+
+
+def _policy(sleeps: List[float], **kwargs: float) -> RetryPolicy:
+    """Build a policy that records its delays instead of sleeping."""
+    now = [0.0]
+
+    def sleep(delay: float) -> None:
+        sleeps.append(delay)
+        now[0] += delay
+
+    return RetryPolicy(clock=lambda: now[0], sleep=sleep, **kwargs)  # type: ignore[arg-type]
+
+
+def test_throttled_request_honours_retry_after() -> None:
+    """Test that a 429 is retried after the Retry-After delay, even when not idempotent."""
+    sleeps: List[float] = []
+    throttled = _FakeResponse(429, {"Retry-After": "2"})
+    responses = iter([throttled, _FakeResponse(202)])
+
+    response = _policy(sleeps).call(lambda: next(responses), idempotent=False)
+
+    assert response.status_code == 202  # noqa: PLR2004
+    assert sleeps == [2.0]
+    assert throttled.closed
+    assert not response.closed
+
+
+def test_server_error_retried_only_when_idempotent() -> None:
+    """Test that 5xx responses are retried for idempotent calls only."""
+    sleeps: List[float] = []
+    policy = _policy(sleeps, max_attempts=3)
+
+    response = policy.call(lambda: _FakeResponse(503), idempotent=False)
+    assert response.status_code == 503  # noqa: PLR2004
+    assert sleeps == []
+
+    response = policy.call(lambda: _FakeResponse(503), idempotent=True)
+    assert response.status_code == 503  # noqa: PLR2004
+    assert len(sleeps) == 2  # noqa: PLR2004
+    assert all(
+        0 <= delay <= policy.backoff_factor * 2**attempt for attempt, delay in enumerate(sleeps)
+    )
+
+
+def test_deadline_stops_retries() -> None:
+    """Test that no retry is attempted once it would exceed the deadline."""
+    sleeps: List[float] = []
+    policy = _policy(sleeps, max_attempts=10, deadline=5)
+
+    response = policy.call(lambda: _FakeResponse(429, {"Retry-After": "3"}))
+
+    assert response.status_code == 429  # noqa: PLR2004
+    assert sleeps == [3.0]
+
+
+def _connection_refused() -> requests.ConnectionError:
+    """Build the error requests raises when a connection cannot be established."""
+    reason = NewConnectionError(None, "Failed to establish a new connection")  # type: ignore[arg-type]
+    return requests.ConnectionError(MaxRetryError(None, "/", reason))  # type: ignore[arg-type]
+
+
+def _connection_aborted() -> requests.ConnectionError:
+    """Build the error requests raises when the server drops the connection mid-request."""
+    reason = RemoteDisconnected("Remote end closed connection without response")
+    return requests.ConnectionError(ProtocolError("Connection aborted.", reason))
+
+
+def test_transport_errors() -> None:
+    """Test that connect errors are always retried, other errors only for idempotent calls."""
+    sleeps: List[float] = []
+    policy = _policy(sleeps)
+    outcomes: List[object] = []
+
+    def send() -> _FakeResponse:
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome  # type: ignore[return-value]
+
+    for error in [_connection_refused(), requests.ConnectTimeout()]:
+        outcomes[:] = [error, _FakeResponse(200)]
+        assert policy.call(send, idempotent=False).status_code == 200  # noqa: PLR2004
+
+    for error in [_connection_aborted(), requests.ReadTimeout()]:
+        outcomes[:] = [error]
+        with pytest.raises(type(error)):
+            policy.call(send, idempotent=False)
+
+        outcomes[:] = [error, _FakeResponse(200)]
+        assert policy.call(send, idempotent=True).status_code == 200  # noqa: PLR2004
+
+
+def test_client_does_not_retry_aborted_post(mocked_responses: RequestsMock) -> None:
+    """Test that a POST whose connection was aborted is not sent again."""
+    url = URL_SESSIONS_ONLINE_INVOICES.format(reference_number="session-ref-123")
+    mocked_responses.add(url=f"{BASE}{url}", method="POST", body=_connection_aborted())
+    session_context = SessionContext(
+        reference_number="session-ref-123", aes_key=b"\x00" * 32, iv=b"\x00" * 16
+    )
+
+    client = Client(authorization=_create_mock_authorization(), environment=Environment.TEST)
+    with pytest.raises(requests.ConnectionError, match="Connection aborted"):
+        client.send_invoice_in_session(session_context, _create_test_invoice())
+
+    assert len(mocked_responses.calls) == 1
+
+
+def test_call_async() -> None:
+    """Test the asyncio variant retries throttled responses."""
+    throttled = _FakeResponse(429, {"Retry-After": "0"})
+    responses = iter([throttled, _FakeResponse(200)])
+
+    async def send() -> _FakeResponse:
+        return next(responses)
+
+    response = asyncio.run(RetryPolicy().call_async(send))
+
+    assert response.status_code == 200  # noqa: PLR2004
+    assert throttled.closed
+
+
+def test_client_retries_throttled_requests(mocked_responses: RequestsMock) -> None:
+    """Test that the client transparently retries a throttled API call."""
+    url = f"{BASE}{URL_SESSIONS_STATUS.format(reference_number='session-ref-123')}"
+    mocked_responses.add(url=url, method="GET", status=429, headers={"Retry-After": "0"})
+    mocked_responses.add(
+        url=url,
+        method="GET",
+        json={
+            "status": {"code": 200, "description": "Processed"},
+            "invoiceCount": 1,
+            "successfulInvoiceCount": 1,
+            "failedInvoiceCount": 0,
+        },
+    )
+
+    client = Client(authorization=_create_mock_authorization(), environment=Environment.TEST)
+    status = client.get_session_status(session_reference_number="session-ref-123")
+
+    assert status.invoice_count == 1
+    assert len(mocked_responses.calls) == 2  # noqa: PLR2004
@@ -0,0 +1,158 @@
+"""Tests for the incremental invoice synchronization."""
+import json
+import re
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from requests import PreparedRequest
+from responses import RequestsMock
+
+from ksef.client import Client
+from ksef.constants import URL_INVOICES_GET, URL_QUERY_INVOICES, Environment
+from ksef.exceptions import SyncError
+from ksef.sync import FileCheckpointStore, InvoiceSync, SyncCheckpoint
+from ksef.utils import parse_datetime
+from tests.test_client_invoices import _create_mock_authorization
+from tests.test_invoice_query import _invoice_metadata
+
+BASE = Environment.TEST.value
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _stored_invoice(number: int) -> Dict[str, Any]:
+    """Build an invoice metadata record stored `number // 2` minutes after START."""
+    invoice = _invoice_metadata(number)
+    # Two invoices per timestamp, to exercise invoices sharing the high-water mark
+    invoice["permanentStorageDate"] = (START + timedelta(minutes=number // 2)).isoformat()
+    return invoice
+
+
+def _mock_ksef(
+    mocked_responses: RequestsMock, invoices: List[Dict[str, Any]], download: bool = True
+) -> List[str]:
+    """Serve metadata queries and downloads of `invoices`, recording downloaded numbers."""
+    downloads: List[str] = []
+
+    def query(request: PreparedRequest) -> Tuple[int, Dict[str, str], str]:
+        params = parse_qs(urlparse(request.url).query)
+        page_size, page_offset = int(params["PageSize"][0]), int(params["PageOffset"][0])
+        date_range = json.loads(request.body or "{}")["dateRange"]
+        assert date_range["dateType"] == "PermanentStorage"
+        start = parse_datetime(date_range["from"])
+        matching = [
+            invoice
+            for invoice in invoices
+            if parse_datetime(invoice["permanentStorageDate"]) >= start
+        ]
+        page = matching[page_offset * page_size : (page_offset + 1) * page_size]
+        body = {"invoices": page, "hasMore": (page_offset + 1) * page_size < len(matching)}
+        return 200, {}, json.dumps(body)
+
+    def serve_invoice(request: PreparedRequest) -> Tuple[int, Dict[str, str], str]:
+        ksef_number = str(request.url).rsplit("/", 1)[-1]
+        downloads.append(ksef_number)
+        return 200, {}, f"<Faktura>{ksef_number}</Faktura>"
+
+    mocked_responses.add_callback("POST", f"{BASE}{URL_QUERY_INVOICES}", callback=query)
+    if download:
+        url = f"{BASE}{URL_INVOICES_GET.format(ksef_reference_number='')}"
+        mocked_responses.add_callback(
+            "GET", re.compile(f"{re.escape(url)}.+"), callback=serve_invoice
+        )
+    return downloads
+
+
+def _sync(tmp_path: Path, **kwargs: Any) -> InvoiceSync:
+    client = Client(
+        authorization=_create_mock_authorization(),
+        environment=Environment.TEST,
+        rate_limiter=None,
+    )
+    store = FileCheckpointStore(tmp_path)
+    return InvoiceSync(client, store, start=START, page_size=3, **kwargs)
+
+
+def test_sync_only_returns_new_invoices(mocked_responses: RequestsMock, tmp_path: Path) -> None:
+    """Test that a second run only queries and downloads invoices stored since the first."""
+    invoices = [_stored_invoice(number) for number in range(7)]
+    downloads = _mock_ksef(mocked_responses, invoices)
+
+    first = [synced.metadata.invoice_number for synced in _sync(tmp_path).iter_new_invoices()]
+    invoices.extend(_stored_invoice(number) for number in range(7, 10))
+    second = list(_sync(tmp_path).iter_new_invoices())
+
+    assert first == [f"FV/{number}/2025" for number in range(7)]
+    assert [synced.metadata.invoice_number for synced in second] == [
+        f"FV/{number}/2025" for number in range(7, 10)
+    ]
+    assert second[0].content == f"<Faktura>{second[0].metadata.ksef_number}</Faktura>".encode()
+    assert len(downloads) == 10  # noqa: PLR2004
+    checkpoint = _sync(tmp_path).load_checkpoint()
+    assert checkpoint.high_water_mark == START + timedelta(minutes=4)
+    assert checkpoint.seen == [invoices[8]["ksefNumber"], invoices[9]["ksefNumber"]]
+
+
+def test_sync_saves_progress(mocked_responses: RequestsMock, tmp_path: Path) -> None:
+    """Test that progress is saved periodically and when the consumer stops early."""
+    invoices = [_stored_invoice(number) for number in range(10)]
+    _mock_ksef(mocked_responses, invoices, download=False)
+
+    interrupted = _sync(tmp_path, download=False, checkpoint_interval=4).iter_new_invoices()
+    for _ in range(6):
+        next(interrupted)
+    saved = _sync(tmp_path).load_checkpoint()
+    assert saved.high_water_mark == START + timedelta(minutes=1)
+    assert saved.seen == [invoices[2]["ksefNumber"], invoices[3]["ksefNumber"]]
+
+    interrupted.close()  # Stop before the 6th invoice is processed
+    resumed = [
+        synced.metadata.invoice_number
+        for synced in _sync(tmp_path, download=False).iter_new_invoices()
+    ]
+
+    assert resumed == [f"FV/{number}/2025" for number in range(5, 10)]
+
+
+def test_sync_accepts_naive_start(mocked_responses: RequestsMock, tmp_path: Path) -> None:
+    """Test that a naive start is taken to be in UTC."""
+    _mock_ksef(mocked_responses, [_stored_invoice(number) for number in range(3)], download=False)
+    client = Client(authorization=_create_mock_authorization(), environment=Environment.TEST)
+    sync = InvoiceSync(
+        client, FileCheckpointStore(tmp_path), start=START.replace(tzinfo=None), download=False
+    )
+
+    assert len(list(sync.iter_new_invoices())) == 3  # noqa: PLR2004
+    assert sync.load_checkpoint().high_water_mark == START + timedelta(minutes=1)
+
+
+def test_sync_fails_when_stuck_on_one_storage_date(
+    mocked_responses: RequestsMock, tmp_path: Path
+) -> None:
+    """Test that a truncated page of invoices sharing one storage date does not loop forever."""
+    stored_at = (START + timedelta(minutes=5)).isoformat()
+    invoices = [
+        {**_invoice_metadata(number), "permanentStorageDate": stored_at} for number in range(3)
+    ]
+    body = json.dumps({"invoices": invoices, "hasMore": False, "isTruncated": True})
+    mocked_responses.add("POST", f"{BASE}{URL_QUERY_INVOICES}", body=body)
+    mocked_responses.add("POST", f"{BASE}{URL_QUERY_INVOICES}", body=body)
+    new_invoices = _sync(tmp_path, download=False).iter_new_invoices()
+    synced = [next(new_invoices).metadata.invoice_number for _ in range(3)]
+
+    with pytest.raises(SyncError, match="cannot synchronize past them"):
+        next(new_invoices)
+    assert synced == [f"FV/{number}/2025" for number in range(3)]
+    assert len(_sync(tmp_path).load_checkpoint().seen) == 3  # noqa: PLR2004
+
+
+def test_checkpoint_round_trip(tmp_path: Path) -> None:
+    """Test storing and loading a checkpoint."""
+    store = FileCheckpointStore(tmp_path)
+    checkpoint = SyncCheckpoint(high_water_mark=START, seen=["KSEF-1"])
+
+    assert store.load("key") is None
+    store.save("key", checkpoint)
+    assert store.load("key") == checkpoint
@@ -1,7 +1,12 @@
 """Test the utilities module."""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List
+
 import pytest
 
-from ksef.utils import camelcase_to_words
+from ksef.utils import bounded_map, bounded_map_unordered, camelcase_to_words, parse_datetime
 
 
 @pytest.mark.parametrize(
@@ -14,3 +19,66 @@ from ksef.utils import camelcase_to_words
 def test_camelcase_to_words(value: str, expected_value: str) -> None:
     """Test the camelcase_to_words function."""
     assert camelcase_to_words(value) == expected_value
+
+
+@pytest.mark.parametrize(
+    ("value", "expected_value"),
+    [
+        ("2025-01-01T10:00:00Z", datetime(2025, 1, 1, 10, tzinfo=timezone.utc)),
+        ("2025-01-01T10:00:00.1Z", datetime(2025, 1, 1, 10, 0, 0, 100000, tzinfo=timezone.utc)),
+        ("2025-01-01T10:00:00.123Z", datetime(2025, 1, 1, 10, 0, 0, 123000, tzinfo=timezone.utc)),
+        ("2025-01-01T10:00:00.12345", datetime(2025, 1, 1, 10, 0, 0, 123450, tzinfo=timezone.utc)),
+        (
+            "2025-01-01T10:00:00.1234567+02:00",
+            datetime(2025, 1, 1, 10, 0, 0, 123456, tzinfo=timezone(timedelta(hours=2))),
+        ),
+        (
+            "2025-01-01T10:00:00.123456789Z",
+            datetime(2025, 1, 1, 10, 0, 0, 123456, tzinfo=timezone.utc),
+        ),
+    ],
+)
+def test_parse_datetime(value: str, expected_value: datetime) -> None:
+    """Test parsing timestamps with any number of fractional second digits."""
+    assert parse_datetime(value) == expected_value
+    assert parse_datetime(value).utcoffset() == expected_value.utcoffset()
+
+
+def test_bounded_map_is_ordered_and_lazy() -> None:
+    """Test that bounded_map yields in input order and only reads ahead max_in_flight items."""
+    consumed: List[int] = []
+
+    def produce() -> Iterator[int]:
+        for value in range(10):
+            consumed.append(value)
+            yield value
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = bounded_map(executor, lambda value: value * 2, produce(), max_in_flight=3)
+        assert next(results) == 0
+        assert len(consumed) == 4  # noqa: PLR2004
+        assert list(results) == [value * 2 for value in range(1, 10)]
+
+
+def test_bounded_map_unordered_does_not_wait_for_slow_items() -> None:
+    """Test that bounded_map_unordered yields finished results before a slow earlier one."""
+    release = threading.Event()
+    consumed: List[int] = []
+
+    def produce() -> Iterator[int]:
+        for value in range(6):
+            consumed.append(value)
+            yield value
+
+    def double(value: int) -> int:
+        if value == 0:
+            release.wait(timeout=5)
+        return value * 2
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        results = bounded_map_unordered(executor, double, produce(), max_in_flight=3)
+        first = next(results)
+        assert first != 0
+        assert len(consumed) <= 4  # noqa: PLR2004
+        release.set()
+        assert sorted([first, *results]) == [value * 2 for value in range(6)]
@@ -1,14 +1,20 @@
 """Test suite for XML converters."""
+import hashlib
+import io
 from datetime import date, datetime, timezone
 from decimal import Decimal
 from pathlib import Path
 
+import pytest
 from bs4 import BeautifulSoup
 
+from ksef.encryption import StreamDigest, _decrypt_aes_cbc, encrypt_stream
 from ksef.models.invoice import (
     PAYMENT_METHOD_BANK_TRANSFER,
     PAYMENT_METHOD_CARD,
     PAYMENT_METHOD_CASH,
+    AdditionalDescription,
+    AdditionalRecipient,
     Address,
     EuVatIdentification,
     ForeignIdentification,
@@ -22,6 +28,7 @@ from ksef.models.invoice import (
     PaymentInfo,
     Subject,
     SubjectIdentificationData,
+    TaxSummary,
 )
 from ksef.models.invoice_annotations import (
     FreeFromVat,
@@ -35,7 +42,14 @@ from ksef.models.invoice_annotations import (
     TaxSettlementOnPayment,
 )
 from ksef.models.invoice_rows import InvoiceRow, InvoiceRows
-from ksef.xml_converters import convert_invoice_to_xml
+from ksef.xml_converters import (
+    FragmentCache,
+    XmlSerializer,
+    convert_invoice_to_xml,
+    convert_invoices_to_xml,
+    iter_invoice_xml,
+    write_invoice_xml,
+)
 
 BASE_DIR = Path(__file__).parent
 RESOURCES_DIR = BASE_DIR / "resources"
@@ -352,3 +366,175 @@ def test_payment_info_is_paid_false_omits_zaplacono() -> None:
     platnosc = soup.find("Platnosc")
     assert platnosc is not None
     assert platnosc.find("Zaplacono") is None
+
+
+def _make_full_invoice() -> Invoice:
+    """Build an invoice using every optional element, with text needing escaping."""
+    address = Address(
+        country_code="PL",
+        city="Kraków",
+        street="Długa & <Krótka>",
+        house_number="1",
+        apartment_number=None,
+        postal_code="30-001",
+    )
+    invoice = _make_invoice(
+        Subject(
+            identification_data=EuVatIdentification(eu_country_code="DE", eu_vat_number="123"),
+            name='Firma "Cudzysłów" & Syn',
+            address=address,
+        )
+    )
+    invoice.additional_recipients = [
+        AdditionalRecipient(identification_data=NipIdentification(nip="3333333333"), role=4),
+        AdditionalRecipient(
+            identification_data=ForeignIdentification(country_code="US", tax_id="EIN1"),
+            name="Payer",
+            address=address,
+            role=6,
+        ),
+        AdditionalRecipient(identification_data=NoIdentification(), role=2),
+    ]
+    data = invoice.invoice_data
+    data.tax_summary = TaxSummary(
+        net_standard=Decimal("100.00"),
+        vat_standard=Decimal("23.00"),
+        vat_standard_pln=Decimal("98.00"),
+        net_flat_rate=Decimal("10"),
+        vat_flat_rate=Decimal("1"),
+        net_exempt=Decimal("5"),
+        net_reverse_charge=Decimal("7"),
+    )
+    data.invoice_annotations = InvoiceAnnotations(
+        tax_settlement_on_payment=TaxSettlementOnPayment.ON_PAYMENT,
+        self_invoice=SelfInvoicing.YES,
+        reverse_charge=ReverseCharge.YES,
+        split_payment=SplitPayment.YES,
+        free_from_vat=FreeFromVat.YES,
+        intra_community_supply_of_new_transport_methods=IntraCommunitySupplyOfNewTransportMethods.YES,
+        simplified_procedure_by_second_tax_payer=SimplifiedProcedureBySecondTaxPayer.YES,
+        margin_procedure=MarginProcedure.YES,
+    )
+    data.additional_descriptions = [
+        AdditionalDescription(key="Kurs", value="NBP <1/A/2024>", row_number=2),
+        AdditionalDescription(key="Uwagi", value=""),
+    ]
+    data.invoice_rows = InvoiceRows(
+        rows=[
+            InvoiceRow(
+                name="Usługa & <materiały>",
+                unit_of_measure="szt",
+                quantity=Decimal("2.5"),
+                unit_net_price=Decimal("40"),
+                net_value=Decimal("100.00"),
+                tax=23,
+                delivery_date=date(2024, 1, 2),
+                exchange_rate=Decimal("4.3210"),
+            ),
+            InvoiceRow(name="OSS", tax_oss=Decimal("19"), tax="zw"),
+            InvoiceRow(name="Exempt", tax="zw"),
+        ]
+    )
+    data.payment_info = PaymentInfo(
+        is_paid=True,
+        payment_date=date(2024, 1, 20),
+        due_date=date(2024, 2, 5),
+        due_description="14 dni",
+        method=PAYMENT_METHOD_BANK_TRANSFER,
+        bank_account_number="12345678901234567890123456",
+    )
+    return invoice
+
+
+@pytest.mark.parametrize(
+    "invoice",
+    [
+        _make_invoice(Subject(identification_data=NipIdentification(nip="2222222222"))),
+        _make_full_invoice(),
+    ],
+    ids=["minimal", "full"],
+)
+def test_serializers_produce_identical_bytes(invoice: Invoice) -> None:
+    """Test that the direct serializer writes exactly what the ElementTree one does."""
+    expected = convert_invoice_to_xml(invoice, serializer=XmlSerializer.ELEMENT_TREE)
+
+    assert convert_invoice_to_xml(invoice, serializer=XmlSerializer.DIRECT) == expected
+
+
+def test_iter_invoice_xml_streams_rows_in_chunks() -> None:
+    """Test that streamed chunks hold a few rows each and join into the whole document."""
+    invoice = _make_full_invoice()
+    invoice.invoice_data.invoice_rows = InvoiceRows(
+        rows=[InvoiceRow(name=f"Row {number}", tax=23) for number in range(10)]
+    )
+
+    chunks = list(iter_invoice_xml(invoice, rows_per_chunk=4))
+
+    assert b"".join(chunks) == convert_invoice_to_xml(invoice)
+    assert [chunk.count(b"<FaWiersz>") for chunk in chunks] == [4, 4, 2]
+
+
+def test_write_invoice_xml_feeds_encryption() -> None:
+    """Test writing to a file object and encrypting the streamed chunks."""
+    invoice = _make_full_invoice()
+    expected = convert_invoice_to_xml(invoice)
+    key, iv = b"0" * 32, b"1" * 16
+    file = io.BytesIO()
+    digest = StreamDigest()
+
+    size = write_invoice_xml(invoice, file)
+    ciphertext = b"".join(
+        bytes(chunk)
+        for chunk in encrypt_stream(iter_invoice_xml(invoice, rows_per_chunk=1), key, iv, digest)
+    )
+
+    assert size == len(expected)
+    assert file.getvalue() == expected
+    assert _decrypt_aes_cbc(ciphertext, key, iv) == expected
+    assert digest.plaintext_sha256 == hashlib.sha256(expected).digest()
+
+
+def test_fragment_cache_reuses_shared_parts() -> None:
+    """Test that cached fragments give the same XML and are reused between invoices."""
+    cache = FragmentCache(maxsize=10)
+    invoices = [_make_full_invoice() for _ in range(3)]
+    invoices[2].issuer.identification_data.full_name = "Inna <Firma> & Co"
+
+    for invoice in invoices:
+        assert convert_invoice_to_xml(invoice, fragment_cache=cache) == convert_invoice_to_xml(
+            invoice, serializer=XmlSerializer.ELEMENT_TREE
+        )
+
+    # Header end, annotations and the two issuers
+    assert len(cache) == 4  # noqa: PLR2004
+
+
+def test_fragment_cache_evicts_least_recently_used() -> None:
+    """Test that the cache keeps only the most recently used fragments."""
+    cache = FragmentCache(maxsize=2)
+
+    cache.get_or_render(("a",), lambda: "A")
+    cache.get_or_render(("b",), lambda: "B")
+    cache.get_or_render(("a",), lambda: "not rendered")
+    cache.get_or_render(("c",), lambda: "C")
+
+    assert len(cache) == 2  # noqa: PLR2004
+    assert cache.get_or_render(("a",), lambda: "A again") == "A"
+    assert cache.get_or_render(("b",), lambda: "B again") == "B again"
+
+
+@pytest.mark.parametrize(("workers", "ordered"), [(1, True), (2, True), (2, False)])
+def test_convert_invoices_to_xml(workers: int, ordered: bool) -> None:
+    """Test converting invoices, given as models or raw dicts, on worker processes."""
+    invoices = [_make_full_invoice() for _ in range(7)]
+    for number, invoice in enumerate(invoices):
+        invoice.invoice_data.issue_number = f"FV/{number}/2024"
+    sources = [invoice.dict() if number % 2 else invoice for number, invoice in enumerate(invoices)]
+
+    results = list(convert_invoices_to_xml(sources, workers=workers, chunk_size=2, ordered=ordered))
+
+    assert sorted(results) == [
+        (number, convert_invoice_to_xml(invoice)) for number, invoice in enumerate(invoices)
+    ]
+    if ordered:
+        assert [number for number, _ in results] == list(range(7))
@@ -0,0 +1,107 @@
+"""Test suite for XML parsers."""
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+from ksef.exceptions import InvoiceParseError
+from ksef.models.invoice import EuVatIdentification, InvoiceType, NipIdentification
+from ksef.models.invoice_annotations import FreeFromVat
+from ksef.models.invoice_rows import InvoiceRow, InvoiceRows
+from ksef.xml_converters import convert_invoice_to_xml
+from ksef.xml_parsers import iter_invoice_rows, parse_invoice_xml
+from tests.xml_converters.test_convert_invoice_to_xml import RESOURCES_DIR, _make_full_invoice
+
+
+def test_parse_invoice() -> None:
+    """Test parsing an indented FA(3) document into models."""
+    invoice = parse_invoice_xml(RESOURCES_DIR / "invoice.xml")
+
+    assert invoice.creation_datetime == datetime(2024, 1, 22, 10, 30, tzinfo=timezone.utc)
+    assert invoice.issuer.identification_data.nip == "1111111111"
+    assert invoice.issuer.address.street == "Kwiatowa"
+    assert invoice.issuer.address.house_number == "1"
+    assert invoice.issuer.address.apartment_number == "2"
+    assert invoice.issuer.address.postal_code == "00-001"
+    assert invoice.issuer.address.city == "Warszawa"
+    assert invoice.recipient.identification_data == NipIdentification(nip="2222222222")
+    assert invoice.recipient.address is None
+    data = invoice.invoice_data
+    assert data.issue_date == date(2024, 1, 22)
+    assert data.sell_date == date(2024, 1, 1)
+    assert data.total_amount == Decimal("450.00")
+    assert data.tax_summary is None
+    assert data.invoice_annotations.free_from_vat is FreeFromVat.NO
+    assert data.invoice_type is InvoiceType.REGULAR_VAT
+    assert data.invoice_rows == InvoiceRows(
+        rows=[
+            InvoiceRow(name="Example service 1", tax=23),
+            InvoiceRow(name="Example service 2", tax=8),
+        ]
+    )
+
+
+def test_parse_invoice_round_trip() -> None:
+    """Test that a parsed invoice converts back to the same XML."""
+    xml = convert_invoice_to_xml(_make_full_invoice())
+
+    invoice = parse_invoice_xml(xml)
+
+    assert convert_invoice_to_xml(invoice) == xml
+    assert invoice.recipient.identification_data == EuVatIdentification(
+        eu_country_code="DE", eu_vat_number="123"
+    )
+    assert invoice.recipient.address is not None
+    assert invoice.recipient.address.street == "Długa & <Krótka>"
+    assert invoice.invoice_data.tax_summary is not None
+    assert invoice.invoice_data.tax_summary.vat_standard_pln == Decimal("98.00")
+    assert invoice.invoice_data.payment_info == _make_full_invoice().invoice_data.payment_info
+
+
+def test_iter_invoice_rows_without_parsing_rows_into_invoice(tmp_path: Path) -> None:
+    """Test streaming the rows separately from the rest of the invoice."""
+    full_invoice = _make_full_invoice()
+    path = tmp_path / "invoice.xml"
+    path.write_bytes(convert_invoice_to_xml(full_invoice))
+
+    invoice = parse_invoice_xml(path, include_rows=False)
+    with path.open("rb") as file:
+        rows = iter_invoice_rows(file)
+        first_row = next(rows)
+        other_names = [row.name for row in rows]
+
+    assert invoice.invoice_data.invoice_rows.rows == []
+    assert invoice.invoice_data.payment_info is not None
+    assert first_row == full_invoice.invoice_data.invoice_rows.rows[0]
+    assert other_names == ["OSS", "Exempt"]
+
+
+@pytest.mark.parametrize(
+    ("xml", "match"),
+    [
+        (b"<Faktura><Fa>", "Invalid invoice XML"),
+        (b"<Faktura xmlns='http://crd.gov.pl/wzor/2023/06/29/12648/'/>", "Not an FA"),
+        (
+            convert_invoice_to_xml(_make_full_invoice()).replace(b"P_15>", b"P_15X>"),
+            "Missing required element P_15",
+        ),
+        (
+            convert_invoice_to_xml(_make_full_invoice()).replace(b"<P_12>23<", b"<P_12>24<"),
+            "Unknown tax rate '24'",
+        ),
+    ],
+    ids=["malformed", "other-namespace", "missing-element", "unknown-tax-rate"],
+)
+def test_parse_invalid_invoice(xml: bytes, match: str) -> None:
+    """Test that malformed or foreign documents raise InvoiceParseError."""
+    with pytest.raises(InvoiceParseError, match=match):
+        parse_invoice_xml(xml)
+
+
+def test_parse_missing_file(tmp_path: Path) -> None:
+    """Test that a string is read as a path and an unreadable one raises InvoiceParseError."""
+    with pytest.raises(InvoiceParseError, match="Could not read"):
+        parse_invoice_xml("<Faktura/>")
+    with pytest.raises(InvoiceParseError, match="Could not read"):
+        list(iter_invoice_rows(str(tmp_path / "missing.xml")))